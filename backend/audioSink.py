@@ -0,0 +1,56 @@
+import time
+
+
+class SoundDeviceSink:
+    """Plays raw 16-bit mono PCM chunks through the default output device as they arrive."""
+    def __init__(self, sample_rate=22050):
+        self.sample_rate = sample_rate
+        self.stream = None
+        # a chunk can end halfway through a sample, keep the odd byte for the next one
+        self.pending = b""
+
+    def open(self):
+        import sounddevice as sd
+        self.stream = sd.RawOutputStream(samplerate=self.sample_rate, channels=1, dtype="int16")
+        self.stream.start()
+        self.pending = b""
+
+    def write(self, pcm_bytes):
+        data = self.pending + pcm_bytes
+        usable = len(data) - (len(data) % 2)
+        self.pending = data[usable:]
+        if usable:
+            # blocks only while the device buffer is full
+            self.stream.write(data[:usable])
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.stop()  # waits for queued audio to finish playing
+            self.stream.close()
+            self.stream = None
+
+
+class FakeAudioSink:
+    """Collects PCM chunks in memory with their arrival times (for tests and offline benchmarks)."""
+    def __init__(self, sample_rate=22050, realtime=False):
+        self.sample_rate = sample_rate
+        # when realtime is set, write() sleeps for the chunk's playback duration like a real device
+        self.realtime = realtime
+        self.chunks = []
+        self.write_times = []
+        self.is_open = False
+
+    def open(self):
+        self.is_open = True
+
+    def write(self, pcm_bytes):
+        self.chunks.append(pcm_bytes)
+        self.write_times.append(time.perf_counter())
+        if self.realtime:
+            time.sleep(len(pcm_bytes) / 2 / self.sample_rate)
+
+    def close(self):
+        self.is_open = False
+
+    def audio(self):
+        return b"".join(self.chunks)
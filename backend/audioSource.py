@@ -0,0 +1,97 @@
+import queue
+import time
+import wave
+
+import numpy as np
+
+
+class MicrophoneSource:
+    """16-bit mono frames from the default input device, queued by the sounddevice callback."""
+    def __init__(self, sample_rate=16000, frame_ms=20, max_queued_frames=100):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frames = queue.Queue(maxsize=max_queued_frames)
+        self.stream = None
+        # a microphone never runs out
+        self.ended = False
+        self.dropped = 0
+
+    def open(self):
+        import sounddevice as sd
+        self.stream = sd.RawInputStream(samplerate=self.sample_rate, channels=1, dtype="int16",
+                                        blocksize=self.frame_samples, callback=self._callback)
+        self.stream.start()
+
+    def _callback(self, indata, frames, time_info, status):
+        # runs on PortAudio's thread: never block, drop the oldest frame if nobody is reading
+        if self.frames.full():
+            try:
+                self.frames.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+        self.frames.put_nowait(bytes(indata))
+
+    def read(self, timeout=None):
+        """Next frame (bytes), or None if none arrived within timeout seconds."""
+        try:
+            return self.frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+
+class PcmSource:
+    """Frames from 16-bit mono PCM in memory (for tests and offline benchmarks)."""
+    def __init__(self, pcm, sample_rate=16000, frame_ms=20, realtime=False):
+        self.pcm = bytes(pcm)
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_samples = sample_rate * frame_ms // 1000
+        # when realtime is set, read() hands out frames no faster than a microphone would
+        self.realtime = realtime
+        self.offset = 0
+        self.started = None
+        self.ended = False
+        self.dropped = 0
+
+    def open(self):
+        self.offset = 0
+        self.started = time.perf_counter()
+        self.ended = False
+
+    def read(self, timeout=None):
+        frame_bytes = 2 * self.frame_samples
+        if self.offset + frame_bytes > len(self.pcm):
+            self.ended = True
+            return None
+        if self.realtime:
+            due = self.started + (self.offset + frame_bytes) / 2 / self.sample_rate
+            time.sleep(max(0.0, due - time.perf_counter()))
+        frame = self.pcm[self.offset:self.offset + frame_bytes]
+        self.offset += frame_bytes
+        return frame
+
+    def close(self):
+        pass
+
+
+class WavFileSource(PcmSource):
+    """Frames from a 16-bit WAV file; stereo files are mixed down to mono."""
+    def __init__(self, path, frame_ms=20, realtime=False):
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"{path}: only 16-bit WAV files are supported")
+            channels = wav.getnchannels()
+            sample_rate = wav.getframerate()
+            samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1).astype("<i2")
+        super().__init__(samples.tobytes(), sample_rate=sample_rate, frame_ms=frame_ms, realtime=realtime)
+        self.path = path
@@ -0,0 +1,239 @@
+import collections
+import math
+import sys
+
+import numpy as np
+
+
+class MovingAverageFilter:
+    """Plain average of the last N points (the original smoothing). Lag grows with the window."""
+    def __init__(self, window=2):
+        self.history = collections.deque(maxlen=window)
+
+    def update(self, x, y, t):
+        self.history.append((x, y))
+        return self.predict(t)
+
+    def predict(self, t):
+        # no velocity estimate, so no extrapolation
+        avg_x = sum(p[0] for p in self.history) / len(self.history)
+        avg_y = sum(p[1] for p in self.history) / len(self.history)
+        return avg_x, avg_y
+
+    def reset(self):
+        self.history.clear()
+
+
+class _LowPass:
+    def __init__(self):
+        self.value = None
+
+    def filter(self, value, alpha):
+        self.value = value if self.value is None else alpha * value + (1 - alpha) * self.value
+        return self.value
+
+
+class OneEuroFilter:
+    """
+    One-Euro Filter (Casiez et al., CHI 2012).
+    - A low-pass filter whose cutoff rises with speed.
+    - Hand at rest: low cutoff, jitter is removed.
+    - Hand moving: high cutoff, little lag.
+    min_cutoff (Hz) sets smoothing at rest, beta sets how fast the cutoff opens with speed (px/s).
+    """
+    def __init__(self, min_cutoff=1.5, beta=0.01, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def _filter_axis(self, axis, value, dt):
+        prev = self.x_filters[axis].value
+        raw_speed = 0.0 if prev is None else (value - prev) / dt
+        speed = self.dx_filters[axis].filter(raw_speed, self._alpha(self.d_cutoff, dt))
+        cutoff = self.min_cutoff + self.beta * abs(speed)
+        return self.x_filters[axis].filter(value, self._alpha(cutoff, dt)), speed
+
+    def update(self, x, y, t):
+        dt = t - self.last_t if self.last_t is not None else 0.0
+        if dt <= 0:
+            dt = 1.0 / 30  # first sample or duplicate timestamp: assume camera rate
+        self.last_t = t
+
+        fx, self.vx = self._filter_axis(0, x, dt)
+        fy, self.vy = self._filter_axis(1, y, dt)
+        return fx, fy
+
+    def predict(self, t):
+        """Filtered position extrapolated with the filtered velocity to time t."""
+        ahead = t - self.last_t
+        return self.x_filters[0].value + self.vx * ahead, self.x_filters[1].value + self.vy * ahead
+
+    def reset(self):
+        self.x_filters = [_LowPass(), _LowPass()]
+        self.dx_filters = [_LowPass(), _LowPass()]
+        self.vx = self.vy = 0.0
+        self.last_t = None
+
+
+class KalmanFilter:
+    """
+    Constant-Velocity Kalman Filter (one independent filter per axis).
+    - State is (position, velocity); dt comes from the real timestamps.
+    - process_noise: how much the hand may accelerate (px/s^2), higher = less lag.
+    - measurement_noise: landmark jitter (px), higher = smoother.
+    """
+    def __init__(self, process_noise=800.0, measurement_noise=6.0):
+        self.q = process_noise ** 2
+        self.r = measurement_noise ** 2
+        self.reset()
+
+    def _step(self, axis, z, dt):
+        pos, vel = self.state[axis]
+        p00, p01, p11 = self.cov[axis]
+
+        # predict (white-noise acceleration model)
+        pos += vel * dt
+        p00 += dt * (2 * p01 + dt * p11) + self.q * dt ** 4 / 4
+        p01 += dt * p11 + self.q * dt ** 3 / 2
+        p11 += self.q * dt ** 2
+
+        # correct with the measured position
+        s = p00 + self.r
+        k0, k1 = p00 / s, p01 / s
+        residual = z - pos
+        pos += k0 * residual
+        vel += k1 * residual
+        p00, p01, p11 = (1 - k0) * p00, (1 - k0) * p01, p11 - k1 * p01
+
+        self.state[axis] = [pos, vel]
+        self.cov[axis] = [p00, p01, p11]
+        return pos
+
+    def update(self, x, y, t):
+        if self.last_t is None:
+            self.state = [[x, 0.0], [y, 0.0]]
+            self.last_t = t
+            return x, y
+
+        dt = max(t - self.last_t, 1e-3)
+        self.last_t = t
+        return self._step(0, x, dt), self._step(1, y, dt)
+
+    def predict(self, t):
+        """Position extrapolated with the estimated velocity to time t."""
+        ahead = t - self.last_t
+        return self.state[0][0] + self.state[0][1] * ahead, self.state[1][0] + self.state[1][1] * ahead
+
+    def reset(self):
+        self.state = [[0.0, 0.0], [0.0, 0.0]]
+        # large initial velocity uncertainty, position starts at the first measurement
+        self.cov = [[self.r, 0.0, 1e6], [self.r, 0.0, 1e6]]
+        self.last_t = None
+
+
+FILTERS = {
+    "moving_average": MovingAverageFilter,
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+
+def make_filter(name, **kwargs):
+    if name not in FILTERS:
+        raise ValueError(f"Unknown cursor filter '{name}' (choose from {', '.join(FILTERS)})")
+    return FILTERS[name](**kwargs)
+
+
+# --- Offline evaluation ---
+
+def run_filter(cursor_filter, trace, prediction_s=0.0):
+    """Feeds a (N x 3) [t, x, y] trace through a filter and returns the (N x 2) output."""
+    cursor_filter.reset()
+    out = np.empty((len(trace), 2))
+    for i, (t, x, y) in enumerate(trace):
+        cursor_filter.update(x, y, t)
+        out[i] = cursor_filter.predict(t + prediction_s)
+    return out
+
+
+def score(trace, filtered, truth=None, still_px=15.0, still_window=0.25, max_lag=0.3):
+    """
+    Scores a filtered trace.
+    - lag_ms: time shift that best aligns the output with the reference (truth if
+      given, otherwise the raw input). Lower is better.
+    - jitter_px: RMS frame-to-frame movement of the output while the hand is still.
+    - error_px: mean distance to the truth (only with truth).
+    """
+    t = trace[:, 0]
+    reference = truth if truth is not None else trace[:, 1:]
+    dt = float(np.median(np.diff(t)))
+
+    # still segments: the reference moved less than still_px over the surrounding window
+    half = max(1, int(still_window / dt / 2))
+    spread = np.array([np.ptp(reference[max(0, i - half):i + half + 1], axis=0).max() for i in range(len(reference))])
+    still = spread < still_px
+    steps = np.linalg.norm(np.diff(filtered, axis=0), axis=1)
+    still_steps = steps[still[1:]]
+
+    # lag: shift the output back k samples and find where it best matches the reference while moving
+    best_k, best_err = 0, float("inf")
+    for k in range(0, int(max_lag / dt) + 1):
+        moving = ~still[:len(reference) - k]
+        if not moving.any():
+            break
+        err = np.mean(np.linalg.norm(filtered[k:] - reference[:len(reference) - k], axis=1)[moving])
+        if err < best_err:
+            best_k, best_err = k, err
+
+    result = {
+        "lag_ms": 1000 * best_k * dt,
+        "jitter_px": float(np.sqrt(np.mean(still_steps ** 2))) if len(still_steps) else 0.0,
+    }
+    if truth is not None:
+        result["error_px"] = float(np.mean(np.linalg.norm(filtered - truth, axis=1)))
+    return result
+
+
+def synthetic_trace(seconds=6.0, fps=30.0, noise_px=3.0, seed=0):
+    """Hand at rest, a fast sweep, rest, a slow sweep: returns (noisy [t, x, y] trace, truth)."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(0, seconds, 1.0 / fps)
+    x = np.interp(t, [0, 1, 1.5, 3, 4.5, 6], [400, 400, 1500, 1500, 600, 600])
+    y = np.interp(t, [0, 1, 1.5, 3, 4.5, 6], [300, 300, 700, 700, 400, 400])
+    truth = np.stack([x, y], axis=1)
+    noisy = truth + rng.normal(0, noise_px, truth.shape)
+    return np.column_stack([t, noisy]), truth
+
+
+def load_trace(path):
+    """Loads a cursor trace saved by MouseController.save_trace (CSV: t,x,y)."""
+    return np.loadtxt(path, delimiter=",", ndmin=2)
+
+
+if __name__ == "__main__":
+    # python cursorFilters.py [trace.csv]
+    if len(sys.argv) > 1:
+        trace, truth = load_trace(sys.argv[1]), None
+        print(f"Trace: {sys.argv[1]} ({len(trace)} samples)")
+    else:
+        trace, truth = synthetic_trace()
+        print(f"Synthetic trace ({len(trace)} samples, 3 px noise)")
+
+    candidates = [
+        ("moving_average (2)", MovingAverageFilter(2), 0.0),
+        ("moving_average (5)", MovingAverageFilter(5), 0.0),
+        ("one_euro", OneEuroFilter(), 0.0),
+        ("one_euro +33ms", OneEuroFilter(), 0.033),
+        ("kalman", KalmanFilter(), 0.0),
+        ("kalman +33ms", KalmanFilter(), 0.033),
+    ]
+    print(f"{'filter':<20}{'lag ms':>8}{'jitter px':>11}{'error px':>10}")
+    for name, cursor_filter, prediction in candidates:
+        scores = score(trace, run_filter(cursor_filter, trace, prediction), truth)
+        print(f"{name:<20}{scores['lag_ms']:>8.0f}{scores['jitter_px']:>11.2f}{scores.get('error_px', float('nan')):>10.1f}")
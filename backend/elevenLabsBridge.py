@@ -1,14 +1,32 @@
 import os
+import time
 from elevenlabs.client import ElevenLabs
 from dotenv import load_dotenv
 
+# raw 16-bit mono PCM, so chunks can be played as they arrive without an mp3 decoder
+STREAM_FORMAT = "pcm_22050"
+STREAM_SAMPLE_RATE = 22050
+
+CACHED_CHUNK_SIZE = 4096
+
 class ElevenLabsBridge:
-    def __init__(self):
-        load_dotenv()
-        api_key = os.getenv("ELEVEN_LABS_API_KEY")
-        self.__client = ElevenLabs(api_key=api_key)
+    def __init__(self, client=None, cache=None):
+        if client is None:
+            load_dotenv()
+            api_key = os.getenv("ELEVEN_LABS_API_KEY")
+            client = ElevenLabs(api_key=api_key)
+        self.__client = client
+        # optional SpeechCache, repeated lines are then served without an API call
+        self.cache = cache
 
     def generate_speech(self, text, voice_id="ljX1ZrXuDIIRVcmiVSyR"):
+        key = None
+        if self.cache:
+            key = self.cache.make_key(text, voice_id, {"format": "mp3"})
+            audio_data = self.cache.get(key)
+            if audio_data is not None:
+                return audio_data
+
         audio_stream = self.__client.text_to_speech.convert(
             text=text,
             voice_id=voice_id
@@ -16,4 +34,109 @@ class ElevenLabsBridge:
 
         audio_data = b"".join(audio_stream)
 
-        return audio_data
\ No newline at end of file
+        if key:
+            self.cache.put(key, audio_data)
+        return audio_data
+
+    def stream_speech(self, text, voice_id="ljX1ZrXuDIIRVcmiVSyR"):
+        """Yields raw PCM chunks as ElevenLabs produces them (or from the cache)."""
+        key = None
+        if self.cache:
+            key = self.cache.make_key(text, voice_id, {"format": STREAM_FORMAT})
+            audio_data = self.cache.get(key)
+            if audio_data is not None:
+                for i in range(0, len(audio_data), CACHED_CHUNK_SIZE):
+                    yield audio_data[i:i + CACHED_CHUNK_SIZE]
+                return
+
+        audio_stream = self.__client.text_to_speech.stream(
+            text=text,
+            voice_id=voice_id,
+            output_format=STREAM_FORMAT
+        )
+
+        chunks = []
+        for chunk in audio_stream:
+            if chunk:
+                chunks.append(chunk)
+                yield chunk
+
+        # only complete clips are cached, a cancelled stream never gets here
+        if key:
+            self.cache.put(key, b"".join(chunks))
+
+    def prewarm(self, phrases, voice_id="ljX1ZrXuDIIRVcmiVSyR"):
+        """Synthesizes any phrase that isn't cached yet, so its first use is instant."""
+        if not self.cache:
+            return
+        for text in phrases:
+            key = self.cache.make_key(text, voice_id, {"format": STREAM_FORMAT})
+            if self.cache.contains(key):
+                continue
+            try:
+                for _ in self.stream_speech(text, voice_id=voice_id):
+                    pass
+            except Exception as e:
+                print(f"TTS prewarm failed for {text!r}: {e}")
+
+    def play_streaming(self, text, sink, voice_id="ljX1ZrXuDIIRVcmiVSyR", cancel_event=None):
+        """
+        Streams speech straight into an audio sink, chunk by chunk, with no temp file.
+        Returns timing metrics in ms:
+        - ttfb: request sent -> first audio byte received
+        - ttfs: request sent -> first chunk handed to the sink (first sound)
+        """
+        start = time.perf_counter()
+        metrics = {"ttfb_ms": None, "ttfs_ms": None, "total_ms": None, "bytes": 0, "cancelled": False}
+
+        sink.open()
+        try:
+            for chunk in self.stream_speech(text, voice_id=voice_id):
+                if metrics["ttfb_ms"] is None:
+                    metrics["ttfb_ms"] = 1000 * (time.perf_counter() - start)
+
+                if cancel_event is not None and cancel_event.is_set():
+                    metrics["cancelled"] = True
+                    break
+
+                if metrics["ttfs_ms"] is None:
+                    metrics["ttfs_ms"] = 1000 * (time.perf_counter() - start)
+                sink.write(chunk)
+                metrics["bytes"] += len(chunk)
+        finally:
+            sink.close()
+
+        metrics["total_ms"] = 1000 * (time.perf_counter() - start)
+        return metrics
+
+
+class FakeTextToSpeech:
+    """Stands in for client.text_to_speech: returns silent PCM, optionally with network-like delays."""
+    def __init__(self, first_byte_delay=0.0, chunk_delay=0.0, chunk_size=4096, seconds_per_char=0.06):
+        self.first_byte_delay = first_byte_delay
+        self.chunk_delay = chunk_delay
+        self.chunk_size = chunk_size
+        self.seconds_per_char = seconds_per_char
+        self.requests = []
+
+    def _audio(self, text):
+        n_samples = int(len(text) * self.seconds_per_char * STREAM_SAMPLE_RATE)
+        return b"\x00\x00" * n_samples
+
+    def stream(self, text, voice_id, output_format=None, **kwargs):
+        self.requests.append(text)
+        audio = self._audio(text)
+        time.sleep(self.first_byte_delay)
+        for i in range(0, len(audio), self.chunk_size):
+            if i:
+                time.sleep(self.chunk_delay)
+            yield audio[i:i + self.chunk_size]
+
+    def convert(self, text, voice_id, **kwargs):
+        return self.stream(text, voice_id, **kwargs)
+
+
+class FakeElevenLabsClient:
+    """Offline stand-in for the ElevenLabs client."""
+    def __init__(self, **kwargs):
+        self.text_to_speech = FakeTextToSpeech(**kwargs)
@@ -0,0 +1,26 @@
+from handFeatures import HandFeatures
+
+
+class EngineResults:
+    """
+    Recognizer Result Handling.
+    - Shared by both engine backends (GestureEngine in-process, VisionProcesses across
+      processes), so they judge result age and build features the same way.
+    - The backend sets self.features = None, self.stale_results = 0 and self.metrics.
+    """
+    def is_stale(self, timestamp, now_ms, max_age_ms):
+        """True (and counted) when a result captured at timestamp (ms) is more than max_age_ms old."""
+        if max_age_ms is None or now_ms - timestamp <= max_age_ms:
+            return False
+        self.stale_results += 1
+        self.metrics.count("stale_results")
+        return True
+
+    def get_features(self, result, cam_w, cam_h):
+        """HandFeatures for a result, computed once per result and cached."""
+        features = self.features
+        if features is None or features.result is not result:
+            features = HandFeatures(result.hand_landmarks if result else [], cam_w, cam_h)
+            features.result = result
+            self.features = features
+        return features
@@ -0,0 +1,154 @@
+import threading
+import time
+import cv2
+import numpy as np
+
+from metrics import NullMetrics
+
+
+class FrameBroadcaster:
+    """
+    Encode-Once MJPEG Fan-Out.
+    - The vision loop publishes raw frames and never waits on viewers.
+    - Each published frame is JPEG-encoded at most once, by whichever viewer asks first.
+    - Every frame carries a sequence number; all viewers are woken together and
+      only get frames they haven't seen yet.
+    - A slow viewer skips straight to the newest frame instead of queueing old ones.
+    - Demand-driven: wants_frame() tells the producer whether to render a frame at all
+      (someone is watching, the last one was picked up, and max_fps allows it).
+    - Frames are rendered into buffers from a small pool; a buffer is reused once it is
+      neither the latest frame nor being encoded.
+    """
+    def __init__(self, metrics=None, max_fps=15, max_pool=4):
+        self.metrics = metrics or NullMetrics()
+        self.cond = threading.Condition()
+        self.frame = None
+        self.seq = 0
+        self.subscribers = 0
+        self.running = True
+
+        # demand: newest seq some viewer has picked up, and when the last frame went out
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.taken_seq = 0
+        self.last_publish = 0.0
+
+        # frame buffer pool; buffers a viewer is encoding from are counted in in_use
+        self.max_pool = max_pool
+        self.pool = []
+        self.in_use = {}
+
+        # single encoded copy shared by every viewer
+        self.encode_lock = threading.Lock()
+        self.jpeg = None
+        self.jpeg_seq = 0
+
+        # stats
+        self.published = 0
+        self.encoded = 0
+        self.skipped = 0
+        self.allocated = 0
+
+    def publish(self, frame):
+        """Hands a frame to the viewers. The frame must not be modified afterwards."""
+        with self.cond:
+            self.frame = frame
+            self.seq += 1
+            self.published += 1
+            self.last_publish = time.perf_counter()
+            self.cond.notify_all()
+
+    def has_subscribers(self):
+        return self.subscribers > 0
+
+    def wants_frame(self, now=None):
+        """True when a rendered frame would be seen: a viewer is connected, has taken the last frame, and max_fps allows another."""
+        if not self.subscribers or self.taken_seq < self.seq:
+            return False
+        now = time.perf_counter() if now is None else now
+        return now - self.last_publish >= self.min_interval
+
+    def acquire(self, shape, dtype=np.uint8):
+        """A buffer to render the next frame into: a free one from the pool, or a new one while the pool is small."""
+        with self.cond:
+            for buffer in self.pool:
+                if buffer is not self.frame and id(buffer) not in self.in_use and buffer.shape == shape and buffer.dtype == dtype:
+                    return buffer
+            buffer = np.empty(shape, dtype=dtype)
+            self.allocated += 1
+            # a pool full of busy (or wrongly sized) buffers: this one is used once and dropped
+            if len(self.pool) < self.max_pool:
+                self.pool.append(buffer)
+            else:
+                self.pool = [b for b in self.pool if b is self.frame or id(b) in self.in_use] + [buffer]
+            return buffer
+
+    def _encode(self, seq, frame):
+        """Returns (seq, jpeg bytes) for the newest frame, encoding it only if nobody has yet."""
+        with self.encode_lock:
+            if self.jpeg_seq < seq:
+                with self.metrics.timer("encode"):
+                    flag, encoded_image = cv2.imencode(".jpg", frame)
+                if not flag:
+                    return self.jpeg_seq, self.jpeg
+                self.jpeg = encoded_image.tobytes()
+                self.jpeg_seq = seq
+                self.encoded += 1
+            return self.jpeg_seq, self.jpeg
+
+    def stream(self, timeout=1.0):
+        """Generator that yields multipart MJPEG chunks for one viewer."""
+        with self.cond:
+            self.subscribers += 1
+            # whatever was published before this viewer came is nobody's backlog: render a fresh frame
+            self.taken_seq = self.seq
+
+        last_seq = 0
+        try:
+            while self.running:
+                with self.cond:
+                    self.cond.wait_for(lambda: self.seq > last_seq or not self.running, timeout)
+                    if self.seq <= last_seq:
+                        continue
+                    seq, frame = self.seq, self.frame
+                    self.taken_seq = max(self.taken_seq, seq)
+                    # frames published while this viewer was still busy sending are skipped
+                    if last_seq:
+                        self.skipped += seq - last_seq - 1
+                    # the producer must not render into this buffer while it is encoded
+                    self.in_use[id(frame)] = self.in_use.get(id(frame), 0) + 1
+
+                try:
+                    jpeg_seq, jpeg = self._encode(seq, frame)
+                finally:
+                    with self.cond:
+                        self._release(frame)
+                last_seq = max(seq, jpeg_seq)
+                if jpeg is None:
+                    continue
+
+                # blocks while the socket drains, which is this viewer's backpressure
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n')
+        finally:
+            with self.cond:
+                self.subscribers -= 1
+
+    def _release(self, frame):
+        count = self.in_use.pop(id(frame)) - 1
+        if count:
+            self.in_use[id(frame)] = count
+
+    def stats(self):
+        return {
+            "subscribers": self.subscribers,
+            "published": self.published,
+            "encoded": self.encoded,
+            "skipped": self.skipped,
+            "buffers_allocated": self.allocated,
+            "pool_size": len(self.pool),
+        }
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
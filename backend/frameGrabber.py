@@ -0,0 +1,141 @@
+import threading
+import time
+import cv2
+
+
+class FrameGrabber:
+    """
+    Latest-Frame-Wins Camera Capture.
+    - Reads the camera on its own thread, as fast as the driver delivers frames.
+    - Keeps only the newest frame in a single slot; unread older frames are dropped.
+    - Consumers always process the freshest frame, so a slow consumer never
+      makes the cursor follow a backlog of stale frames.
+    - set_max_fps caps the rate (idle mode): frames in between are grabbed but never
+      decoded, so the one that is decoded is still fresh.
+    - Frames are decoded into three reused buffers (being written, newest, held by the
+      consumer), so a frame from read() stays valid until the next read() and nothing is
+      allocated per frame.
+    """
+    def __init__(self, source=0, cam_w=640, cam_h=480, on_frame=None):
+        self.cap = cv2.VideoCapture(source)
+        # a recorded file ends for good, a webcam just hiccups
+        self.is_file = isinstance(source, str)
+        self.cap.set(3, cam_w)
+        self.cap.set(4, cam_h)
+        # ask the driver to keep as few frames queued as it can (not every backend honours this)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        # optional callback after every captured frame (e.g. to wake a worker pool)
+        self.on_frame = on_frame
+        # seconds between decoded frames (0 = every frame)
+        self.min_interval = 0.0
+        # the rate the camera (or file) says it runs at; 0 when it doesn't say
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.camera_interval = 1.0 / fps if fps and fps > 0 else 0.0
+        self.last_capture = 0.0
+
+        # single-slot buffer
+        self.cond = threading.Condition()
+        self.frame = None
+        self.frame_time = 0
+        self.seq = 0
+        self.last_read_seq = 0
+        self.buffers = []
+        self.reader_frame = None
+
+        # stats
+        self.captured = 0
+        self.dropped = 0
+        self.allocations = 0
+
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def _capture_loop(self):
+        while self.running and self.cap.isOpened():
+            # grab + retrieve is what cap.read() does; split, so a capped rate can skip the decode
+            if not self.cap.grab():
+                if self.is_file:
+                    break
+                time.sleep(0.005)
+                continue
+            capture_time = time.time()
+            if capture_time - self.last_capture < self.min_interval:
+                continue
+            buffer = self._free_buffer()
+            success, frame = self.cap.retrieve(buffer)
+            if not success:
+                continue
+            self.last_capture = capture_time
+            if frame is not buffer:
+                # first frames, or the camera changed size: OpenCV allocated, keep that one instead
+                if buffer is not None:
+                    self.buffers.remove(buffer)
+                if len(self.buffers) < 3:
+                    self.buffers.append(frame)
+                self.allocations += 1
+
+            with self.cond:
+                # the previous frame was never picked up by the consumer
+                if self.seq > self.last_read_seq:
+                    self.dropped += 1
+                self.frame = frame
+                self.frame_time = capture_time
+                self.seq += 1
+                self.captured += 1
+                self.cond.notify_all()
+            if self.on_frame:
+                self.on_frame()
+
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+
+    def _free_buffer(self):
+        """A buffer that is neither the newest frame nor the consumer's (None while there are fewer than three)."""
+        with self.cond:
+            for buffer in self.buffers:
+                if buffer is not self.frame and buffer is not self.reader_frame:
+                    return buffer
+        return None
+
+    def read(self, timeout=1.0):
+        """
+        Waits for a frame newer than the last one returned.
+        Returns (success, frame, capture_time) like cap.read(), plus the capture timestamp.
+        The frame is only valid until the next read().
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq > self.last_read_seq or not self.running, timeout)
+            if self.seq <= self.last_read_seq:
+                return False, None, 0
+
+            self.last_read_seq = self.seq
+            self.reader_frame = self.frame
+            return True, self.frame, self.frame_time
+
+    def set_max_fps(self, fps):
+        """Caps how many frames per second are decoded and handed out (None = as many as the camera delivers)."""
+        self.min_interval = 1.0 / fps if fps else 0.0
+
+    def frame_period(self):
+        """Seconds between the frames this source is meant to deliver: the max_fps cap or the camera's own rate, whichever is slower."""
+        return max(self.min_interval, self.camera_interval)
+
+    def has_frame(self):
+        """True when a frame newer than the last one returned is waiting (never blocks)."""
+        return self.seq > self.last_read_seq
+
+    def is_running(self):
+        return self.running
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        self.cap.release()
@@ -0,0 +1,281 @@
+import collections
+import re
+import threading
+import time
+import types
+
+# Prompts that start like this lean on the previous answer, so a cached reply to the same words could be wrong
+FOLLOW_UP_WORDS = {"it", "that", "this", "those", "these", "they", "them", "he", "she", "and", "also", "more", "again", "why", "what about", "how about"}
+
+
+def estimate_tokens(text):
+    # ~4 characters per token for English; good enough for a budget, and free (no count_tokens round trip)
+    return max(1, len(text) // 4)
+
+
+class ConversationHistory:
+    """
+    Rolling Conversation Context.
+    - Keeps the last exchanges (user prompt + model reply) so follow-up questions make sense.
+    - Token-budgeted: the oldest exchanges are dropped until history + new prompt fit max_tokens.
+    """
+    def __init__(self, max_tokens=2000, max_exchanges=20):
+        self.max_tokens = max_tokens
+        self.exchanges = collections.deque(maxlen=max_exchanges)
+        # exchanges left out of the last request to fit the budget
+        self.truncated = 0
+
+    def add(self, prompt, reply):
+        self.exchanges.append((prompt, reply, estimate_tokens(prompt) + estimate_tokens(reply)))
+
+    def clear(self):
+        self.exchanges.clear()
+
+    def contents(self, prompt):
+        """History + prompt as Gemini contents (oldest first), trimmed to the token budget."""
+        budget = self.max_tokens - estimate_tokens(prompt)
+        kept = []
+        for exchange in reversed(self.exchanges):
+            if exchange[2] > budget:
+                break
+            budget -= exchange[2]
+            kept.append(exchange)
+        self.truncated = len(self.exchanges) - len(kept)
+
+        contents = []
+        for user_text, reply, _ in reversed(kept):
+            contents.append({"role": "user", "parts": [{"text": user_text}]})
+            contents.append({"role": "model", "parts": [{"text": reply}]})
+        contents.append({"role": "user", "parts": [{"text": prompt}]})
+        return contents
+
+    def tokens(self):
+        return sum(exchange[2] for exchange in self.exchanges)
+
+
+class ResponseCache:
+    """
+    Normalized-Prompt Response Cache.
+    - "What time is it in Tokyo?" and "what time is it in tokyo" share an entry.
+    - Entries expire after ttl_s (answers go stale); past max_items the least recently used goes.
+    - Remembers how long each answer took, so hits can report the latency they saved.
+    """
+    def __init__(self, max_items=128, ttl_s=300.0):
+        self.max_items = max_items
+        self.ttl_s = ttl_s
+        self.lock = threading.Lock()
+        self.entries = collections.OrderedDict()
+
+        # stats
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.saved_ms = 0.0
+
+    @staticmethod
+    def normalize(prompt):
+        return " ".join(re.sub(r"[^\w\s]", " ", prompt.lower()).split())
+
+    @staticmethod
+    def cacheable(prompt):
+        """Follow-up questions depend on the conversation, so they are never cached."""
+        normalized = ResponseCache.normalize(prompt)
+        first_words = normalized.split()[:2]
+        return bool(first_words) and first_words[0] not in FOLLOW_UP_WORDS and " ".join(first_words) not in FOLLOW_UP_WORDS
+
+    def get(self, prompt, now=None):
+        """Returns the cached reply or None."""
+        key = self.normalize(prompt)
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and now - entry[1] > self.ttl_s:
+                del self.entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self.saved_ms += entry[2]
+            return entry[0]
+
+    def put(self, prompt, reply, latency_ms, now=None):
+        key = self.normalize(prompt)
+        with self.lock:
+            self.entries[key] = (reply, time.monotonic() if now is None else now, latency_ms)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_items:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "saved_ms": self.saved_ms,
+            }
+
+
+class GeminiChat:
+    """
+    One Place for Talking to Gemini.
+    - Holds a single genai.Client for the whole run, so its HTTP connection is reused
+      instead of re-negotiating TLS for every question.
+    - Every request carries the system instruction, the rolling history and a timeout.
+    - Standalone questions are answered from the ResponseCache when possible; a hit
+      still goes into the history so follow-ups keep working.
+    - Errors are raised to the caller and leave history and cache untouched.
+    """
+    def __init__(self, model_name, system_instruction=None, client=None, api_key=None, timeout_s=15.0, history=None, cache=None):
+        if client is None:
+            from google import genai
+            client = genai.Client(api_key=api_key, http_options={"timeout": int(timeout_s * 1000)})
+        self.client = client
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.timeout_s = timeout_s
+        self.history = history if history is not None else ConversationHistory()
+        self.cache = cache if cache is not None else ResponseCache()
+
+        # stats
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.last_latency_ms = None
+        self.last_cached = False
+
+    def _request(self, prompt):
+        config = {"http_options": {"timeout": int(self.timeout_s * 1000)}}
+        if self.system_instruction:
+            config["system_instruction"] = self.system_instruction
+        return {"model": self.model_name, "contents": self.history.contents(prompt), "config": config}
+
+    def _cached(self, prompt):
+        reply = self.cache.get(prompt) if self.cache.cacheable(prompt) else None
+        self.last_cached = reply is not None
+        if reply is not None:
+            self.last_latency_ms = 0.0
+            self.history.add(prompt, reply)
+        return reply
+
+    def _done(self, prompt, reply, start):
+        latency_ms = 1000 * (time.perf_counter() - start)
+        self.requests += 1
+        self.total_ms += latency_ms
+        self.last_latency_ms = latency_ms
+        self.history.add(prompt, reply)
+        if self.cache.cacheable(prompt):
+            self.cache.put(prompt, reply, latency_ms)
+
+    def generate(self, prompt):
+        """The whole reply as one string."""
+        reply = self._cached(prompt)
+        if reply is not None:
+            return reply
+
+        start = time.perf_counter()
+        try:
+            reply = self.client.models.generate_content(**self._request(prompt)).text or ""
+        except Exception:
+            self.errors += 1
+            raise
+        self._done(prompt, reply, start)
+        return reply
+
+    def generate_stream(self, prompt):
+        """Yields the reply as it is generated (a cached reply comes as one piece)."""
+        reply = self._cached(prompt)
+        if reply is not None:
+            yield reply
+            return
+
+        start = time.perf_counter()
+        pieces = []
+        try:
+            for chunk in self.client.models.generate_content_stream(**self._request(prompt)):
+                if chunk.text:
+                    pieces.append(chunk.text)
+                    yield chunk.text
+        except Exception:
+            self.errors += 1
+            raise
+        # a stream abandoned halfway (e.g. the session was cancelled) never gets here
+        self._done(prompt, "".join(pieces), start)
+
+    def reset(self):
+        """Forgets the conversation (the cache stays)."""
+        self.history.clear()
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_latency_ms": self.total_ms / self.requests if self.requests else 0.0,
+            "history_exchanges": len(self.history.exchanges),
+            "history_tokens": self.history.tokens(),
+            "history_truncated": self.history.truncated,
+            "cache": self.cache.stats(),
+        }
+
+
+class FakeGeminiModels:
+    """Stands in for client.models: replies with canned text, optionally with network-like delays."""
+    def __init__(self, reply="This is a test answer. It has a few sentences! Does it stream well? Yes it does.",
+                 first_token_delay=0.0, chunk_delay=0.0, chunk_chars=16):
+        self.reply = reply
+        self.first_token_delay = first_token_delay
+        self.chunk_delay = chunk_delay
+        self.chunk_chars = chunk_chars
+        self.requests = []
+
+    def generate_content_stream(self, model, contents, **kwargs):
+        self.requests.append(contents)
+        time.sleep(self.first_token_delay)
+        for i in range(0, len(self.reply), self.chunk_chars):
+            if i:
+                time.sleep(self.chunk_delay)
+            yield types.SimpleNamespace(text=self.reply[i:i + self.chunk_chars])
+
+    def generate_content(self, model, contents, **kwargs):
+        text = "".join(chunk.text for chunk in self.generate_content_stream(model, contents, **kwargs))
+        return types.SimpleNamespace(text=text)
+
+
+class FakeGeminiClient:
+    """Offline stand-in for genai.Client."""
+    def __init__(self, **kwargs):
+        self.models = FakeGeminiModels(**kwargs)
+
+
+if __name__ == "__main__":
+    # A scripted session against the offline fake model (400 ms to first token, like a real round trip)
+    questions = [
+        "What time is it in Tokyo?",
+        "And in London?",
+        "Open my calendar",
+        "what time is it in tokyo",
+        "Tell me a joke.",
+        "Why is that funny?",
+        "Open my calendar!",
+        "Tell me a joke",
+    ]
+    chat = GeminiChat("fake", system_instruction="Answer briefly.", client=FakeGeminiClient(first_token_delay=0.4), history=ConversationHistory(max_tokens=120))
+    for question in questions:
+        start = time.perf_counter()
+        "".join(chat.generate_stream(question))
+        sent = len(chat.client.models.requests[-1]) if not chat.last_cached else 0
+        print(f"{question:<28}{1000 * (time.perf_counter() - start):>7.0f} ms  {'cache hit' if chat.last_cached else f'sent {sent} contents'}")
+
+    stats = chat.stats()
+    cache = stats["cache"]
+    print(f"\n{stats['requests']} model requests, {cache['hits']} cache hits ({100 * cache['hit_rate']:.0f}% of cacheable questions), "
+          f"{cache['saved_ms']:.0f} ms saved; history {stats['history_tokens']} tokens, {stats['history_truncated']} exchanges left out of the last request")
@@ -1,51 +1,81 @@
 import speech_recognition as sr
 from dotenv import load_dotenv
-from google import genai
 import os
+import threading
 import time
-from elevenLabsBridge import ElevenLabsBridge
+from audioSink import SoundDeviceSink
+from audioSource import MicrophoneSource
+from elevenLabsBridge import ElevenLabsBridge, STREAM_SAMPLE_RATE
+from geminiChat import GeminiChat
+from speechCache import SpeechCache
+from speechPipeline import SpeechPipeline
+from utils import VoiceState
+from voiceActivity import VoiceListener
 from playsound import playsound
 
+BRAIN_ERROR_TEXT = "I am having trouble connecting to my brain."
+
+# Lines the assistant says often enough to synthesize ahead of time
+PREWARM_PHRASES = [
+    BRAIN_ERROR_TEXT,
+]
+
 
 class GeminiVoiceAssistant:
-    def __init__(self, gemini_key=None, model_name="gemini-flash-latest"):
+    def __init__(self, gemini_key=None, model_name="gemini-flash-latest", streaming_tts=True, audio_sink=None, tts_bridge=None, pipelined=True, client=None, audio_source=None):
         load_dotenv()
 
         # Setup Gemini
         self.api_key = gemini_key or os.getenv("GEMINI_API_KEY")
-        if not self.api_key:
+        if not self.api_key and client is None:
             raise ValueError("GEMINI_API_KEY is required.")
 
-        self.client = genai.Client(api_key=self.api_key)
         self.model_name = model_name
+        self.sys_instruct = "Respond in plain conversational text ONLY. No markdown, no bolding (**), no bullet points. Use full sentences. This is for text-to-speech."
+        # one client (reused connection, request timeouts) + conversation history + response cache
+        self.chat = GeminiChat(model_name, system_instruction=self.sys_instruct, client=client, api_key=self.api_key)
+        self.client = self.chat.client
 
-        # Setup Speech Recognition
+        # Setup Speech Recognition: the listener reads the microphone from now on, so its
+        # noise model is already calibrated when a session starts, and cuts each utterance at its end
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        self.listener = VoiceListener(audio_source or MicrophoneSource()).start()
+        # perf_counter() at the moment the user stopped talking
+        self.last_speech_end = None
 
         # Setup Text-to-Speech Bridge
         print("Connecting to ElevenLabs...")
-        self.tts_bridge = ElevenLabsBridge()
+        self.tts_bridge = tts_bridge or ElevenLabsBridge(cache=SpeechCache())
+        # fill the speech cache in the background so startup isn't delayed
+        threading.Thread(target=self.tts_bridge.prewarm, args=(PREWARM_PHRASES,), daemon=True).start()
 
-        self.sys_instruct = "Respond in plain conversational text ONLY. No markdown, no bolding (**), no bullet points. Use full sentences. This is for text-to-speech."
+        # Streaming plays audio chunks as they arrive instead of waiting for the whole file
+        self.streaming_tts = streaming_tts
+        self.audio_sink = audio_sink or SoundDeviceSink(sample_rate=STREAM_SAMPLE_RATE)
+        self.last_tts_metrics = None
+
+        # Pipelined mode speaks each sentence while Gemini is still writing the next one
+        self.pipelined = pipelined and streaming_tts
+        self.speech_pipeline = SpeechPipeline(self.tts_bridge, self.audio_sink)
 
-    def listen(self):
-        """Captures audio from the microphone and returns text."""
+    def listen(self, cancel_event=None):
+        """Captures one utterance from the microphone and returns text."""
         print("\n🎤 Listening... (Speak now)")
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            try:
-                audio = self.recognizer.listen(source, timeout=8)
-                print("Processing speech...")
-                text = self.recognizer.recognize_google(audio)
-                print(f"You said: {text}")
-                return text
-            except sr.WaitTimeoutError:
-                print("No speech detected.")
-            except sr.UnknownValueError:
-                print("Could not understand audio.")
-            except Exception as e:
-                print(f"Error: {e}")
+        utterance = self.listener.listen(timeout=8, cancel_event=cancel_event)
+        if utterance is None:
+            print("No speech detected.")
+            return None
+
+        self.last_speech_end = utterance.speech_end
+        print(f"Processing speech... (endpoint {1000 * (time.perf_counter() - utterance.speech_end):.0f} ms after you stopped)")
+        try:
+            text = self.recognizer.recognize_google(sr.AudioData(utterance.pcm, utterance.sample_rate, 2))
+            print(f"You said: {text}")
+            return text
+        except sr.UnknownValueError:
+            print("Could not understand audio.")
+        except Exception as e:
+            print(f"Error: {e}")
         return None
 
     def generate_response(self, prompt):
@@ -55,21 +85,63 @@ class GeminiVoiceAssistant:
 
         print("🧠 Gemini is thinking...")
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt
-            )
-            return response.text
+            reply = self.chat.generate(prompt)
+            self._report_latency()
+            return reply
+        except Exception as e:
+            print(f"Gemini API Error: {e}")
+            return BRAIN_ERROR_TEXT
+
+    def generate_response_stream(self, prompt):
+        """Sends text to Gemini and yields the response text as it is generated."""
+        if not prompt:
+            return
+
+        print("🧠 Gemini is thinking...")
+        try:
+            yield from self.chat.generate_stream(prompt)
+            self._report_latency()
         except Exception as e:
             print(f"Gemini API Error: {e}")
-            return "I am having trouble connecting to my brain."
+            yield BRAIN_ERROR_TEXT
 
-    def speak(self, text):
+    def _report_latency(self):
+        if self.chat.last_cached:
+            cache = self.chat.cache.stats()
+            print(f"Gemini: answered from cache ({cache['hits']} hits, {100 * cache['hit_rate']:.0f}% hit rate, {cache['saved_ms']:.0f} ms saved)")
+        else:
+            print(f"Gemini: {self.chat.last_latency_ms:.0f} ms")
+
+    def respond_pipelined(self, prompt, cancel_event=None, on_first_audio=None):
+        """Streams Gemini's answer into TTS sentence by sentence and plays it as it arrives."""
+        try:
+            reply, metrics = self.speech_pipeline.speak_stream(
+                self.generate_response_stream(prompt),
+                cancel_event=cancel_event,
+                speech_end_time=self.last_speech_end,
+                on_first_audio=on_first_audio
+            )
+        except Exception as e:
+            print(f"TTS Error: {e}")
+            return None
+
+        self.last_tts_metrics = metrics
+        print(f"Gemini says: {reply}")
+        if metrics["perceived_ms"] is not None:
+            print(f"Voice: first audio {metrics['perceived_ms']:.0f} ms after you stopped talking "
+                  f"({metrics['sentences']} sentences)")
+        return reply
+
+    def speak(self, text, cancel_event=None):
         """Uses ElevenLabs to generate audio and plays it."""
         if not text:
             return
 
         print("🔊 Generating voice...")
+        if self.streaming_tts:
+            self.speak_streaming(text, cancel_event=cancel_event)
+            return
+
         try:
             # 1. Get raw audio bytes from your Bridge
             audio_bytes = self.tts_bridge.generate_speech(text)
@@ -90,19 +162,60 @@ class GeminiVoiceAssistant:
         except Exception as e:
             print(f"TTS Error: {e}")
 
-    def run(self):
-        """Main interaction loop."""
+    def speak_streaming(self, text, cancel_event=None):
+        """Plays ElevenLabs audio while it is still being synthesized (no temp file)."""
+        try:
+            print(f"Gemini says: {text}")
+            metrics = self.tts_bridge.play_streaming(text, self.audio_sink, cancel_event=cancel_event)
+            self.last_tts_metrics = metrics
+            if metrics["ttfs_ms"] is not None:
+                print(f"TTS: first byte {metrics['ttfb_ms']:.0f} ms, first sound {metrics['ttfs_ms']:.0f} ms")
+        except Exception as e:
+            print(f"TTS Error: {e}")
 
-        user_text = self.listen()
-        if user_text:
+    def run(self, on_state=None, cancel_event=None):
+        """
+        Main interaction loop.
+        - on_state(VoiceState) is called as the session moves between stages.
+        - cancel_event (threading.Event) is checked between stages; a stage that
+          is already running (e.g. listening) finishes first. Streaming playback
+          also stops between audio chunks.
+        """
+        def set_state(state):
+            if on_state:
+                on_state(state)
+
+        def cancelled():
+            if cancel_event is not None and cancel_event.is_set():
+                print("Voice session cancelled.")
+                return True
+            return False
+
+        set_state(VoiceState.LISTENING)
+        user_text = self.listen(cancel_event=cancel_event)
+        if user_text and not cancelled():
             # Exit condition
             if "exit" in user_text.lower() or "stop" in user_text.lower():
                 print("Goodbye!")
+                self.chat.reset()
+                return
+
+            set_state(VoiceState.THINKING)
+            if self.pipelined:
+                self.respond_pipelined(
+                    user_text,
+                    cancel_event=cancel_event,
+                    on_first_audio=lambda: set_state(VoiceState.SPEAKING)
+                )
+                print("--- Ready to listen again ---\n")
                 return
 
-            ai_response = self.generate_response([self.sys_instruct, user_text])
+            ai_response = self.generate_response(user_text)
+            if cancelled():
+                return
             #print(ai_response)
-            self.speak(ai_response)
+            set_state(VoiceState.SPEAKING)
+            self.speak(ai_response, cancel_event=cancel_event)
 
             print("--- Ready to listen again ---\n")
 
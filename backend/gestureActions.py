@@ -0,0 +1,103 @@
+from handFeatures import INDEX_TIP, WRIST
+
+
+class GestureActions:
+    """
+    Gesture Action Handlers.
+    - Everything a gesture rule can do, by name (the "action" of a rule in gesture_rules.json).
+    - A handler gets the frame's FeatureContext, the rule's args and the current time,
+      and returns status text, or None to show the rule's own status.
+    - Anything timed uses ctx.timestamp (capture time), never the clock.
+    """
+    def __init__(self, mouse, voice_worker=None, on_quit=None):
+        self.mouse = mouse
+        self.voice_worker = voice_worker
+        self.on_quit = on_quit
+        # start time of the pinch the scroll / zoom anchor belongs to
+        self.scroll_pinch = None
+        self.zoom_pinch = None
+
+        self.handlers = {
+            "zoom": self.zoom,
+            "reset_zoom": self.reset_zoom,
+            "pinch": self.pinch,
+            "scroll": self.scroll,
+            "cursor": self.cursor,
+            "swipe": self.swipe,
+            "hotkey": self.hotkey,
+            "voice": self.voice,
+            "voice_cancel": self.voice_cancel,
+            "quit": self.quit,
+        }
+
+    def run(self, name, ctx, args, now):
+        return self.handlers[name](ctx, args, now)
+
+    def voice_active(self):
+        return self.voice_worker is not None and self.voice_worker.is_active()
+
+    # --- Two hands ---
+
+    def zoom(self, ctx, args, now):
+        # a new two-hand pinch zooms from where it started, not from where the last one ended
+        started = ctx.states.pinch_started(2)
+        if started != self.zoom_pinch:
+            self.zoom_pinch = started
+            self.mouse.zoom_anchor = None
+        zoom_result = self.mouse.perform_zoom(ctx.get("hands_distance"))
+        if zoom_result:
+            return f"Dual: {zoom_result}"
+        return None
+
+    def reset_zoom(self, ctx, args, now):
+        self.mouse.zoom_anchor = None
+
+    # --- One hand ---
+
+    def pinch(self, ctx, args, now):
+        """Pinch started or still held; the hand's PinchTracker times it for click vs scroll."""
+
+    def scroll(self, ctx, args, now):
+        # likewise, each pinch-hold scrolls from its own anchor
+        started = ctx.states.hand(0).since
+        if started != self.scroll_pinch:
+            self.scroll_pinch = started
+            self.mouse.scroll_anchor = None
+        _, index_tip_y_scaled = ctx.hands.scaled_point(0, INDEX_TIP)
+        self.mouse.perform_scroll(index_tip_y_scaled)
+
+    def cursor(self, ctx, args, now):
+        mouse = self.mouse
+        index_tip_x_scaled, index_tip_y_scaled = ctx.hands.scaled_point(0, INDEX_TIP)
+        mouse.move_cursor(index_tip_x_scaled, index_tip_y_scaled, ctx.timestamp)
+
+        # the pinch ended on this frame: a short one is a click, a long one was a scroll
+        # (click_max_s too small and tracking errors may click accidentally)
+        held = ctx.states.hand(0).released_after
+        if held is not None and held <= args.get("click_max_s", 0.2):
+            mouse.left_click()
+            return "Click"
+        return None
+
+    def swipe(self, ctx, args, now):
+        hand_x, hand_y = ctx.hands.scaled_point(0, WRIST)
+        return self.mouse.perform_swipe(hand_x, hand_y, ctx.timestamp)
+
+    def hotkey(self, ctx, args, now):
+        """args: {"keys": ["ctrl", "up"]}, for custom gestures (pair with a cooldown)."""
+        self.mouse.input.hotkey(*args["keys"])
+
+    # --- App ---
+
+    def voice(self, ctx, args, now):
+        # ignored while a session is already running
+        if self.voice_worker is not None:
+            self.voice_worker.trigger()
+
+    def voice_cancel(self, ctx, args, now):
+        if self.voice_worker is not None:
+            self.voice_worker.cancel()
+
+    def quit(self, ctx, args, now):
+        if self.on_quit:
+            self.on_quit()
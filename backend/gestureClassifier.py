@@ -0,0 +1,233 @@
+import collections
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from handFeatures import WRIST
+
+MIDDLE_MCP = 9
+
+
+def normalize_landmarks(points, cam_w=1.0, cam_h=1.0):
+    """
+    (hands x 21 x 3) or (21 x 3) normalized landmarks -> (hands x 63) embeddings that
+    don't change when the hand moves, gets closer/further or tilts in the image plane.
+    - translation: wrist at the origin
+    - scale: wrist to middle-finger knuckle (palm length) is 1
+    - rotation: that same palm axis points up
+    """
+    pts = np.asarray(points, dtype=np.float32)[..., :3]
+    if pts.ndim == 2:
+        pts = pts[None]
+    # x and y are normalized to different image sides, z roughly to the width
+    pts = pts * np.array([cam_w, cam_h, cam_w], dtype=np.float32)
+
+    centered = pts - pts[:, WRIST:WRIST + 1]
+    axis = centered[:, MIDDLE_MCP, :2]
+    palm = np.maximum(np.linalg.norm(axis, axis=1), 1e-6)
+    up_x, up_y = axis[:, 0] / palm, axis[:, 1] / palm
+
+    # coordinates along (perpendicular to, along) the palm axis
+    x = centered[:, :, 0] * up_y[:, None] - centered[:, :, 1] * up_x[:, None]
+    y = centered[:, :, 0] * up_x[:, None] + centered[:, :, 1] * up_y[:, None]
+    rotated = np.stack([x, y, centered[:, :, 2]], axis=2) / palm[:, None, None]
+    return rotated.reshape(len(rotated), -1)
+
+
+class GestureClassifier:
+    """
+    k-NN Custom Gesture Classifier.
+    - Every enrolled sample is one row of a float32 matrix; a query is one matrix-vector
+      product against it (with the squared norms cached), then argpartition for the k nearest.
+    - Returns no label when the neighbours disagree (confidence below threshold) or the
+      nearest sample is too far away to be the same pose.
+    - Saved as a plain .npz (no pickle), which loads in a few milliseconds.
+    """
+    def __init__(self, k=5, threshold=0.6, max_distance=1.0):
+        self.k = k
+        self.threshold = threshold
+        self.max_distance = max_distance
+        self.label_names = []
+        self.embeddings = np.empty((0, 63), dtype=np.float32)
+        self.label_ids = np.empty(0, dtype=np.int32)
+        self.sq_norms = np.empty(0, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.embeddings)
+
+    def add_samples(self, label, embeddings):
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(-1, self.embeddings.shape[1])
+        if label not in self.label_names:
+            self.label_names.append(label)
+        label_id = self.label_names.index(label)
+        self.embeddings = np.concatenate([self.embeddings, embeddings])
+        self.label_ids = np.concatenate([self.label_ids, np.full(len(embeddings), label_id, dtype=np.int32)])
+        self.sq_norms = np.einsum("ij,ij->i", self.embeddings, self.embeddings)
+
+    def remove_label(self, label):
+        if label not in self.label_names:
+            return False
+        label_id = self.label_names.index(label)
+        keep = self.label_ids != label_id
+        self.embeddings = self.embeddings[keep]
+        # ids above the removed one shift down by one
+        self.label_ids = self.label_ids[keep] - (self.label_ids[keep] > label_id)
+        self.sq_norms = self.sq_norms[keep]
+        del self.label_names[label_id]
+        return True
+
+    def counts(self):
+        counts = np.bincount(self.label_ids, minlength=len(self.label_names))
+        return dict(zip(self.label_names, counts.tolist()))
+
+    def classify(self, embedding):
+        """Returns (label or None, confidence) for one embedding."""
+        if not len(self.embeddings):
+            return None, 0.0
+
+        k = min(self.k, len(self.embeddings))
+        sq_dist = self.sq_norms - 2 * (self.embeddings @ embedding) + embedding @ embedding
+        nearest = np.argpartition(sq_dist, k - 1)[:k]
+
+        votes = np.bincount(self.label_ids[nearest], minlength=len(self.label_names))
+        best = int(votes.argmax())
+        confidence = votes[best] / k
+        closest = np.sqrt(max(float(sq_dist[nearest].min()), 0.0))
+        if confidence < self.threshold or (self.max_distance is not None and closest > self.max_distance):
+            return None, float(confidence)
+        return self.label_names[best], float(confidence)
+
+    def save(self, path):
+        # write to a temp file in the same directory, then atomically swap it in
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, embeddings=self.embeddings, label_ids=self.label_ids, label_names=np.array(self.label_names, dtype=str))
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def load(self, path):
+        with np.load(path, allow_pickle=False) as data:
+            self.embeddings = data["embeddings"].astype(np.float32)
+            self.label_ids = data["label_ids"].astype(np.int32)
+            self.label_names = data["label_names"].tolist()
+        self.sq_norms = np.einsum("ij,ij->i", self.embeddings, self.embeddings)
+
+
+class GestureVoter:
+    """Temporal voting: a label only counts once it won min_votes of the last window frames."""
+    def __init__(self, window=5, min_votes=3, max_gap=0.5):
+        self.history = collections.deque(maxlen=window)
+        self.min_votes = min_votes
+        self.max_gap = max_gap
+        self.last_time = None
+
+    def vote(self, label, timestamp):
+        # the hand left the frame for a while: old votes don't count
+        if self.last_time is not None and timestamp - self.last_time > self.max_gap:
+            self.history.clear()
+        self.last_time = timestamp
+
+        self.history.append(label)
+        winner, votes = collections.Counter(self.history).most_common(1)[0]
+        if winner is not None and votes >= self.min_votes:
+            return winner
+        return None
+
+    def reset(self):
+        self.history.clear()
+        self.last_time = None
+
+
+class CustomGestures:
+    """
+    User-Trained Gestures.
+    - Enrollment: start_recording(label, n) takes the next n one-hand results as samples
+      and saves the index when done.
+    - Recognition: update() classifies the first hand and passes the label through a GestureVoter.
+    - Enrollment calls come from Flask threads, recognition from the vision loop, hence the lock.
+    """
+    def __init__(self, path, cam_w, cam_h, k=5, threshold=0.6, max_distance=1.0, window=5, min_votes=3):
+        self.path = path
+        self.cam_w, self.cam_h = cam_w, cam_h
+        self.classifier = GestureClassifier(k=k, threshold=threshold, max_distance=max_distance)
+        self.voter = GestureVoter(window=window, min_votes=min_votes)
+        self.lock = threading.Lock()
+
+        # enrollment in progress
+        self.recording_label = None
+        self.recording_target = 0
+        self.recorded = []
+
+        if os.path.exists(path):
+            try:
+                self.classifier.load(path)
+                print(f"Loaded {len(self.classifier)} custom gesture samples ({', '.join(self.classifier.label_names)})")
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Custom gestures not loaded from {path}: {e}")
+
+    def is_recording(self):
+        return self.recording_label is not None
+
+    def start_recording(self, label, samples=30):
+        if samples <= 0:
+            raise ValueError(f"samples must be positive, not {samples}")
+        with self.lock:
+            self.recording_label = label
+            self.recording_target = samples
+            self.recorded = []
+            self.voter.reset()
+
+    def record(self, hands):
+        """Adds the first hand as a sample; returns a status line for the overlay."""
+        with self.lock:
+            label = self.recording_label
+            if label is None:
+                return None
+            if hands.count == 1:
+                self.recorded.append(normalize_landmarks(hands.points[0], self.cam_w, self.cam_h)[0])
+            done = len(self.recorded) >= self.recording_target
+            status = f"Recording '{label}' {len(self.recorded)}/{self.recording_target}"
+            if done:
+                self.classifier.add_samples(label, np.array(self.recorded))
+                self.recording_label = None
+                self.recorded = []
+
+        if done:
+            self._save()
+        return status
+
+    def remove(self, label):
+        with self.lock:
+            removed = self.classifier.remove_label(label)
+        if removed:
+            self._save()
+        return removed
+
+    def _save(self):
+        try:
+            self.classifier.save(self.path)
+        except OSError as e:
+            print(f"Custom gestures not saved: {e}")
+
+    def update(self, points, timestamp):
+        """Classifies one hand ((21 x 3) landmarks) and returns (voted label or None, raw confidence)."""
+        if not len(self.classifier):
+            return None, 0.0
+        with self.lock:
+            label, confidence = self.classifier.classify(normalize_landmarks(points, self.cam_w, self.cam_h)[0])
+            return self.voter.vote(label, timestamp), confidence
+
+    def stats(self):
+        with self.lock:
+            return {
+                "labels": self.classifier.counts(),
+                "recording": self.recording_label,
+                "recorded": len(self.recorded),
+                "target": self.recording_target,
+            }
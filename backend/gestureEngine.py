@@ -1,9 +1,19 @@
+import threading
+import time
+import cv2
 import mediapipe as mp
+import numpy as np
 
-from utils import Utils
+from engineResults import EngineResults
+from framePreprocessor import mirror_landmarks
+from metrics import NullMetrics
 
-class GestureEngine:
-    def __init__(self, model_path):
+FULL_FRAME = (0.0, 0.0, 1.0, 1.0)
+# the dummy warm-up frame; real timestamps are capture times in ms, always far later
+WARM_UP_TIMESTAMP = 1
+
+class GestureEngine(EngineResults):
+    def __init__(self, model_path, roi_tracking=False, roi_padding=0.35, min_roi_size=0.3, roi_max_side=320, search_width=None, full_search_interval=15, metrics=None, on_result=None, mirror=False):
         # config the gesture model
         self.mp_options = mp.tasks.vision.GestureRecognizerOptions(
             base_options=mp.tasks.BaseOptions(model_asset_path=model_path),
@@ -13,38 +23,157 @@ class GestureEngine:
         )
         self.recognizer = mp.tasks.vision.GestureRecognizer.create_from_options(self.mp_options)
         self.latest_result = None
+        self.metrics = metrics or NullMetrics()
+        # optional hook called with (result, timestamp) on MediaPipe's thread, e.g. to ship results to another process
+        self.on_result = on_result
+        # frames come in unflipped: mirror the landmarks instead, so results are in the selfie view
+        # (handedness labels, which nothing here reads, still describe the raw image)
+        self.mirror = mirror
+
+        # versioned handoff from MediaPipe's thread: every result is taken at most once
+        self.result_lock = threading.Lock()
+        self.latest_timestamp = 0
+        self.result_version = 0
+        self.taken_version = 0
+        self.stale_results = 0
+        # vectorized features of latest_result, built at most once per result
+        self.features = None
+
+        # ROI tracking: crop around last frame's hands instead of sending the full frame
+        self.roi_tracking = roi_tracking
+        self.roi_padding = roi_padding              # extra space around the hands, relative to their box
+        self.min_roi_size = min_roi_size            # smallest crop, as a fraction of the frame
+        self.roi_max_side = roi_max_side            # crops bigger than this (px) are downscaled
+        self.search_width = search_width            # downscale the full frame to this width while searching
+        self.full_search_interval = full_search_interval  # every N frames look at the whole frame for new hands
+        self.roi = None
+        self.frames_since_search = 0
+        # region (x, y, w, h) each submitted timestamp was cropped to, so results can be mapped back
+        self.roi_lock = threading.Lock()
+        self.pending_regions = {}
+
+        # set when the warm-up frame's (ignored) result comes back
+        self.warmed_up = threading.Event()
+
+    def warm_up(self, width=640, height=480, timeout=5.0):
+        """
+        Runs one blank frame through the recognizer so the first real frame doesn't pay for
+        graph and delegate initialization. Blocks until it is done (or timeout s); returns the ms it took.
+        """
+        start = time.perf_counter()
+        blank = np.zeros((height, width, 3), dtype=np.uint8)
+        self.recognizer.recognize_async(mp.Image(image_format=mp.ImageFormat.SRGB, data=blank), WARM_UP_TIMESTAMP)
+        if not self.warmed_up.wait(timeout):
+            print(f"Gesture model warm-up still running after {timeout:.0f} s")
+        return 1000 * (time.perf_counter() - start)
 
     def result_callback(self, result, image, timestamp):
-        self.latest_result = result
+        if timestamp == WARM_UP_TIMESTAMP:
+            # nothing to act on and no real latency to record
+            self.warmed_up.set()
+            return
+        # timestamps are capture times in ms, so this is capture -> result
+        self.metrics.record("inference_lag", time.time() * 1000 - timestamp)
+        self.metrics.tick("results")
+        if self.roi_tracking:
+            with self.roi_lock:
+                region = self.pending_regions.pop(timestamp, FULL_FRAME)
+                # frames the recognizer skipped never get a callback
+                for stale in [ts for ts in self.pending_regions if ts < timestamp]:
+                    del self.pending_regions[stale]
+
+            if region != FULL_FRAME:
+                self._to_full_frame(result, region)
+            self.roi = self._next_roi(result)
+        # after the ROI: crops are taken from the raw frame, so it stays in raw coordinates
+        if self.mirror:
+            mirror_landmarks(result)
+
+        with self.result_lock:
+            self.latest_result = result
+            self.latest_timestamp = timestamp
+            self.result_version += 1
+
+        if self.on_result:
+            self.on_result(result, timestamp)
+
+    def take_result(self, now_ms, max_age_ms=None):
+        """
+        Returns (result, capture timestamp ms) for a result that hasn't been taken yet,
+        or (None, 0) when there is nothing new.
+        - A result is handed out once, so the same landmarks can never act twice.
+        - Results captured more than max_age_ms ago (e.g. after a stall) are dropped.
+        """
+        with self.result_lock:
+            if self.result_version == self.taken_version:
+                return None, 0
+            self.taken_version = self.result_version
+            result, timestamp = self.latest_result, self.latest_timestamp
+
+        if self.is_stale(timestamp, now_ms, max_age_ms):
+            return None, 0
+        return result, timestamp
 
     def process_frame(self, frame_timestamp_ms, mp_image):
-        self.recognizer.recognize_async(mp_image, frame_timestamp_ms)
-
-    def get_landmarks(self):
-        if self.latest_result and self.latest_result.hand_landmarks:
-            return self.latest_result.hand_landmarks
-        return []
-    
-    def is_pinching(self, landmarks):
-        """Checks if Thumb and Index finger are touching."""
-        thumb_tip = landmarks[4]
-        index_tip = landmarks[8]
-
-        dist = Utils.calc_distance(index_tip, thumb_tip)
-        return dist < 0.03
-
-    def count_fingers_up(self, landmarks):
-        """Returns the number of fingers extended."""
-        # https://mediapipe.readthedocs.io/en/latest/solutions/hands.html
-        # check the numberings for specific finger config
-        tips = [8, 12, 16, 20]
-        pips = [6, 10, 14, 18]
-        
-        up_count = 0
-        
-        # check 4 fingers (excluding thumb for simplicity in mode switching)
-        for tip, pip in zip(tips, pips):
-            if landmarks[tip].y < landmarks[pip].y:
-                up_count += 1
-                
-        return up_count
\ No newline at end of file
+        with self.metrics.timer("submit"):
+            self.recognizer.recognize_async(mp_image, frame_timestamp_ms)
+
+    def process_rgb(self, frame_timestamp_ms, rgb_frame):
+        """Submits an RGB frame, cropped to the tracked hands when ROI tracking is on."""
+        if not self.roi_tracking:
+            self.process_frame(frame_timestamp_ms, mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame))
+            return
+
+        h, w, _ = rgb_frame.shape
+        roi = self.roi
+        self.frames_since_search += 1
+
+        if roi is None or self.frames_since_search >= self.full_search_interval:
+            # tracking lost (or periodic check for a new hand): search the whole frame
+            self.frames_since_search = 0
+            region = FULL_FRAME
+            image = rgb_frame
+            if self.search_width and w > self.search_width:
+                image = cv2.resize(rgb_frame, (self.search_width, int(h * self.search_width / w)), interpolation=cv2.INTER_AREA)
+        else:
+            x0, y0 = int(roi[0] * w), int(roi[1] * h)
+            x1, y1 = int(roi[2] * w), int(roi[3] * h)
+            region = (x0 / w, y0 / h, (x1 - x0) / w, (y1 - y0) / h)
+            image = rgb_frame[y0:y1, x0:x1]
+
+            longest = max(x1 - x0, y1 - y0)
+            if longest > self.roi_max_side:
+                scale = self.roi_max_side / longest
+                image = cv2.resize(image, (int((x1 - x0) * scale), int((y1 - y0) * scale)), interpolation=cv2.INTER_AREA)
+            else:
+                image = np.ascontiguousarray(image)
+
+        with self.roi_lock:
+            self.pending_regions[frame_timestamp_ms] = region
+        self.process_frame(frame_timestamp_ms, mp.Image(image_format=mp.ImageFormat.SRGB, data=image))
+
+    @staticmethod
+    def _to_full_frame(result, region):
+        """Maps landmarks from crop-normalized to full-frame-normalized coordinates (in place)."""
+        rx, ry, rw, rh = region
+        for hand_lms in result.hand_landmarks:
+            for lm in hand_lms:
+                lm.x = rx + lm.x * rw
+                lm.y = ry + lm.y * rh
+
+    def _next_roi(self, result):
+        """Padded box around every detected hand, or None when tracking is lost."""
+        if not result.hand_landmarks:
+            return None
+
+        xs = [lm.x for hand_lms in result.hand_landmarks for lm in hand_lms]
+        ys = [lm.y for hand_lms in result.hand_landmarks for lm in hand_lms]
+        cx, cy = (min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2
+        half_w = max((max(xs) - min(xs)) * (1 + 2 * self.roi_padding), self.min_roi_size) / 2
+        half_h = max((max(ys) - min(ys)) * (1 + 2 * self.roi_padding), self.min_roi_size) / 2
+
+        x0, y0 = max(0.0, cx - half_w), max(0.0, cy - half_h)
+        x1, y1 = min(1.0, cx + half_w), min(1.0, cy + half_h)
+        if x1 - x0 <= 0 or y1 - y0 <= 0:
+            return None
+        return (x0, y0, x1, y1)
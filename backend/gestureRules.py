@@ -0,0 +1,279 @@
+import json
+import math
+import os
+import time
+
+from handFeatures import INDEX_TIP
+from handState import PINCH_ENTER, PINCH_EXIT, HandStates
+from utils import GestureMode
+
+
+def _top_category(hands):
+    result = hands.result
+    if result is not None and result.gestures and result.gestures[0]:
+        return result.gestures[0][0]
+    return None
+
+
+def _gesture(ctx):
+    category = _top_category(ctx.hands)
+    return category.category_name if category else None
+
+
+def _gesture_score(ctx):
+    category = _top_category(ctx.hands)
+    return category.score if category else 0.0
+
+
+def _hands_distance(ctx):
+    # index tip to index tip, as a fraction of the camera width
+    x1, y1 = ctx.hands.scaled_point(0, INDEX_TIP)
+    x2, y2 = ctx.hands.scaled_point(1, INDEX_TIP)
+    return math.hypot(x2 - x1, y2 - y1) / ctx.hands.cam_w
+
+
+def _custom_gesture_result(ctx):
+    # one classification (and one vote) per frame, shared by both custom_gesture features
+    values = ctx.values
+    if "_custom" not in values:
+        custom = ctx.custom_gestures
+        values["_custom"] = custom.update(ctx.hands.points[0], ctx.timestamp) if custom else (None, 0.0)
+    return values["_custom"]
+
+
+# Everything a rule condition can refer to. Features describe the first hand unless the name says otherwise.
+FEATURES = {
+    "hand_count": lambda ctx: ctx.hands.count,
+    "gesture": _gesture,
+    "gesture_score": _gesture_score,
+    "fingers_up": lambda ctx: int(ctx.hands.fingers_up[0]),
+    "pinching": lambda ctx: ctx.states.hand(0).pinched,
+    "pinch_held_s": lambda ctx: ctx.states.hand(0).held_for(ctx.timestamp),
+    "pinch_distance": lambda ctx: float(ctx.hands.pinch_dist[0]),
+    "all_pinching": lambda ctx: ctx.states.all_pinching(ctx.hands.count),
+    "hands_distance": _hands_distance,
+    "voice_active": lambda ctx: ctx.actions.voice_active(),
+    "custom_gesture": lambda ctx: _custom_gesture_result(ctx)[0],
+    "custom_gesture_confidence": lambda ctx: _custom_gesture_result(ctx)[1],
+}
+
+# Features that keep history between frames (temporal voting): when any rule uses them
+# they are updated every frame, not only when a rule happens to reach them.
+STATEFUL_FEATURES = {"custom_gesture", "custom_gesture_confidence"}
+
+
+class FeatureContext:
+    """One frame's features, each computed the first time a condition (or handler) asks for it."""
+    __slots__ = ("hands", "actions", "timestamp", "states", "custom_gestures", "values")
+
+    def __init__(self, hands, actions, timestamp, states, custom_gestures=None):
+        self.hands = hands
+        self.actions = actions
+        self.timestamp = timestamp
+        self.states = states
+        self.custom_gestures = custom_gestures
+        self.values = {}
+
+    def get(self, name):
+        values = self.values
+        if name in values:
+            return values[name]
+        value = values[name] = FEATURES[name](self)
+        return value
+
+
+def _compile_condition(feature, expected):
+    """A single "feature": expected entry -> predicate(ctx)."""
+    if feature not in FEATURES:
+        raise ValueError(f"unknown feature '{feature}' (choose from {', '.join(FEATURES)})")
+
+    if isinstance(expected, dict):
+        unknown = set(expected) - {"min", "max"}
+        if unknown:
+            raise ValueError(f"'{feature}' range only takes min/max, not {', '.join(sorted(unknown))}")
+        lo, hi = expected.get("min"), expected.get("max")
+        if any(bound is not None and (isinstance(bound, bool) or not isinstance(bound, (int, float))) for bound in (lo, hi)):
+            raise ValueError(f"'{feature}' min/max must be numbers")
+
+        def in_range(ctx):
+            value = ctx.get(feature)
+            return value is not None and (lo is None or value >= lo) and (hi is None or value <= hi)
+        return in_range
+
+    if isinstance(expected, list):
+        allowed = frozenset(expected)
+        return lambda ctx: ctx.get(feature) in allowed
+
+    return lambda ctx: ctx.get(feature) == expected
+
+
+class Rule:
+    __slots__ = ("name", "conditions", "hold", "cooldown", "action", "args", "status", "mode", "keep_going", "since", "last_fired")
+
+    def __init__(self, name, conditions, hold, cooldown, action, args, status, mode, keep_going):
+        self.name = name
+        self.conditions = conditions
+        self.hold = hold
+        self.cooldown = cooldown
+        self.action = action
+        self.args = args
+        self.status = status
+        self.mode = mode
+        self.keep_going = keep_going
+        # when the conditions started holding, and when the rule last fired
+        self.since = None
+        self.last_fired = -math.inf
+
+    def matches(self, ctx):
+        for condition in self.conditions:
+            if not condition(ctx):
+                return False
+        return True
+
+
+class RuleEngine:
+    """
+    Declarative Gesture Rules.
+    - Rules come from a JSON file and are compiled into a dispatch table keyed by
+      hand count, so a frame only looks at the rules for the hands it has.
+    - Rules are tried in file order; the first one that fires ends the frame unless
+      it says "continue". Conditions run in the order written and stop at the first
+      miss, so features behind a failed condition are never computed.
+    - The file is re-read when it changes; a broken edit is reported and the
+      previous rules stay active.
+    - Holds and cooldowns are timed on the frame's capture timestamp, and pinches go
+      through per-hand state machines (handState.py), so rules behave the same at any frame rate.
+    """
+    def __init__(self, path, actions, reload_interval=1.0, custom_gestures=None, pinch_enter=PINCH_ENTER, pinch_exit=PINCH_EXIT):
+        self.path = path
+        self.actions = actions
+        self.reload_interval = reload_interval
+        self.custom_gestures = custom_gestures
+        self.states = HandStates(enter=pinch_enter, exit=pinch_exit)
+        self.table = {}
+        self.stateful = ()
+        self.mtime = None
+        self.last_check = 0.0
+        self.load()
+
+    def load(self):
+        mtime = os.stat(self.path).st_mtime
+        with open(self.path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        self.table = self.compile(config)
+        referenced = {feature for spec in config["rules"] for feature in spec.get("when", {})}
+        self.stateful = tuple(referenced & STATEFUL_FEATURES)
+        self.mtime = mtime
+        print(f"Loaded {sum(len(rules) for rules in self.table.values())} gesture rules from {self.path}")
+
+    def compile(self, config):
+        """Rules by hand count. Any mistake in the file's structure is a ValueError naming the rule."""
+        if not isinstance(config, dict) or not isinstance(config.get("rules"), list):
+            raise ValueError('expected {"rules": [...]}')
+
+        table = {}
+        for i, spec in enumerate(config["rules"]):
+            if not isinstance(spec, dict):
+                raise ValueError(f"rule {i + 1}: expected an object, not {type(spec).__name__}")
+            name = spec.get("name", f"rule {i + 1}")
+            try:
+                rule = self._compile_rule(name, spec)
+                hands = spec.get("hands", 1)
+                counts = [int(count) for count in (hands if isinstance(hands, list) else [hands])]
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"rule '{name}': {e}") from e
+
+            for count in counts:
+                table.setdefault(count, []).append(rule)
+        return table
+
+    def _compile_rule(self, name, spec):
+        action = spec.get("action")
+        if action is not None and action not in self.actions.handlers:
+            raise ValueError(f"unknown action '{action}' (choose from {', '.join(self.actions.handlers)})")
+        mode = spec.get("mode")
+        if mode is not None:
+            if mode not in GestureMode.__members__:
+                raise ValueError(f"unknown mode '{mode}'")
+            mode = GestureMode[mode]
+
+        when = spec.get("when", {})
+        if not isinstance(when, dict):
+            raise ValueError(f'"when" must map features to values, not {type(when).__name__}')
+        args = spec.get("args", {})
+        if not isinstance(args, dict):
+            raise ValueError(f'"args" must be an object, not {type(args).__name__}')
+
+        conditions = [_compile_condition(feature, expected) for feature, expected in when.items()]
+        return Rule(
+            name=name,
+            conditions=conditions,
+            hold=float(spec.get("hold", 0)),
+            cooldown=float(spec.get("cooldown", 0)),
+            action=action,
+            args=args,
+            status=spec.get("status"),
+            mode=mode,
+            keep_going=bool(spec.get("continue", False)),
+        )
+
+    def maybe_reload(self, now=None):
+        """Reloads the rules if the file changed; checks at most every reload_interval seconds."""
+        now = time.time() if now is None else now
+        if now - self.last_check < self.reload_interval:
+            return False
+        self.last_check = now
+
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return False
+        if mtime == self.mtime:
+            return False
+
+        try:
+            self.load()
+            return True
+        except (OSError, ValueError) as e:
+            # don't retry the same broken file every second
+            self.mtime = mtime
+            print(f"Gesture rules not reloaded, keeping the previous ones: {e}")
+            return False
+
+    def evaluate(self, hands, now, timestamp=None, status="Idle", mode=GestureMode.NONE):
+        """
+        Runs the rules for one recognizer result and returns the (status, mode) to show.
+        timestamp is the frame's capture time (s); now (decision time) stands in without one.
+        """
+        t = now if timestamp is None else timestamp
+        # every result moves the hand states, even one no rule is written for (e.g. no hands)
+        self.states.update(hands, t)
+        matched = set()
+        rules = self.table.get(hands.count)
+        if rules:
+            ctx = FeatureContext(hands, self.actions, t, self.states, self.custom_gestures)
+            for feature in self.stateful:
+                ctx.get(feature)
+            for rule in rules:
+                if not rule.matches(ctx):
+                    continue
+                matched.add(rule)
+                if rule.since is None:
+                    rule.since = t
+                if t - rule.since < rule.hold or t - rule.last_fired < rule.cooldown:
+                    continue
+
+                rule.last_fired = t
+                handler_status = self.actions.run(rule.action, ctx, rule.args, now) if rule.action else None
+                status = handler_status or rule.status or status
+                mode = rule.mode or mode
+                if not rule.keep_going:
+                    break
+
+        # a hold only counts frames in a row: every rule that didn't match this frame starts over,
+        # including the ones for other hand counts and the ones after the rule that fired
+        for table_rules in self.table.values():
+            for rule in table_rules:
+                if rule not in matched:
+                    rule.since = None
+        return status, mode
@@ -0,0 +1,262 @@
+import collections
+import struct
+import time
+
+import numpy as np
+
+from cursorFilters import make_filter
+from gestureActions import GestureActions
+from gestureRules import RuleEngine
+from handFeatures import HandFeatures
+from inputDispatcher import FakeInputBackend, InputDispatcher
+from mouseControl import MouseController
+from visionProcess import Category, RemoteResult
+import utils
+
+# File: header, then records. A record is a type byte followed by its body.
+FILE_HEADER = struct.Struct("<4sHHH")    # magic, version, cam_w, cam_h
+FRAME_HEADER = struct.Struct("<ddB")     # capture timestamp (ms), decision time (s), hands
+HAND_GESTURE = struct.Struct("<hf")      # gesture name id (-1 = none), score
+NAME_HEADER = struct.Struct("<HB")       # name id, utf-8 length
+MAGIC = b"JGTR"
+VERSION = 1
+RECORD_FRAME = 0
+RECORD_NAME = 1
+
+TraceFrame = collections.namedtuple("TraceFrame", "timestamp_ms now result")
+
+
+class TraceRecorder:
+    """
+    Gesture Trace Recorder.
+    - Saves every recognizer result (landmarks as float32, top gesture per hand) with its
+      capture timestamp and the time it was acted on, so a replay makes the same decisions.
+    - Gesture names are written once and then referred to by id: ~260 bytes per hand per frame.
+    """
+    def __init__(self, path, cam_w, cam_h):
+        self.path = path
+        self.file = open(path, "wb")
+        self.file.write(FILE_HEADER.pack(MAGIC, VERSION, cam_w, cam_h))
+        self.name_ids = {}
+        self.frames = 0
+
+    def _name_id(self, name):
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = self.name_ids[name] = len(self.name_ids)
+            encoded = name.encode("utf-8")[:255]
+            self.file.write(bytes([RECORD_NAME]) + NAME_HEADER.pack(name_id, len(encoded)) + encoded)
+        return name_id
+
+    def record(self, result, timestamp_ms, now):
+        """result: a recognizer result (or anything with hand_landmarks and gestures)."""
+        points = HandFeatures.to_array(result.hand_landmarks).astype(np.float32)
+        hands = len(points)
+        gestures = []
+        for i in range(hands):
+            top = result.gestures[i][0] if i < len(result.gestures) and result.gestures[i] else None
+            gestures.append(HAND_GESTURE.pack(self._name_id(top.category_name), top.score) if top else HAND_GESTURE.pack(-1, 0.0))
+
+        self.file.write(bytes([RECORD_FRAME]) + FRAME_HEADER.pack(timestamp_ms, now, hands) + b"".join(gestures) + points.tobytes())
+        self.frames += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+            print(f"Gesture trace: {self.frames} frames saved to {self.path}")
+
+
+def read_trace(path):
+    """Returns (cam_w, cam_h, [TraceFrame]) with results shaped like GestureEngine's."""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, version, cam_w, cam_h = FILE_HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: not a version {VERSION} gesture trace")
+
+    names = {}
+    frames = []
+    offset = FILE_HEADER.size
+    while offset < len(data):
+        record_type = data[offset]
+        offset += 1
+        if record_type == RECORD_NAME:
+            name_id, length = NAME_HEADER.unpack_from(data, offset)
+            offset += NAME_HEADER.size
+            names[name_id] = data[offset:offset + length].decode("utf-8")
+            offset += length
+            continue
+        if record_type != RECORD_FRAME:
+            raise ValueError(f"{path}: unknown record type {record_type} at byte {offset - 1}")
+
+        timestamp_ms, now, hands = FRAME_HEADER.unpack_from(data, offset)
+        offset += FRAME_HEADER.size
+        gestures = []
+        for _ in range(hands):
+            name_id, score = HAND_GESTURE.unpack_from(data, offset)
+            offset += HAND_GESTURE.size
+            gestures.append([Category(names[name_id], score)] if name_id >= 0 else [])
+        points = np.frombuffer(data, dtype=np.float32, count=hands * 63, offset=offset).reshape(hands, 21, 3)
+        offset += points.nbytes
+        frames.append(TraceFrame(timestamp_ms, now, RemoteResult(points, gestures)))
+    return cam_w, cam_h, frames
+
+
+def write_trace(path, cam_w, cam_h, frames):
+    recorder = TraceRecorder(path, cam_w, cam_h)
+    for frame in frames:
+        recorder.record(frame.result, frame.timestamp_ms, frame.now)
+    recorder.file.close()
+
+
+class _ReplayVoiceWorker:
+    """Counts voice triggers instead of starting sessions."""
+    def __init__(self):
+        self.triggers = 0
+        self.cancels = 0
+
+    def trigger(self):
+        self.triggers += 1
+        return True
+
+    def cancel(self):
+        self.cancels += 1
+
+    def is_active(self):
+        return False
+
+
+def replay(frames, cam_w, cam_h, rules_path="./gesture_rules.json", cursor_filter="one_euro", screen_w=1920, screen_h=1080, realtime=False):
+    """
+    Feeds recorded results through the live decision path (HandFeatures -> RuleEngine ->
+    GestureActions -> MouseController) with a fake input backend, at the recorded times.
+    Returns a report: decision latency, actions emitted, throughput, statuses and cursor targets.
+    """
+    dispatcher = InputDispatcher(FakeInputBackend())
+    mouse = MouseController(smooting_factor=utils.SMOOTHING_FACTOR, margin=utils.MARGIN, cam_w=cam_w, cam_h=cam_h, screen_w=screen_w, screen_h=screen_h,
+                            key_zoom_in=utils.KEY_ZOOM_IN, key_zoom_out=utils.KEY_ZOOM_OUT, key_swipe_left=utils.KEY_SWIPE_LEFT, key_swipe_right=utils.KEY_SWIPE_RIGHT,
+                            dispatcher=dispatcher, cursor_filter=make_filter(cursor_filter))
+    mouse.start_trace()
+    voice = _ReplayVoiceWorker()
+    quits = []
+    actions = GestureActions(mouse, voice, on_quit=lambda: quits.append(1))
+    rules = RuleEngine(rules_path, actions)
+
+    latencies = []
+    statuses = collections.Counter()
+    status_changes = []
+    status, mode = "Idle", utils.GestureMode.NONE
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        if realtime and i:
+            time.sleep(max(0.0, frame.now - frames[i - 1].now))
+        decide_start = time.perf_counter()
+        hands = HandFeatures(frame.result.hand_landmarks, cam_w, cam_h)
+        hands.result = frame.result
+        status, mode = rules.evaluate(hands, frame.now, frame.timestamp_ms / 1000)
+        latencies.append(1000 * (time.perf_counter() - decide_start))
+
+        statuses[status] += 1
+        if not status_changes or status_changes[-1][1] != status:
+            status_changes.append((i, status))
+    elapsed = time.perf_counter() - start
+
+    dispatcher.stop()
+    emitted = collections.Counter(dispatcher.actions)
+    emitted["voice"] = voice.triggers
+    emitted["quit"] = len(quits)
+    cursor = np.array(mouse.trace, dtype=np.float64).reshape(-1, 3)
+
+    return {
+        "frames": len(frames),
+        "decision_ms": dict(zip(("p50", "p95", "p99", "max"), np.percentile(latencies, [50, 95, 99, 100]).tolist())) if latencies else {},
+        "frames_per_s": len(frames) / elapsed if elapsed > 0 else 0.0,
+        "actions": {name: count for name, count in sorted(emitted.items()) if count},
+        "statuses": dict(statuses),
+        "status_changes": status_changes,
+        "cursor": cursor,
+    }
+
+
+# --- Synthetic trace (no camera needed) ---
+
+def hand_pose(x, y, fingers=(True, False, False, False), pinch=False, size=0.18):
+    """
+    (21 x 3) normalized landmarks of an upright hand with its knuckles at (x, y).
+    fingers: index, middle, ring, pinky extended; pinch puts the thumb tip on the index tip.
+    """
+    points = np.zeros((21, 3))
+    points[0] = (x, y + 0.5 * size, 0)
+    for finger, up in enumerate(fingers):
+        base = 5 + 4 * finger
+        fx = x + (finger - 1.5) * 0.18 * size
+        points[base] = (fx, y, 0)                                       # knuckle
+        points[base + 1] = (fx, y - 0.3 * size, 0)                      # pip
+        if up:
+            points[base + 2] = (fx, y - 0.45 * size, 0)
+            points[base + 3] = (fx, y - 0.6 * size, 0)                  # tip above the pip
+        else:
+            points[base + 2] = (fx, y - 0.2 * size, 0)
+            points[base + 3] = (fx, y - 0.1 * size, 0)                  # folded back below it
+    for joint in range(1, 5):
+        points[joint] = (x - 0.35 * size * joint / 4 - 0.15 * size, y + 0.3 * size - 0.1 * size * joint, 0)
+    if pinch:
+        points[4] = points[8] + (0.005, 0.005, 0)
+    return points
+
+
+def synthetic_frames(fps=30.0, seed=0, noise=0.002):
+    """A scripted session that exercises every built-in rule: cursor, click, scroll, swipe, voice, zoom, quit."""
+    rng = np.random.default_rng(seed)
+    script = []
+
+    def add(count, make, gesture="None"):
+        for i in range(count):
+            hands = make(i / max(count - 1, 1))
+            script.append((np.array(hands), [gesture] * len(hands)))
+
+    point = (True, False, False, False)
+    add(60, lambda s: [hand_pose(0.3 + 0.4 * s, 0.5 + 0.1 * np.sin(6 * s))], "Pointing_Up")   # cursor sweep
+    add(4, lambda s: [hand_pose(0.7, 0.5, point, pinch=True)])                               # quick pinch...
+    add(10, lambda s: [hand_pose(0.7, 0.5, point)], "Pointing_Up")                           # ...released: click
+    add(30, lambda s: [hand_pose(0.5, 0.6 - 0.2 * s, point, pinch=True)])                    # pinch held: scroll
+    add(10, lambda s: [hand_pose(0.5, 0.4, point)], "Pointing_Up")
+    add(10, lambda s: [hand_pose(0.5, 0.5, (True,) * 4)], "Open_Palm")                       # open palm...
+    add(10, lambda s: [hand_pose(0.1, 0.5, (True,) * 4)], "Open_Palm")                       # ...at the edge: swipe
+    add(10, lambda s: [])
+    add(5, lambda s: [hand_pose(0.5, 0.5, (True, False, False, True))], "ILoveYou")          # voice
+    add(10, lambda s: [])
+    add(40, lambda s: [hand_pose(0.45 - 0.15 * s, 0.5, point, pinch=True),                   # both hands pinching,
+                       hand_pose(0.55 + 0.15 * s, 0.5, point, pinch=True)])                  # moving apart: zoom
+    add(3, lambda s: [hand_pose(0.5, 0.5, (False,) * 4)], "Thumb_Down")                      # quit
+
+    frames = []
+    start = 1_700_000_000.0
+    for i, (points, names) in enumerate(script):
+        t = start + i / fps
+        if len(points):
+            points = points + rng.normal(0, noise, points.shape)
+        gestures = [[Category(name, 0.9)] for name in names]
+        # decided ~40 ms after capture, like the live loop
+        frames.append(TraceFrame(t * 1000, t + 0.04, RemoteResult(points.astype(np.float32).reshape(-1, 21, 3), gestures)))
+    return frames
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python gestureTrace.py [trace file]: replays it (or a synthetic session) and prints what happened
+    if len(sys.argv) > 1:
+        cam_w, cam_h, frames = read_trace(sys.argv[1])
+        print(f"Trace: {sys.argv[1]} ({len(frames)} frames)")
+    else:
+        cam_w, cam_h, frames = utils.CAM_W, utils.CAM_H, synthetic_frames()
+        print(f"Synthetic session ({len(frames)} frames)")
+
+    report = replay(frames, cam_w, cam_h)
+    d = report["decision_ms"]
+    print(f"Decision latency: p50 {d['p50']:.3f} ms, p95 {d['p95']:.3f} ms, max {d['max']:.3f} ms; {report['frames_per_s']:.0f} frames/s")
+    print(f"Actions: {report['actions']}")
+    for frame, status in report["status_changes"]:
+        print(f"  frame {frame:>4}: {status}")
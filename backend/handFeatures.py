@@ -0,0 +1,75 @@
+from functools import cached_property
+
+import numpy as np
+
+# https://mediapipe.readthedocs.io/en/latest/solutions/hands.html
+WRIST = 0
+THUMB_TIP = 4
+INDEX_TIP = 8
+FINGER_TIPS = [8, 12, 16, 20]
+FINGER_PIPS = [6, 10, 14, 18]
+PALM_POINTS = [0, 5, 9, 13, 17]
+
+PINCH_THRESHOLD = 0.03
+
+
+class HandFeatures:
+    """
+    Per-Frame Vectorized Hand Features.
+    - Converts every hand in a result into one (hands x 21 x 3) array, once per frame.
+    - Pinch distance, finger extension, palm centre and camera-scaled coordinates
+      for all hands come out of a few array ops instead of per-landmark attribute access.
+    - Each feature is computed on first access and memoized, so a frame only pays
+      for the features something actually reads.
+    """
+    def __init__(self, hand_landmarks, cam_w, cam_h, pinch_threshold=PINCH_THRESHOLD):
+        # the recognizer result these features came from (set by GestureEngine)
+        self.result = None
+        self.points = self.to_array(hand_landmarks)
+        self.count = len(self.points)
+        self.cam_w, self.cam_h = cam_w, cam_h
+        self.pinch_threshold = pinch_threshold
+
+    @cached_property
+    def pinch_dist(self):
+        # thumb tip to index tip, in normalized image coords
+        return np.linalg.norm(self.points[:, THUMB_TIP, :2] - self.points[:, INDEX_TIP, :2], axis=1)
+
+    @cached_property
+    def pinching(self):
+        return self.pinch_dist < self.pinch_threshold
+
+    @cached_property
+    def finger_up(self):
+        # 4 fingers (excluding thumb for simplicity in mode switching); tip above pip = extended
+        return self.points[:, FINGER_TIPS, 1] < self.points[:, FINGER_PIPS, 1]
+
+    @cached_property
+    def fingers_up(self):
+        return self.finger_up.sum(axis=1)
+
+    @cached_property
+    def palm_center(self):
+        return self.points[:, PALM_POINTS, :2].mean(axis=1)
+
+    @cached_property
+    def scaled(self):
+        # landmarks in camera pixels (hands x 21 x 2)
+        return self.points[:, :, :2] * np.array([self.cam_w, self.cam_h], dtype=np.float64)
+
+    @staticmethod
+    def to_array(hand_landmarks):
+        """MediaPipe landmark lists -> float array of shape (hands, 21, 3). Arrays are passed through."""
+        if isinstance(hand_landmarks, np.ndarray):
+            return hand_landmarks.astype(np.float64, copy=False)
+        if not hand_landmarks:
+            return np.empty((0, 21, 3), dtype=np.float64)
+        return np.array([[(lm.x, lm.y, lm.z) for lm in hand_lms] for hand_lms in hand_landmarks], dtype=np.float64)
+
+    def scaled_point(self, hand, index):
+        """(x, y) of one landmark in camera pixels, as plain floats."""
+        x, y = self.scaled[hand, index]
+        return float(x), float(y)
+
+    def all_pinching(self):
+        return self.count > 0 and bool(self.pinching.all())
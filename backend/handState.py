@@ -0,0 +1,122 @@
+from handFeatures import PINCH_THRESHOLD
+
+# A pinch starts below PINCH_ENTER and only ends above PINCH_EXIT (thumb tip to index tip,
+# normalized image coords), so landmark jitter around a single threshold can't flicker it
+PINCH_ENTER = PINCH_THRESHOLD
+PINCH_EXIT = 0.045
+
+
+class PinchTracker:
+    """
+    Pinch State Machine (one hand).
+    - open -> pinched when the distance drops below enter; pinched -> open only once it
+      rises above exit (hysteresis).
+    - Timed on capture timestamps, so a pinch lasts as long at 10 fps as at 60.
+    - On the frame a pinch ends, released_after is how long it was held (click vs. hold).
+    """
+    def __init__(self, enter=PINCH_ENTER, exit=PINCH_EXIT):
+        self.enter = enter
+        self.exit = exit
+        self.pinched = False
+        # capture time (s) the current pinch started
+        self.since = None
+        self.released_after = None
+
+    def update(self, dist, timestamp):
+        self.released_after = None
+        if not self.pinched and dist < self.enter:
+            self.pinched = True
+            self.since = timestamp
+        elif self.pinched and dist > self.exit:
+            self.pinched = False
+            self.released_after = timestamp - self.since
+            self.since = None
+
+    def held_for(self, timestamp):
+        return timestamp - self.since if self.pinched else 0.0
+
+    def reset(self):
+        """The hand left the frame: whatever it was doing is over, without a release."""
+        self.pinched = False
+        self.since = None
+        self.released_after = None
+
+
+class HandStates:
+    """
+    Per-Hand Temporal State.
+    - One PinchTracker per hand slot, in the recognizer's hand order.
+    - When the number of hands changes the recognizer may reorder them, so every slot starts over.
+    - Updated once per recognizer result (by the RuleEngine), before any rule runs.
+    """
+    def __init__(self, max_hands=2, enter=PINCH_ENTER, exit=PINCH_EXIT):
+        self.trackers = [PinchTracker(enter, exit) for _ in range(max_hands)]
+        self.count = 0
+
+    def update(self, hands, timestamp):
+        if hands.count != self.count:
+            self.count = hands.count
+            for tracker in self.trackers:
+                tracker.reset()
+        if hands.count:
+            dists = hands.pinch_dist
+            for i, tracker in enumerate(self.trackers[:hands.count]):
+                tracker.update(float(dists[i]), timestamp)
+
+    def hand(self, index):
+        return self.trackers[index]
+
+    def all_pinching(self, count):
+        return count > 0 and all(tracker.pinched for tracker in self.trackers[:count])
+
+    def pinch_started(self, count):
+        """When the first `count` hands were all pinching (the latest of their starts), or None."""
+        if not self.all_pinching(count):
+            return None
+        return max(tracker.since for tracker in self.trackers[:count])
+
+
+class HandPresence:
+    """
+    Idle Duty-Cycling.
+    - After idle_after_s (capture time) without a hand, the session goes idle and its
+      source only delivers idle_fps frames per second, which also throttles inference.
+    - The first result with a hand in it ends idle mode and the source is back at full rate.
+    - Gestures are timed on capture timestamps, so a lower rate doesn't change what they do.
+    """
+    def __init__(self, idle_after_s=3.0, idle_fps=5):
+        self.idle_after_s = idle_after_s
+        self.idle_fps = idle_fps
+        self.idle = False
+        self.last_seen = None
+        self.idle_since = None
+
+        # stats
+        self.idle_periods = 0
+        self.idle_s = 0.0
+
+    def update(self, hand_count, timestamp):
+        """Returns True when this result switched idle mode on or off."""
+        if hand_count:
+            self.last_seen = timestamp
+            if self.idle:
+                self.idle = False
+                self.idle_s += timestamp - self.idle_since
+                return True
+            return False
+
+        if self.last_seen is None:
+            self.last_seen = timestamp
+        if not self.idle and self.idle_after_s is not None and timestamp - self.last_seen >= self.idle_after_s:
+            self.idle = True
+            self.idle_since = timestamp
+            self.idle_periods += 1
+            return True
+        return False
+
+    def max_fps(self):
+        """The rate to ask the source for: idle_fps while idle, None (unlimited) otherwise."""
+        return self.idle_fps if self.idle else None
+
+    def stats(self):
+        return {"idle": int(self.idle), "idle_periods": self.idle_periods, "idle_s": round(self.idle_s, 1)}
@@ -0,0 +1,161 @@
+import collections
+import threading
+import time
+
+
+class PyAutoGuiBackend:
+    """Sends input events to the OS through pyautogui."""
+    def __init__(self):
+        import pyautogui
+        pyautogui.PAUSE = 0
+        self.pyautogui = pyautogui
+
+    def move_to(self, x, y):
+        self.pyautogui.moveTo(x, y, _pause=False)
+
+    def click(self):
+        self.pyautogui.click(_pause=False)
+
+    def scroll(self, clicks):
+        self.pyautogui.scroll(clicks)
+
+    def hotkey(self, *keys):
+        self.pyautogui.hotkey(*keys)
+
+
+class NullInputBackend:
+    """Drops every input event (sessions that don't own the OS cursor); keeps only the last cursor target."""
+    def __init__(self):
+        self.position = (0, 0)
+
+    def move_to(self, x, y):
+        self.position = (x, y)
+
+    def click(self):
+        pass
+
+    def scroll(self, clicks):
+        pass
+
+    def hotkey(self, *keys):
+        pass
+
+
+class FakeInputBackend:
+    """Records every input event in memory instead of touching the OS (for tests and replays; grows without bound)."""
+    def __init__(self):
+        self.events = []
+        self.position = (0, 0)
+
+    def move_to(self, x, y):
+        self.position = (x, y)
+        self.events.append(("move_to", x, y))
+
+    def click(self):
+        self.events.append(("click",))
+
+    def scroll(self, clicks):
+        self.events.append(("scroll", clicks))
+
+    def hotkey(self, *keys):
+        self.events.append(("hotkey",) + tuple(keys))
+
+
+class InputDispatcher:
+    """
+    Non-Blocking Input Injection.
+    - Actions are queued and executed on a dispatcher thread, so slow OS input
+      calls (hotkey, moveTo) never stall frame processing.
+    - Consecutive cursor moves collapse into the newest target.
+    - Clicks, scrolls and hotkeys are never dropped and keep their order.
+    """
+    def __init__(self, backend=None):
+        self.backend = backend or PyAutoGuiBackend()
+
+        self.cond = threading.Condition()
+        self.queue = collections.deque()
+        self.busy = False
+
+        # stats
+        self.dispatched = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+        self.actions = collections.Counter()
+        self.latencies = collections.deque(maxlen=200)
+
+        self.running = True
+        self.thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self.thread.start()
+
+    def move_to(self, x, y):
+        self._submit("move_to", (x, y))
+
+    def click(self):
+        self._submit("click", ())
+
+    def scroll(self, clicks):
+        self._submit("scroll", (clicks,))
+
+    def hotkey(self, *keys):
+        self._submit("hotkey", keys)
+
+    def _submit(self, action, args):
+        with self.cond:
+            self.actions[action] += 1
+            # a move that hasn't been sent yet is already stale, replace it with the new target
+            if action == "move_to" and self.queue and self.queue[-1][0] == "move_to":
+                self.queue[-1] = (action, args, time.perf_counter())
+                self.coalesced += 1
+            else:
+                self.queue.append((action, args, time.perf_counter()))
+
+            self.max_queue_depth = max(self.max_queue_depth, len(self.queue))
+            self.cond.notify()
+
+    def _dispatch_loop(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.queue or not self.running)
+                if not self.queue:
+                    break
+                action, args, queued_at = self.queue.popleft()
+                self.busy = True
+
+            try:
+                getattr(self.backend, action)(*args)
+            except Exception as e:
+                self.errors += 1
+                print(f"Input Error ({action}): {e}")
+
+            with self.cond:
+                self.busy = False
+                self.dispatched += 1
+                self.latencies.append(time.perf_counter() - queued_at)
+                self.cond.notify_all()
+
+    def flush(self, timeout=1.0):
+        """Waits until every queued action has been sent to the backend."""
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.queue and not self.busy, timeout)
+
+    def stats(self):
+        with self.cond:
+            latencies = list(self.latencies)
+            return {
+                "queue_depth": len(self.queue),
+                "max_queue_depth": self.max_queue_depth,
+                "dispatched": self.dispatched,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "avg_latency_ms": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+                "max_latency_ms": 1000 * max(latencies) if latencies else 0.0,
+                "actions": dict(self.actions),
+            }
+
+    def stop(self):
+        """Sends whatever is still queued, then stops the dispatcher thread."""
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        self.thread.join(timeout=1.0)
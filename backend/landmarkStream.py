@@ -0,0 +1,187 @@
+import asyncio
+import json
+import struct
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+import cv2
+import numpy as np
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+# Message types (first byte of every binary message)
+MSG_LANDMARKS = 1
+MSG_VIDEO = 2
+
+# type, seq, capture time (s), hands, mode, voice state, status length; then the status (utf-8)
+# and hands x 21 x (x, y) float32 in normalized, already mirrored image coords
+LANDMARK_HEADER = struct.Struct("<BIdBBBH")
+# type, seq, capture time (s); then the JPEG bytes
+VIDEO_HEADER = struct.Struct("<BId")
+
+
+class _Client:
+    __slots__ = ("connection", "video", "landmarks", "frame", "wake")
+
+    def __init__(self, connection, video):
+        self.connection = connection
+        self.video = video
+        # newest unsent message per channel; a slow client only ever gets the latest
+        self.landmarks = None
+        self.frame = None
+        self.wake = asyncio.Event()
+
+
+class LandmarkStreamServer:
+    """
+    Landmark-Only WebSocket Stream.
+    - Pushes a few hundred bytes of binary landmarks, status and mode per frame
+      instead of an annotated JPEG; the client draws the overlay itself.
+    - Clients connecting with ?video=1 also get a small, low-rate JPEG of the raw camera.
+    - Runs its own asyncio loop on a daemon thread; publish() never waits on a socket.
+    - Every client has one slot per channel, so a slow client skips to the newest message.
+    """
+    def __init__(self, host="0.0.0.0", port=5175, video_fps=5, video_width=320, cam_w=640, cam_h=480, margin=0):
+        self.host = host
+        self.port = port
+        self.video_interval = 1.0 / video_fps if video_fps else None
+        self.video_width = video_width
+        # sent once as JSON when a client connects
+        self.config = {"cam_w": cam_w, "cam_h": cam_h, "margin": margin, "video_fps": video_fps}
+
+        self.loop = None
+        self.stop_event = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.clients = set()
+        self.video_clients = 0
+
+        self.seq = 0
+        self.video_seq = 0
+        self.last_video_time = 0.0
+
+        # stats
+        self.sent = 0
+        self.skipped = 0
+        self.bytes_sent = 0
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except OSError as e:
+            print(f"Landmark Stream Error: {e}")
+        finally:
+            self.ready.set()
+
+    async def _serve(self):
+        self.loop = asyncio.get_running_loop()
+        self.stop_event = asyncio.Event()
+        # landmarks are float32 noise to deflate, compression would only cost CPU
+        async with serve(self._handler, self.host, self.port, compression=None):
+            print(f"Landmark stream on ws://{self.host}:{self.port}")
+            self.ready.set()
+            await self.stop_event.wait()
+
+    async def _handler(self, connection):
+        query = parse_qs(urlparse(connection.request.path).query) if connection.request else {}
+        client = _Client(connection, query.get("video", ["0"])[0] == "1")
+        self.clients.add(client)
+        if client.video:
+            self.video_clients += 1
+
+        sender = asyncio.create_task(self._send_loop(client))
+        try:
+            await connection.send(json.dumps(self.config))
+            # clients don't send anything, this just waits for them to leave
+            async for _ in connection:
+                pass
+        finally:
+            sender.cancel()
+            self.clients.discard(client)
+            if client.video:
+                self.video_clients -= 1
+
+    async def _send_loop(self, client):
+        try:
+            while True:
+                await client.wake.wait()
+                client.wake.clear()
+                for slot in ("landmarks", "frame"):
+                    message = getattr(client, slot)
+                    if message is None:
+                        continue
+                    setattr(client, slot, None)
+                    # waits while the socket drains, which is this client's backpressure
+                    await client.connection.send(message)
+                    self.sent += 1
+                    self.bytes_sent += len(message)
+        except ConnectionClosed:
+            pass
+
+    def _deliver(self, slot, message, video_only):
+        for client in self.clients:
+            if video_only and not client.video:
+                continue
+            if getattr(client, slot) is not None:
+                self.skipped += 1
+            setattr(client, slot, message)
+            client.wake.set()
+
+    def has_clients(self):
+        return bool(self.clients)
+
+    def publish(self, points, status, mode, voice_state, capture_time):
+        """
+        Sends the overlay for one frame to every client.
+        points: (hands x 21 x 2+) normalized landmarks, mode and voice_state: enum values.
+        """
+        if not self.clients or self.loop is None:
+            return
+        self.seq += 1
+        status_bytes = status.encode("utf-8")[:0xFFFF]
+        xy = np.ascontiguousarray(points[:, :, :2], dtype="<f4")
+        message = LANDMARK_HEADER.pack(MSG_LANDMARKS, self.seq, capture_time, len(xy), mode, voice_state, len(status_bytes)) + status_bytes + xy.tobytes()
+        self.loop.call_soon_threadsafe(self._deliver, "landmarks", message, False)
+
+    def wants_video(self, now=None):
+        """True when a video client is connected and the next low-rate frame is due."""
+        if not self.video_clients or self.video_interval is None:
+            return False
+        now = time.time() if now is None else now
+        return now - self.last_video_time >= self.video_interval
+
+    def publish_frame(self, frame, capture_time):
+        """Downscales and encodes one camera frame for the video clients (call when wants_video())."""
+        if self.loop is None:
+            return
+        self.last_video_time = time.time()
+        h, w = frame.shape[:2]
+        if self.video_width and w > self.video_width:
+            frame = cv2.resize(frame, (self.video_width, int(h * self.video_width / w)), interpolation=cv2.INTER_AREA)
+        flag, encoded_image = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
+        if not flag:
+            return
+        self.video_seq += 1
+        message = VIDEO_HEADER.pack(MSG_VIDEO, self.video_seq, capture_time) + encoded_image.tobytes()
+        self.loop.call_soon_threadsafe(self._deliver, "frame", message, True)
+
+    def stats(self):
+        return {
+            "clients": len(self.clients),
+            "video_clients": self.video_clients,
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "bytes_sent": self.bytes_sent,
+        }
+
+    def stop(self):
+        if self.loop is not None and self.stop_event is not None:
+            self.loop.call_soon_threadsafe(self.stop_event.set)
+        if self.thread:
+            self.thread.join(timeout=1.0)
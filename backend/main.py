@@ -1,29 +1,70 @@
-import math
-import os
 import time
-import cv2
-import mediapipe as mp
-import pyautogui
+# startup milestones (see --startup-benchmark) are measured from here, before the heavy imports
+PROCESS_START = time.perf_counter()
+import json
+import sys
 import threading
 
 # Your custom modules
+from frameBroadcaster import FrameBroadcaster
+from frameGrabber import FrameGrabber
+from cursorFilters import make_filter
+from gestureActions import GestureActions
+from gestureClassifier import CustomGestures
 from gestureEngine import GestureEngine
-from geminiVoiceAssistant import GeminiVoiceAssistant
+from gestureRules import RuleEngine
+from gestureTrace import TraceRecorder
+from landmarkStream import LandmarkStreamServer
+from handFeatures import HandFeatures
+from handState import HandPresence
 from mouseControl import MouseController
-from utils import Utils
-from flask import Flask, Response
+from overlay import draw_overlay
+from utils import GestureMode, Utils
+from visionProcess import VisionProcesses
+from voiceWorker import VoiceAssistantWorker
+from inputDispatcher import InputDispatcher, NullInputBackend
+from session import Session, SessionRegistry
+from metrics import create_metrics
+from flask import Flask, Response, jsonify, request
+from werkzeug.serving import make_server
 
 # --- CONFIGURATION ---
 CAM_W, CAM_H = 640, 480
-SCREEN_W, SCREEN_H = pyautogui.size()
+SCREEN_W, SCREEN_H = None, None  # None = ask the OS on the first cursor move
+
+# Camera sources, one pipeline each (a camera index or a video file);
+# the first one drives the mouse, voice assistant and landmark stream
+CAMERA_SOURCES = [
+    {"name": "main", "source": 0},
+]
+SESSION_WORKERS = None  # frame-processing threads shared by all sessions (None = one per CPU core)
 
 # Performance Tuners
-pyautogui.PAUSE = 0
 SMOOTHING_FACTOR = 2
 MARGIN = 100
 SCROLL_SENSITIVITY = 35
 ZOOM_THRESHOLD = 0.05
 SWIPE_THRESHOLD = 50
+CURSOR_FILTER = "one_euro"  # "moving_average" (uses SMOOTHING_FACTOR), "one_euro" or "kalman"
+CURSOR_PREDICTION_MS = 0    # extrapolate the cursor ahead to hide pipeline latency
+CURSOR_TRACE_PATH = None    # e.g. "cursor_trace.csv" to record raw targets for cursorFilters.py
+GESTURE_TRACE_PATH = None   # e.g. "traces/session.trace" to record recognizer results for gestureTrace.py / replayBenchmark.py
+MAX_RESULT_AGE_MS = 150  # landmarks captured longer ago than this never drive the mouse...
+STALE_AFTER_FRAMES = 1.5  # ...unless the source is meant to be slower than that (idle mode, low-fps cameras): then this many frame periods
+ROI_TRACKING = False  # crop inference to the tracked hands (faster on CPU-only machines)
+GESTURE_RULES_PATH = "./gesture_rules.json"  # gesture -> action rules, reloaded when the file changes
+CUSTOM_GESTURES_PATH = "./custom_gestures.npz"  # samples recorded through POST /gestures/<label>
+VISION_PROCESSES = False  # capture + inference in worker processes (shared-memory frames), off the Flask GIL
+IDLE_AFTER_S = 3.0  # no hands for this long: capture + inference drop to IDLE_FPS until a hand shows up (None = never)
+IDLE_FPS = 5
+VIDEO_FEED_FPS = 15  # most overlay frames rendered for /video_feed; none at all while nobody watches
+METRICS_ENABLED = True  # per-stage timers + /metrics route; False turns every timer into a no-op
+LANDMARK_STREAM_PORT = 5175  # WebSocket with landmarks + status for client-side overlays (None disables)
+LANDMARK_VIDEO_FPS = 5       # raw camera frames for ws clients that ask for ?video=1
+LANDMARK_VIDEO_WIDTH = 320
+MODEL_WARM_UP = True       # run a blank frame through the model before the camera's first frame
+STARTUP_BENCHMARK = False  # set by --startup-benchmark: exit after the first cursor move
+VOICE_PREWARM_DELAY = 3.0  # build the voice assistant in the background this long after startup (None = on first use)
 
 # Key Mappings
 KEY_ZOOM_IN = ('command', '+')  # Adjusted for tuple unpacking if needed
@@ -35,187 +76,310 @@ KEY_SWIPE_RIGHT = ('ctrl', 'right')
 app = Flask(__name__)
 
 # --- GLOBAL STATE ---
-output_frame = None
-lock = threading.Lock()
+# set by Thumb_Down: the vision loop winds everything down and stops the web server
+shutdown_requested = threading.Event()
+http_server = None
+metrics = create_metrics(enabled=METRICS_ENABLED, origin=PROCESS_START)
+metrics.mark("imports")
+# Latest annotated frame, encoded once and fanned out to every /video_feed viewer
+broadcaster = FrameBroadcaster(metrics=metrics, max_fps=VIDEO_FEED_FPS)
+metrics.gauge("stream", broadcaster.stats)
+# Landmarks + status only, the client draws the overlay (much cheaper than MJPEG)
+landmark_stream = LandmarkStreamServer(port=LANDMARK_STREAM_PORT, video_fps=LANDMARK_VIDEO_FPS, video_width=LANDMARK_VIDEO_WIDTH, cam_w=CAM_W, cam_h=CAM_H, margin=MARGIN)
+metrics.gauge("landmark_stream", landmark_stream.stats)
+# One pipeline per camera source, all run by one bounded worker pool
+sessions = SessionRegistry(workers=SESSION_WORKERS)
+# User-trained gestures (k-NN over normalized landmarks), usable in rules as "custom_gesture", e.g.
+# {"name": "custom_peace", "when": {"custom_gesture": "peace"}, "cooldown": 1.0, "action": "hotkey", "args": {"keys": ["ctrl", "up"]}}
+# (the classifier only runs on every frame once a rule refers to it)
+custom_gestures = CustomGestures(CUSTOM_GESTURES_PATH, CAM_W, CAM_H)
+
+
+def make_cursor_filter():
+    if CURSOR_FILTER == "moving_average":
+        return make_filter(CURSOR_FILTER, window=SMOOTHING_FACTOR)
+    return make_filter(CURSOR_FILTER)
+
+
+def create_voice_assistant():
+    # imported here: speech_recognition, google-genai and elevenlabs are slow to load
+    from geminiVoiceAssistant import GeminiVoiceAssistant
+    return GeminiVoiceAssistant()
+
+
+def assistant_stats(voice_worker, read):
+    # only once the assistant exists; asking must not build it
+    return read(voice_worker.assistant) if voice_worker.is_ready() else {}
+
+
+def create_session(name, source, primary, voice_worker):
+    """
+    Builds the pipeline for one camera source. The primary session moves the real
+    mouse, drives voice and reports into the app-wide /video_feed and /metrics.
+    """
+    session_metrics = metrics if primary else create_metrics(enabled=METRICS_ENABLED)
+    session_broadcaster = broadcaster if primary else FrameBroadcaster(metrics=session_metrics, max_fps=VIDEO_FEED_FPS)
+    if not primary:
+        session_metrics.gauge("stream", session_broadcaster.stats)
+
+    # Initialize Logic Components
+    # Note: Ensure paths to .task files are correct relative to where you run this script
+    if VISION_PROCESSES:
+        # capture and inference live in worker processes; this one acts, draws and serves
+        vision = VisionProcesses(model_path="./gesture_recognizer.task", source=source, cam_w=CAM_W, cam_h=CAM_H, roi_tracking=ROI_TRACKING, metrics=session_metrics).start()
+        engine = grabber = vision
+        session_metrics.gauge("vision_processes", vision.stats)
+    else:
+        # frames go in unflipped; the engine mirrors the landmarks instead
+        engine = GestureEngine(model_path="./gesture_recognizer.task", roi_tracking=ROI_TRACKING, metrics=session_metrics, mirror=True)
+        if MODEL_WARM_UP:
+            print(f"[{name}] Gesture model warmed up in {engine.warm_up(CAM_W, CAM_H):.0f} ms")
+        session_metrics.mark("model_ready")
+        # Capture runs on its own thread and only ever hands us the newest frame; each frame wakes the worker pool
+        grabber = FrameGrabber(source=source, cam_w=CAM_W, cam_h=CAM_H, on_frame=sessions.notify).start()
+
+    # there is one OS cursor: other sessions drop their input instead of sending it
+    dispatcher = None if primary else InputDispatcher(NullInputBackend())
+    mouse = MouseController(smooting_factor=SMOOTHING_FACTOR, margin=MARGIN, cam_w=CAM_W, cam_h=CAM_H, screen_w=SCREEN_W, screen_h=SCREEN_H, key_zoom_in=KEY_ZOOM_IN, key_zoom_out=KEY_ZOOM_OUT, key_swipe_left=KEY_SWIPE_LEFT, key_swipe_right=KEY_SWIPE_RIGHT, dispatcher=dispatcher, cursor_filter=make_cursor_filter(), prediction_ms=CURSOR_PREDICTION_MS)
+    if CURSOR_TRACE_PATH and primary:
+        mouse.start_trace()
+    if not primary:
+        voice_worker = None
+    # What each gesture does lives in GESTURE_RULES_PATH; handlers act through the mouse and voice worker
+    actions = GestureActions(mouse, voice_worker, on_quit=shutdown_requested.set if primary else None)
+    rules = RuleEngine(GESTURE_RULES_PATH, actions, custom_gestures=custom_gestures if primary else None)
+
+    recorder = TraceRecorder(GESTURE_TRACE_PATH, CAM_W, CAM_H) if GESTURE_TRACE_PATH and primary else None
+
+    session_metrics.gauge("camera", lambda: {"captured": grabber.captured, "dropped": grabber.dropped})
+    session_metrics.gauge("input", mouse.input.stats)
+    presence = HandPresence(idle_after_s=IDLE_AFTER_S, idle_fps=IDLE_FPS)
+    session_metrics.gauge("idle", presence.stats)
+    return Session(name, grabber, engine, mouse, rules, session_broadcaster, session_metrics, HandFeatures([], CAM_W, CAM_H), voice_worker=voice_worker, primary=primary, recorder=recorder, presence=presence)
+
+
+def process_frame(session):
+    """
+    One frame of one session: Gesture Recognition, Mouse Control, and Drawing.
+    Runs on the session worker pool, never on two threads for the same session.
+    """
+    metrics = session.metrics
+    engine, rules, voice_worker = session.engine, session.rules, session.voice_worker
+    status_text, mode, overlay_hands = session.status_text, session.mode, session.overlay_hands
+
+    success, raw_frame, capture_time = session.grabber.read(timeout=0)
+    if not success:
+        return
+    metrics.tick("frames")
+    metrics.mark("first_frame")
+    metrics.record("capture_age", (time.time() - capture_time) * 1000)
+    lap = time.perf_counter() if metrics.enabled else 0
+
+    # Process Image (Hand Recognition Model); in process mode the inference worker already has this frame.
+    # The model gets the raw frame converted into a reused RGB buffer: no flip, the landmarks are mirrored instead
+    if not VISION_PROCESSES:
+        rgb_frame = session.preprocessor.to_rgb(raw_frame)
+        lap = metrics.lap("preprocess", lap)
+        engine.process_rgb(int(capture_time * 1000), rgb_frame)
+        lap = metrics.lap("process_rgb", lap)
+
+    # Handle Result: each recognizer result is acted on exactly once, and never when it is too old
+    result, result_timestamp = engine.take_result(time.time() * 1000)
+    if result is not None:
+        # every hand is converted to arrays once; features are only computed when a rule needs them
+        hands = engine.get_features(result, CAM_W, CAM_H)
+        now = time.time()
+        # no hands for a while: slow the source down; a hand brings it back to full rate.
+        # Any result counts here, however old: at the idle rate every one is older than MAX_RESULT_AGE_MS
+        if session.presence.update(hands.count, result_timestamp / 1000):
+            session.grabber.set_max_fps(session.presence.max_fps())
+            print(f"[{session.name}] " + (f"Idle: {IDLE_FPS} fps until a hand shows up" if session.presence.idle else "Hand detected: full frame rate"))
+
+        # judged against the nominal frame period, not the measured one: a capture stall must not make old results acceptable
+        max_age_ms = max(MAX_RESULT_AGE_MS, STALE_AFTER_FRAMES * 1000 * session.grabber.frame_period())
+        if not engine.is_stale(result_timestamp, now * 1000, max_age_ms):
+            overlay_hands = hands
+            metrics.mark("first_result")
+            if session.recorder is not None:
+                session.recorder.record(result, result_timestamp, now)
+            if session.primary and custom_gestures.is_recording():
+                # enrolling a custom gesture: collect samples, no actions
+                status_text, mode = custom_gestures.record(hands) or "Idle", GestureMode.NONE
+            else:
+                status_text, mode = rules.evaluate(hands, now, result_timestamp / 1000)
+                if session.mouse.input.actions["move_to"] and metrics.mark("first_cursor_move"):
+                    report_startup(session)
+    # otherwise nothing new (or only something too old) to act on: keep showing the last hands and status
+    rules.maybe_reload()
+
+    display_text = status_text
+    if voice_worker and voice_worker.is_active():
+        display_text = f"{status_text} | Voice: {voice_worker.get_state().name.title()}"
+    session.status_text, session.mode, session.overlay_hands = status_text, mode, overlay_hands
+    lap = metrics.lap("actions", lap)
+
+    # The mirrored picture is only made for someone who will see it: a /video_feed viewer gets it
+    # drawn on in a pooled buffer, a WebSocket video client as is
+    render = session.broadcaster.wants_frame()
+    frame = None
+    if render:
+        frame = session.preprocessor.mirror(raw_frame, dst=session.broadcaster.acquire(raw_frame.shape))
+        lap = metrics.lap("mirror", lap)
+
+    # Overlay data for WebSocket clients (mirrored frame, before the server-side drawing)
+    if session.primary and landmark_stream.has_clients():
+        landmark_stream.publish(overlay_hands.points, display_text, mode.value, voice_worker.get_state().value, capture_time)
+        if landmark_stream.wants_video():
+            landmark_stream.publish_frame(frame if frame is not None else session.preprocessor.mirror(raw_frame), capture_time)
+    lap = metrics.lap("landmark_stream", lap)
+
+    #UI
+    if not render:
+        # headless, or the viewers are still busy with the last frame (or max_fps says wait)
+        metrics.count("overlay_skipped")
+        return
+
+    # Draw hands, status bar and the active area
+    draw_overlay(frame, overlay_hands, mode, display_text, MARGIN)
+    lap = metrics.lap("draw", lap)
+
+    # Hand the frame to Flask; the pool won't give this buffer out again while it is current or being encoded
+    session.broadcaster.publish(frame)
+    metrics.lap("publish", lap)
+
+
+def report_startup(session):
+    marks = session.metrics.marks
+    print(f"[{session.name}] Startup: " + ", ".join(f"{event} {ms:.0f} ms" for event, ms in marks.items()))
+    if STARTUP_BENCHMARK and session.primary:
+        shutdown_requested.set()
 
 
 def run_gesture_logic():
     """
-    Background thread that handles Camera, Gesture Recognition,
-    Mouse Control, and Drawing.
+    Background thread that builds one pipeline per camera source, runs them
+    on the session worker pool and winds everything down at the end.
     """
-    global output_frame, lock
+    # The assistant runs on its own thread so gestures keep working while it talks
+    # and is only built (imports, microphone, API clients) when first needed or prewarmed
+    voice_worker = VoiceAssistantWorker(factory=create_voice_assistant)
+    metrics.gauge("voice", lambda: {"ready": int(voice_worker.is_ready()), "sessions": voice_worker.sessions, "ignored": voice_worker.ignored})
+    metrics.gauge("tts_cache", lambda: assistant_stats(voice_worker, lambda a: a.tts_bridge.cache.stats() if a.tts_bridge.cache else {}))
+    metrics.gauge("gemini", lambda: assistant_stats(voice_worker, lambda a: a.chat.stats()))
 
-    # Initialize Logic Components
-    # Note: Ensure paths to .task files are correct relative to where you run this script
-    engine = GestureEngine(model_path="./gesture_recognizer.task")
-    mouse = MouseController(smooting_factor=SMOOTHING_FACTOR, margin=MARGIN, cam_w=CAM_W, cam_h=CAM_H, screen_w=SCREEN_W, screen_h=SCREEN_H, key_zoom_in=KEY_ZOOM_IN, key_zoom_out=KEY_ZOOM_OUT, key_swipe_left=KEY_SWIPE_LEFT, key_swipe_right=KEY_SWIPE_RIGHT)
-    voice_assistant = GeminiVoiceAssistant()
-    cap = cv2.VideoCapture(0)
-    cap.set(3, CAM_W)
-    cap.set(4, CAM_H)
+    for i, camera in enumerate(CAMERA_SOURCES):
+        sessions.add(create_session(camera["name"], camera["source"], i == 0, voice_worker))
+    metrics.gauge("sessions", sessions.stats)
 
     print("--- STARTING SMART TRACKPAD (BACKGROUND) ---")
+    sessions.start(process_frame)
+    if VOICE_PREWARM_DELAY is not None and not STARTUP_BENCHMARK:
+        voice_worker.prewarm(VOICE_PREWARM_DELAY)
+
+    # runs until Thumb_Down, or until every source has ended (e.g. recorded files)
+    while not shutdown_requested.wait(0.5) and sessions.any_running():
+        pass
 
-    while cap.isOpened():
-        success, frame = cap.read()
-        if not success:
-            continue
-
-        # Pre-process Image (Frame)
-        frame = cv2.flip(frame, 1)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
-
-        # Process Image (Hand Recognition Model)
-        engine.process_frame(int(time.time() * 1000), mp_image)
-
-        # Handle Result
-        landmarks = engine.get_landmarks()
-        status_text = "Idle"
-        h, w, _ = frame.shape
-
-        if landmarks:
-            hand1 = landmarks[0]
-            if len(landmarks) == 2:
-                hand2 = landmarks[1]
-                if engine.is_pinching(hand1) and engine.is_pinching(hand2):
-                    status_text = "Dual Zoom Mode"
-                    x1, y1 = hand1[8].x * CAM_W, hand1[8].y * CAM_H
-                    x2, y2 = hand2[8].x * CAM_W, hand2[8].y * CAM_H
-                    hands_dist = math.hypot(x2 - x1, y2 - y1)
-                    norm_dist = hands_dist / CAM_W
-                        
-                    zoom_result = mouse.perform_zoom(norm_dist)
-                    if zoom_result: 
-                        status_text = f"Dual: {zoom_result}"
-                else:
-                    mouse.zoom_anchor = None
-                    status_text = "2 Hands (Open)"
-                
-            else: # most likely 1 hand
-                
-                if engine.latest_result and engine.latest_result.gestures:
-                    # Get the top gesture (highest score)
-                    top_gesture = engine.latest_result.gestures[0][0].category_name
-                    if top_gesture == "ILoveYou":
-                        voice_assistant.run()
-                        engine.latest_result = None
-                    elif top_gesture == "Thumb_Down":
-                        os._exit(0)
-
-                fingers_up = engine.count_fingers_up(hand1)
-
-                #thumb_tip = hand1[4]
-                index_tip = hand1[8]
-                #middle_tip = hand1[12]
-
-                index_tip_x_scaled = index_tip.x * CAM_W
-                index_tip_y_scaled = index_tip.y * CAM_H
-
-                # Cursor Mode
-                if fingers_up <= 1:
-                    if engine.is_pinching(hand1):
-                        if mouse.pinch_start_time == 0:
-                            mouse.pinch_start_time = time.time()
-
-                        pinch_duration = time.time() - mouse.pinch_start_time
-
-                        # vertical scroll
-                        if pinch_duration > 0.4:
-                            status_text = "Click & Hold: Scrolling"
-                            mouse.perform_scroll(index_tip_y_scaled)
-                            # Draw Scroll UI
-                            cv2.circle(frame, (int(index_tip_x_scaled), int(index_tip_y_scaled)), 20, (255, 0, 0), 2)
-                        else:
-                            # building up to a scroll
-                            status_text = "Pinching..."
-
-                    # release pinch
-                    else:
-                        status_text = "Cursor Mode"
-                        mouse.move_cursor(index_tip_x_scaled, index_tip_y_scaled)
-
-                        # if was in a pinch previous frame
-                        if mouse.pinch_start_time > 0:
-                            pinch_duration = time.time() - mouse.pinch_start_time
-
-                            # min click time threshold
-                            # if you make it too small may click accidentally due to error in tracking
-                            if pinch_duration <= 0.2:
-                                mouse.left_click()
-                                status_text = "Click"
-
-                            mouse.pinch_start_time = 0
-                            # reset scroll memory (if any)
-                            mouse.prev_y = None  
-                            mouse.scroll_anchor = None
-
-                # Swipe Mode
-                elif fingers_up >= 3:
-                    hand_x = hand1[0].x * CAM_W
-                    hand_y = hand1[0].y * CAM_H
-                    action = mouse.perform_swipe(hand_x, hand_y)
-                    if action:
-                        status_text = action
-                    else:
-                        status_text = "Swipe Mode"
-
-
-        #UI
-            
-        # Draw hands
-        for hand_lms in landmarks:
-            for lm in hand_lms:
-                cv2.circle(frame, (int(lm.x * w), int(lm.y * h)), 5, (255, 0, 0), -1)
-        cv2.rectangle(frame, (0, 0), (w, 40), (0, 0, 0), -1)
-        cv2.putText(frame, status_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-        cv2.rectangle(frame, (MARGIN, MARGIN), (CAM_W - MARGIN, CAM_H - MARGIN), (255, 255, 255), 1)
-
-        # Global Frame for Flask
-        with lock:
-            output_frame = frame.copy()
-
-    cap.release()
-
-
-def generate_frames():
-    """Generator function for Flask to stream video."""
-    global output_frame, lock
-
-    while True:
-        with lock:
-            if output_frame is None:
-                continue
-
-            # Encode the frame in JPEG format
-            (flag, encodedImage) = cv2.imencode(".jpg", output_frame)
-            if not flag:
-                continue
-
-        # Yield the output frame in the byte format
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + bytearray(encodedImage) + b'\r\n')
-
-        # Adding a tiny sleep prevents the generator from hogging CPU if no new frame is ready
-        time.sleep(0.01)
+    sessions.stop(trace_path=CURSOR_TRACE_PATH)
+    voice_worker.cancel()
+    landmark_stream.stop()
+    if shutdown_requested.is_set() and http_server is not None:
+        print("--- SHUTTING DOWN ---")
+        http_server.shutdown()
+
+
+def metrics_response(session_metrics):
+    """Pipeline timings and counters as JSON, or Prometheus text with ?format=prometheus."""
+    if not session_metrics.enabled:
+        return Response("Metrics are disabled (METRICS_ENABLED = False)\n", status=404, mimetype="text/plain")
+    if request.args.get("format") == "prometheus":
+        return Response(session_metrics.prometheus(), mimetype="text/plain; version=0.0.4")
+    return jsonify(session_metrics.snapshot())
 
 
 @app.route("/video_feed")
 def video_feed():
-    return Response(generate_frames(), mimetype="multipart/x-mixed-replace; boundary=frame")
+    return Response(broadcaster.stream(), mimetype="multipart/x-mixed-replace; boundary=frame")
+
+@app.route("/video_feed/<name>")
+def session_video_feed(name):
+    session = sessions.get(name)
+    if session is None:
+        return Response(f"No session '{name}'\n", status=404, mimetype="text/plain")
+    return Response(session.broadcaster.stream(), mimetype="multipart/x-mixed-replace; boundary=frame")
+
+@app.route("/metrics")
+def metrics_feed():
+    """Primary session and app-wide metrics."""
+    return metrics_response(metrics)
+
+@app.route("/metrics/<name>")
+def session_metrics_feed(name):
+    session = sessions.get(name)
+    if session is None:
+        return Response(f"No session '{name}'\n", status=404, mimetype="text/plain")
+    return metrics_response(session.metrics)
+
+@app.route("/sessions")
+def session_list():
+    return jsonify(sessions.stats())
+
+@app.route("/gestures", methods=["GET"])
+def custom_gesture_list():
+    return jsonify(custom_gestures.stats())
+
+@app.route("/gestures/<label>", methods=["POST"])
+def custom_gesture_record(label):
+    """Records the next ?samples=N one-hand frames (default 30) as examples of a custom gesture."""
+    try:
+        custom_gestures.start_recording(label, request.args.get("samples", 30, type=int))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(custom_gestures.stats())
+
+@app.route("/gestures/<label>", methods=["DELETE"])
+def custom_gesture_remove(label):
+    if not custom_gestures.remove(label):
+        return jsonify({"error": f"no custom gesture '{label}'"}), 404
+    return jsonify(custom_gestures.stats())
 
 @app.route("/")
 def index():
     with open("index1.html", "r", encoding="utf-8") as f:
         return f.read()
 
+def run_startup_benchmark(source=None):
+    """
+    python main.py --startup-benchmark [video]: starts the pipeline without the web server,
+    stops at the first cursor move and prints the startup marks as one JSON line.
+    Run it through startupBenchmark.py to get cold-start numbers over several processes.
+    """
+    global STARTUP_BENCHMARK
+    STARTUP_BENCHMARK = True
+    if source is not None:
+        CAMERA_SOURCES[:] = [{"name": "main", "source": int(source) if source.isdigit() else source}]
+    if not metrics.enabled:
+        print("Startup benchmark needs METRICS_ENABLED = True")
+        return
+    run_gesture_logic()
+    print(json.dumps(metrics.marks))
+
+
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["--startup-benchmark"]:
+        run_startup_benchmark(sys.argv[2] if len(sys.argv) > 2 else None)
+        sys.exit(0)
+
+    # Flask runs on a werkzeug server we can shut down cleanly on Thumb_Down
+    http_server = make_server("0.0.0.0", 5174, app, threaded=True)
+
     # Start the Gesture Logic in a separate daemon thread
     t = threading.Thread(target=run_gesture_logic)
     t.daemon = True  # Ensures thread dies when main program exits
     t.start()
 
-    # Start Flask Server
-    app.run(host="0.0.0.0", port=5174, debug=False, use_reloader=False)
+    if LANDMARK_STREAM_PORT:
+        landmark_stream.start()
 
+    # Start Flask Server
+    http_server.serve_forever()
@@ -0,0 +1,198 @@
+import collections
+import threading
+import time
+
+
+class _StageTimer:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.stage, 1000 * (time.perf_counter() - self.start))
+        return False
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[index]
+
+
+class Metrics:
+    """
+    Low-Overhead Pipeline Metrics.
+    - Stage timers keep a rolling window of recent durations (ms); p50/p95/p99
+      are only computed when someone reads them.
+    - Counters for events (frames, actions), rates (fps) from recent tick times.
+    - Gauges are callables read at snapshot time, so components keep their own stats.
+    - Marks record once-only milestones (first frame, first cursor move) as ms since origin.
+    """
+    def __init__(self, window=512, origin=None):
+        self.enabled = True
+        self.window = window
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = collections.Counter()
+        self.ticks = {}
+        self.gauges = {}
+        self.started = time.time()
+        # perf_counter value marks are measured from, e.g. taken at the top of main.py
+        self.origin = time.perf_counter() if origin is None else origin
+        self.marks = {}
+
+    def timer(self, stage):
+        """with metrics.timer("draw"): ... records how long the block took."""
+        return _StageTimer(self, stage)
+
+    def record(self, stage, ms):
+        hist = self.histograms.get(stage)
+        if hist is None:
+            hist = self.histograms.setdefault(stage, collections.deque(maxlen=self.window))
+        hist.append(ms)
+
+    def lap(self, stage, start):
+        """Records the time since start (a perf_counter value) and returns now, for back-to-back stages."""
+        now = time.perf_counter()
+        self.record(stage, 1000 * (now - start))
+        return now
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def tick(self, name):
+        """Marks one event for a rate (e.g. "frames" for fps)."""
+        ticks = self.ticks.get(name)
+        if ticks is None:
+            ticks = self.ticks.setdefault(name, collections.deque(maxlen=self.window))
+        ticks.append(time.perf_counter())
+        self.counters[name] += 1
+
+    def mark(self, name):
+        """Records the first time name happens (ms since origin); later calls are ignored. Returns True the first time."""
+        if name in self.marks:
+            return False
+        self.marks[name] = 1000 * (time.perf_counter() - self.origin)
+        return True
+
+    def gauge(self, name, read):
+        """Registers a callable returning a number (or a dict of numbers) to report."""
+        self.gauges[name] = read
+
+    def snapshot(self):
+        with self.lock:
+            stages = {}
+            for stage, hist in list(self.histograms.items()):
+                values = sorted(hist)
+                stages[stage] = {
+                    "count": len(values),
+                    "p50": _percentile(values, 0.50),
+                    "p95": _percentile(values, 0.95),
+                    "p99": _percentile(values, 0.99),
+                    "max": values[-1] if values else 0.0,
+                }
+
+            rates = {}
+            for name, ticks in list(self.ticks.items()):
+                times = list(ticks)
+                span = times[-1] - times[0] if len(times) > 1 else 0
+                rates[name] = (len(times) - 1) / span if span > 0 else 0.0
+
+            gauges = {}
+            for name, read in list(self.gauges.items()):
+                try:
+                    gauges[name] = read()
+                except Exception as e:
+                    gauges[name] = None
+                    print(f"Metrics gauge '{name}' failed: {e}")
+
+            return {
+                "uptime_s": time.time() - self.started,
+                "stages_ms": stages,
+                "rates_per_s": rates,
+                "counters": dict(self.counters),
+                "gauges": gauges,
+                "startup_ms": dict(self.marks),
+            }
+
+    def prometheus(self, prefix="jarvis"):
+        """Snapshot in Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = [f"# TYPE {prefix}_stage_ms summary"]
+        for stage, s in snap["stages_ms"].items():
+            for q in ("p50", "p95", "p99"):
+                lines.append(f'{prefix}_stage_ms{{stage="{stage}",quantile="0.{q[1:]}"}} {s[q]:.3f}')
+            lines.append(f'{prefix}_stage_ms_count{{stage="{stage}"}} {s["count"]}')
+
+        lines.append(f"# TYPE {prefix}_rate_per_s gauge")
+        for name, rate in snap["rates_per_s"].items():
+            lines.append(f'{prefix}_rate_per_s{{name="{name}"}} {rate:.3f}')
+
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, value in snap["counters"].items():
+            lines.append(f'{prefix}_events_total{{name="{name}"}} {value}')
+
+        lines.append(f"# TYPE {prefix}_startup_ms gauge")
+        for name, ms in snap["startup_ms"].items():
+            lines.append(f'{prefix}_startup_ms{{event="{name}"}} {ms:.1f}')
+
+        lines.append(f"# TYPE {prefix}_gauge gauge")
+        for name, value in snap["gauges"].items():
+            values = value if isinstance(value, dict) else {"": value}
+            for key, v in values.items():
+                if isinstance(v, (int, float)):
+                    full_name = f"{name}_{key}" if key else name
+                    lines.append(f'{prefix}_gauge{{name="{full_name}"}} {v}')
+        return "\n".join(lines) + "\n"
+
+
+class NullMetrics:
+    """Drop-in replacement when metrics are switched off: every call is a no-op."""
+    enabled = False
+    _timer = _NullTimer()
+
+    def timer(self, stage):
+        return self._timer
+
+    def record(self, stage, ms):
+        pass
+
+    def lap(self, stage, start):
+        return 0
+
+    def count(self, name, n=1):
+        pass
+
+    def tick(self, name):
+        pass
+
+    def mark(self, name):
+        return False
+
+    def gauge(self, name, read):
+        pass
+
+    def snapshot(self):
+        return {}
+
+    def prometheus(self, prefix="jarvis"):
+        return ""
+
+
+def create_metrics(enabled=True, window=512, origin=None):
+    return Metrics(window=window, origin=origin) if enabled else NullMetrics()
@@ -1,17 +1,21 @@
-import collections
 import time
-import pyautogui
 
+from cursorFilters import MovingAverageFilter
+from inputDispatcher import InputDispatcher
 from utils import Utils
 
 class MouseController:
-    def __init__(self, smooting_factor, margin, cam_w, cam_h, screen_w, screen_h, key_zoom_in, key_zoom_out, key_swipe_left, key_swipe_right):
-        self.cursor_history = collections.deque(maxlen=smooting_factor)
+    def __init__(self, smooting_factor, margin, cam_w, cam_h, screen_w, screen_h, key_zoom_in, key_zoom_out, key_swipe_left, key_swipe_right, dispatcher=None, cursor_filter=None, prediction_ms=0):
+        # OS input goes through a dispatcher thread so it never blocks the vision loop
+        self.input = dispatcher or InputDispatcher()
+        # cursor smoothing (see cursorFilters.py), defaults to the plain moving average
+        self.cursor_filter = cursor_filter or MovingAverageFilter(window=smooting_factor)
+        # extrapolate this far ahead to hide pipeline latency (filters with a velocity estimate only)
+        self.prediction_ms = prediction_ms
+        # raw (t, x, y) cursor targets, kept only while recording a trace for offline evaluation
+        self.trace = None
         self.last_swipe_time = 0
         self.last_zoom_time = 0
-        # To track previous state for relative scroll/zoom
-        self.prev_y = None 
-        self.prev_dist = None
 
         self.margin = margin
         self.cam_w = cam_w
@@ -24,35 +28,43 @@ class MouseController:
         self.key_zoom_out = key_zoom_out
         self.key_swipe_left = key_swipe_left
         self.key_swipe_right = key_swipe_right
-        self.pinch_start_time = 0
-        self.is_scrolling = False
-        self.last_scroll_y = 0
-        self.count = 0
 
+        # set on the first scroll / zoom step of a pinch (GestureActions clears them for a new one)
         self.scroll_anchor = None
         self.zoom_anchor = None
 
-    def move_cursor(self, x, y):
-        """Smooths coordinates and moves the mouse."""
+    def move_cursor(self, x, y, timestamp=None):
+        """Smooths coordinates and moves the mouse. timestamp is the frame's capture time (s)."""
         # map camera coords to screen coords
         clamped_x = max(self.margin, min(x, self.cam_w - self.margin))
         clamped_y = max(self.margin, min(y, self.cam_h - self.margin))
         
+        if self.screen_w is None:
+            # resolved on the first move instead of at startup
+            self.screen_w, self.screen_h = Utils.screen_size()
         target_x = Utils.map_range(clamped_x, self.margin, self.cam_w - self.margin, 0, self.screen_w)
         target_y = Utils.map_range(clamped_y, self.margin, self.cam_h - self.margin, 0, self.screen_h)
 
-        self.cursor_history.append((target_x, target_y))
-        avg_x = sum(p[0] for p in self.cursor_history) / len(self.cursor_history)
-        avg_y = sum(p[1] for p in self.cursor_history) / len(self.cursor_history)
+        t = timestamp if timestamp is not None else time.time()
+        if self.trace is not None:
+            self.trace.append((t, target_x, target_y))
 
-        pyautogui.moveTo(avg_x, avg_y, _pause=False)
+        self.cursor_filter.update(target_x, target_y, t)
+        smooth_x, smooth_y = self.cursor_filter.predict(t + self.prediction_ms / 1000)
 
-        # reset scroll memory when moving cursor
-        self.prev_y = None
-        self.prev_dist = None
+        self.input.move_to(smooth_x, smooth_y)
+
+    def start_trace(self):
+        self.trace = []
+
+    def save_trace(self, path):
+        """Writes the recorded cursor targets as CSV (t,x,y) for cursorFilters.py."""
+        with open(path, "w") as f:
+            for t, x, y in self.trace or []:
+                f.write(f"{t:.6f},{x:.3f},{y:.3f}\n")
 
     def left_click(self):
-        pyautogui.click(_pause=False)
+        self.input.click()
 
     def perform_scroll(self, current_y):
         """
@@ -78,14 +90,14 @@ class MouseController:
 
         if diff > SCROLL_STEP:
             # Hand moved UP -> Scroll UP
-            pyautogui.scroll(1) 
+            self.input.scroll(1)
             # Move the anchor up to meet the current position
             self.scroll_anchor -= SCROLL_STEP
             return "Scroll Up"
 
         elif diff < -SCROLL_STEP:
             # Hand moved DOWN -> Scroll DOWN
-            pyautogui.scroll(-1)
+            self.input.scroll(-1)
             # Move the anchor down to meet the current position
             self.scroll_anchor += SCROLL_STEP
             return "Scroll Down"
@@ -115,14 +127,14 @@ class MouseController:
         STEP_SIZE = 0.026
 
         if diff > STEP_SIZE:
-            pyautogui.hotkey(*self.key_zoom_in)
+            self.input.hotkey(*self.key_zoom_in)
             print(f"Zoom Out (Dist: {current_dist:.3f})")
             
             self.zoom_anchor += STEP_SIZE
             return "Zoom Out"
 
         elif diff < -STEP_SIZE:
-            pyautogui.hotkey(*self.key_zoom_out)
+            self.input.hotkey(*self.key_zoom_out)
             print(f"Zoom In (Dist: {current_dist:.3f})")
             
             # Slide the anchor backward
@@ -131,26 +143,27 @@ class MouseController:
 
         return None
 
-    def perform_swipe(self, current_x, current_y):
-        """Triggers left/right desktop switch."""
+    def perform_swipe(self, current_x, current_y, now=None):
+        """Triggers left/right desktop switch. now (s) is the frame's capture time, so the debounce is the same at any frame rate."""
+        now = time.time() if now is None else now
         # Debounce swipes (don't swipe 10 times in 1 second)
-        if time.time() - self.last_swipe_time < 1.0:
+        if now - self.last_swipe_time < 1.0:
             return None
 
         if current_x < self.cam_w * 0.2: 
-            pyautogui.hotkey(*self.key_swipe_left)
-            self.last_swipe_time = time.time()
+            self.input.hotkey(*self.key_swipe_left)
+            self.last_swipe_time = now
             return "Swipe Left"
         elif current_x > self.cam_w * 0.8:
-            pyautogui.hotkey(*self.key_swipe_right)
-            self.last_swipe_time = time.time()
+            self.input.hotkey(*self.key_swipe_right)
+            self.last_swipe_time = now
             return "Swipe Right"
 
         # Swipe UP (Mission Control / App Switcher)
         elif current_y < self.cam_h * 0.2:
             # On MacOS, Mission Control is usually 'ctrl', 'up'
-            pyautogui.hotkey('ctrl', 'up')
-            self.last_swipe_time = time.time()
+            self.input.hotkey('ctrl', 'up')
+            self.last_swipe_time = now
             return "Swipe Up (Mission Control)"
         
         return None
\ No newline at end of file
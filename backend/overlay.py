@@ -0,0 +1,34 @@
+import cv2
+import numpy as np
+
+from handFeatures import INDEX_TIP
+from utils import GestureMode
+
+LANDMARK_COLOR = (255, 0, 0)
+LANDMARK_RADIUS = 5
+STATUS_BAR_HEIGHT = 40
+
+
+def draw_points(frame, points, radius=LANDMARK_RADIUS, color=LANDMARK_COLOR):
+    """
+    Filled discs at (n x 2) pixel coordinates in a single OpenCV call: each point is a
+    zero-length segment, and a thick segment's round cap is a disc (pixel-identical to
+    cv2.circle(..., radius, color, -1) for the default radius, at half the cost of a loop).
+    """
+    if not len(points):
+        return
+    segments = np.repeat(np.asarray(points).astype(np.int32)[:, None, :], 2, axis=1)
+    cv2.polylines(frame, segments, False, color, 2 * radius)
+
+
+def draw_overlay(frame, hands, mode, text, margin):
+    """The /video_feed overlay: landmarks, scroll ring, status bar and the active area."""
+    h, w = frame.shape[:2]
+    if mode == GestureMode.SCROLL and hands.count:
+        x, y = hands.scaled_point(0, INDEX_TIP)
+        cv2.circle(frame, (int(x), int(y)), 20, LANDMARK_COLOR, 2)
+    if hands.count:
+        draw_points(frame, (hands.points[:, :, :2] * (w, h)).reshape(-1, 2))
+    frame[:STATUS_BAR_HEIGHT] = 0
+    cv2.putText(frame, text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+    cv2.rectangle(frame, (margin, margin), (w - margin, h - margin), (255, 255, 255), 1)
@@ -0,0 +1,156 @@
+import contextlib
+import glob
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from gestureTrace import hand_pose, read_trace, replay, synthetic_frames
+from handFeatures import INDEX_TIP, HandFeatures
+import utils
+
+TRACE_DIR = "./traces"
+BASELINES_PATH = os.path.join(TRACE_DIR, "baselines.json")
+
+# Behavior has to match exactly (actions, status changes) or within a pixel (cursor).
+# Timings are compared in units of a reference workload timed in the same run (reference_us),
+# not in milliseconds, so a baseline recorded on one machine holds on another: they may get
+# LATENCY_TOLERANCE slower, with LATENCY_SLACK_UNITS of noise allowance
+LATENCY_TOLERANCE = 0.5
+LATENCY_SLACK_UNITS = 1.0
+THROUGHPUT_TOLERANCE = 0.35
+CURSOR_TOLERANCE_PX = 1.0
+
+
+def reference_us(runs=5, iterations=2000):
+    """
+    Median µs per iteration of a fixed slice of the decision path's work (a frame's feature
+    arrays plus a few Python condition calls): the unit replay timings are stored in.
+    """
+    points = hand_pose(0.5, 0.5)[None]
+    conditions = [lambda f: f.count == 1, lambda f: int(f.fingers_up[0]) <= 1, lambda f: bool(f.pinching[0])]
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            features = HandFeatures(points, utils.CAM_W, utils.CAM_H)
+            for condition in conditions:
+                condition(features)
+            features.scaled_point(0, INDEX_TIP)
+        timings.append(time.perf_counter() - start)
+    return 1e6 * statistics.median(timings) / iterations
+
+
+def load_traces(paths=None):
+    """[(name, cam_w, cam_h, frames)]: the given trace files, or every recorded trace plus the synthetic session."""
+    traces = [] if paths else [("synthetic", utils.CAM_W, utils.CAM_H, synthetic_frames())]
+    for path in paths or sorted(glob.glob(os.path.join(TRACE_DIR, "*.trace"))):
+        cam_w, cam_h, frames = read_trace(path)
+        traces.append((os.path.splitext(os.path.basename(path))[0], cam_w, cam_h, frames))
+    return traces
+
+
+def measure(cam_w, cam_h, frames, runs=7):
+    """
+    Replays a trace several times: behavior from the first run, timings as the median over runs,
+    in ms and in reference units. The reference is re-timed right before each run, so a
+    machine that speeds up or slows down during the benchmark affects both alike.
+    """
+    reports, units = [], []
+    # the mouse and rule engine log as they go; keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(runs):
+            units.append(reference_us(runs=3, iterations=500))
+            reports.append(replay(frames, cam_w, cam_h))
+    first = reports[0]
+    cursor = first["cursor"]
+    return {
+        "frames": first["frames"],
+        "actions": first["actions"],
+        "status_changes": len(first["status_changes"]),
+        "statuses": first["statuses"],
+        "cursor_moves": len(cursor),
+        "cursor_mean": np.round(cursor[:, 1:].mean(axis=0), 2).tolist() if len(cursor) else [0.0, 0.0],
+        "decision_p50_ms": statistics.median(r["decision_ms"]["p50"] for r in reports),
+        "decision_p95_ms": statistics.median(r["decision_ms"]["p95"] for r in reports),
+        "frames_per_s": statistics.median(r["frames_per_s"] for r in reports),
+        # what is compared: the same timings relative to this machine's speed at the time
+        "decision_p50_units": statistics.median(1000 * r["decision_ms"]["p50"] / u for r, u in zip(reports, units)),
+        "decision_p95_units": statistics.median(1000 * r["decision_ms"]["p95"] / u for r, u in zip(reports, units)),
+        "frames_per_unit": statistics.median(r["frames_per_s"] * u / 1e6 for r, u in zip(reports, units)),
+        "unit_us": statistics.median(units),
+    }
+
+
+def compare(result, baseline):
+    """Returns a list of drift messages (empty = pass)."""
+    problems = []
+    for key in ("frames", "actions", "status_changes", "statuses", "cursor_moves"):
+        if result[key] != baseline[key]:
+            problems.append(f"{key}: {baseline[key]} -> {result[key]}")
+
+    drift = max(abs(a - b) for a, b in zip(result["cursor_mean"], baseline["cursor_mean"]))
+    if drift > CURSOR_TOLERANCE_PX:
+        problems.append(f"cursor mean moved {drift:.1f} px: {baseline['cursor_mean']} -> {result['cursor_mean']}")
+
+    allowed = baseline["decision_p95_units"] * (1 + LATENCY_TOLERANCE) + LATENCY_SLACK_UNITS
+    if result["decision_p95_units"] > allowed:
+        problems.append(f"decision p95 {baseline['decision_p95_units']:.1f} -> {result['decision_p95_units']:.1f} units")
+    if result["frames_per_unit"] < baseline["frames_per_unit"] * (1 - THROUGHPUT_TOLERANCE):
+        problems.append(f"throughput {baseline['frames_per_unit']:.3f} -> {result['frames_per_unit']:.3f} frames/unit")
+    return problems
+
+
+def load_baselines(path=BASELINES_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baselines(baselines, path=BASELINES_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    # python replayBenchmark.py [--update] [trace ...]
+    # Replays every trace through the decision path and fails (exit 1) when behavior or speed drifts from the baseline.
+    # --update stores the current results as the new baselines (after an intended change, or on a new machine).
+    args = sys.argv[1:]
+    update = "--update" in args
+    paths = [a for a in args if a != "--update"]
+
+    baselines = load_baselines()
+    failed = False
+    print(f"{'trace':<20}{'frames':>7}{'p50 ms':>9}{'p95 ms':>9}{'p95 units':>11}{'frames/s':>10}{'unit us':>9}  actions")
+    for name, cam_w, cam_h, frames in load_traces(paths):
+        result = measure(cam_w, cam_h, frames)
+        actions = ", ".join(f"{k} {v}" for k, v in result["actions"].items())
+        print(f"{name:<20}{result['frames']:>7}{result['decision_p50_ms']:>9.3f}{result['decision_p95_ms']:>9.3f}"
+              f"{result['decision_p95_units']:>11.1f}{result['frames_per_s']:>10.0f}{result['unit_us']:>9.1f}  {actions}")
+
+        if update:
+            # machine-specific numbers (ms, frames/s) are printed above but not kept
+            baselines[name] = {k: v for k, v in result.items() if not k.endswith("_ms") and k != "frames_per_s"}
+        elif name not in baselines or "decision_p95_units" not in baselines[name]:
+            print("  no baseline yet (run with --update)")
+        else:
+            for problem in compare(result, baselines[name]):
+                failed = True
+                print(f"  DRIFT {problem}")
+
+    if update:
+        save_baselines(baselines)
+        print(f"Baselines saved to {BASELINES_PATH}")
+    elif failed:
+        print("FAILED: results drifted from the baselines")
+        sys.exit(1)
+    else:
+        print("OK")
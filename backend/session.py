@@ -0,0 +1,174 @@
+import os
+import threading
+
+from framePreprocessor import FramePreprocessor
+from utils import GestureMode
+
+
+class Session:
+    """
+    One Camera Source + Its Own Pipeline.
+    - Holds the grabber, engine, mouse, rules, stream and metrics of a single source,
+      plus the overlay state the vision loop carries from frame to frame.
+    - Only the primary session drives the voice assistant and the landmark stream.
+    """
+    def __init__(self, name, grabber, engine, mouse, rules, broadcaster, metrics, no_hands, voice_worker=None, primary=False, recorder=None, presence=None):
+        self.name = name
+        self.grabber = grabber
+        self.engine = engine
+        self.mouse = mouse
+        self.rules = rules
+        self.broadcaster = broadcaster
+        self.metrics = metrics
+        self.voice_worker = voice_worker
+        self.primary = primary
+        # gestureTrace.TraceRecorder saving every recognizer result, if recording
+        self.recorder = recorder
+        # handState.HandPresence deciding when the source can run at the idle rate
+        self.presence = presence
+
+        # what the overlay shows between recognizer results
+        self.overlay_hands = no_hands
+        self.status_text = "Idle"
+        self.mode = GestureMode.NONE
+        # RGB and mirrored frames, in buffers reused from frame to frame
+        self.preprocessor = FramePreprocessor()
+
+        # claimed by one pool worker at a time
+        self.busy = False
+        self.closed = False
+
+    def has_frame(self):
+        return self.grabber.has_frame()
+
+    def is_running(self):
+        return not self.closed and self.grabber.is_running()
+
+    def close(self, trace_path=None):
+        """Stops capture and input, and ends this session's streams."""
+        if self.closed:
+            return
+        self.closed = True
+        self.grabber.stop()
+        print(f"[{self.name}] Camera stopped ({self.grabber.captured} frames captured, {self.grabber.dropped} dropped)")
+
+        if trace_path and self.mouse.trace is not None:
+            self.mouse.save_trace(trace_path)
+        if self.recorder is not None:
+            self.recorder.close()
+
+        self.mouse.input.stop()
+        stats = self.mouse.input.stats()
+        print(f"[{self.name}] Input dispatcher: {stats['dispatched']} sent, {stats['coalesced']} moves coalesced, "
+              f"max queue {stats['max_queue_depth']}, avg latency {stats['avg_latency_ms']:.1f} ms")
+        self.broadcaster.stop()
+
+
+class SessionRegistry:
+    """
+    Session Registry + Bounded Worker Pool.
+    - Every camera source is a named Session with its own pipeline, stream and metrics.
+    - A fixed pool of worker threads (at most one per core) runs all sessions: a worker
+      claims a session that has a new frame, processes that one frame and releases it.
+      A session never runs on two threads at once, and adding a camera adds no threads
+      once the pool is full.
+    - Sessions are picked round-robin, so a fast camera can't starve a slow one.
+    """
+    def __init__(self, workers=None, poll_interval=0.01):
+        self.step = None
+        self.max_workers = workers or os.cpu_count() or 1
+        # sources in worker processes can't wake us up, so idle workers also re-check this often
+        self.poll_interval = poll_interval
+
+        self.cond = threading.Condition()
+        self.sessions = {}
+        self.order = []
+        self.next_index = 0
+        self.threads = []
+        self.running = False
+
+    def add(self, session):
+        with self.cond:
+            if session.name in self.sessions:
+                raise ValueError(f"Session '{session.name}' already exists")
+            self.sessions[session.name] = session
+            self.order.append(session)
+            if self.running:
+                self._grow_pool()
+            self.cond.notify_all()
+
+    def get(self, name):
+        return self.sessions.get(name)
+
+    def primary(self):
+        return next((s for s in self.order if s.primary), self.order[0] if self.order else None)
+
+    def names(self):
+        return [s.name for s in self.order]
+
+    def notify(self):
+        """Called by a source when it has a new frame."""
+        with self.cond:
+            self.cond.notify()
+
+    def any_running(self):
+        return any(s.is_running() for s in self.order)
+
+    def start(self, step):
+        """step(session) processes one frame of a session."""
+        with self.cond:
+            self.step = step
+            self.running = True
+            self._grow_pool()
+        return self
+
+    def _grow_pool(self):
+        while len(self.threads) < min(self.max_workers, len(self.order)):
+            thread = threading.Thread(target=self._worker, name=f"session-worker-{len(self.threads)}", daemon=True)
+            self.threads.append(thread)
+            thread.start()
+
+    def _claim(self):
+        count = len(self.order)
+        for i in range(count):
+            session = self.order[(self.next_index + i) % count]
+            if not session.busy and session.is_running() and session.has_frame():
+                session.busy = True
+                self.next_index = (self.next_index + i + 1) % count
+                return session
+        return None
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                session = self._claim()
+                while session is None:
+                    if not self.running:
+                        return
+                    self.cond.wait(self.poll_interval)
+                    session = self._claim()
+
+            try:
+                self.step(session)
+            except Exception as e:
+                print(f"[{session.name}] Frame failed: {e}")
+            finally:
+                with self.cond:
+                    session.busy = False
+
+    def stats(self):
+        return {
+            "workers": len(self.threads),
+            "max_workers": self.max_workers,
+            "sessions": {s.name: {"running": s.is_running(), "primary": s.primary, "status": s.status_text} for s in self.order},
+        }
+
+    def stop(self, trace_path=None):
+        """Stops the pool (after in-flight frames finish), then closes every session."""
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        for thread in self.threads:
+            thread.join(timeout=2.0)
+        for session in self.order:
+            session.close(trace_path if session.primary else None)
@@ -0,0 +1,161 @@
+import collections
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+
+class SpeechCache:
+    """
+    Persistent LRU Cache for Synthesized Speech.
+    - Content-addressed: the key is a hash of (normalized text, voice_id, model settings).
+    - Small in-memory hot tier in front of an on-disk store.
+    - Disk writes are atomic (temp file + rename), so a crash never leaves half a clip.
+    - The disk store is size-bounded; least recently used clips are evicted first.
+    """
+    def __init__(self, cache_dir="./tts_cache", max_disk_bytes=50 * 1024 * 1024, max_memory_items=32):
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_items = max_memory_items
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.memory = collections.OrderedDict()
+
+        # disk index in LRU order (oldest first), rebuilt from file access times
+        self.disk = collections.OrderedDict()
+        self.disk_bytes = 0
+        self._load_index()
+
+        # stats
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize(text):
+        return " ".join(text.strip().lower().split())
+
+    @staticmethod
+    def make_key(text, voice_id, settings=None):
+        payload = json.dumps([SpeechCache.normalize(text), voice_id, settings or {}], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".audio")
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".audio"):
+                continue
+            stat = os.stat(os.path.join(self.cache_dir, name))
+            entries.append((stat.st_atime, name[:-len(".audio")], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self.disk[key] = size
+            self.disk_bytes += size
+
+    def contains(self, key):
+        with self.lock:
+            return key in self.memory or key in self.disk
+
+    def get(self, key):
+        """Returns the cached audio bytes or None."""
+        with self.lock:
+            audio = self.memory.get(key)
+            if audio is not None:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                # a hot clip is recently used on disk too, or disk eviction would take it first
+                if key in self.disk:
+                    self.disk.move_to_end(key)
+            elif key not in self.disk:
+                self.misses += 1
+                return None
+
+        if audio is not None:
+            self._touch(key)
+            return audio
+
+        try:
+            with open(self._path(key), "rb") as f:
+                audio = f.read()
+            os.utime(self._path(key))  # keep LRU order across restarts
+        except OSError:
+            with self.lock:
+                self.disk_bytes -= self.disk.pop(key, 0)
+                self.misses += 1
+            return None
+
+        with self.lock:
+            if key in self.disk:
+                self.disk.move_to_end(key)
+            self.disk_hits += 1
+            self._remember(key, audio)
+        return audio
+
+    def _touch(self, key):
+        # keep LRU order across restarts (the index is rebuilt from access times)
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def put(self, key, audio):
+        # write to a temp file in the same directory, then atomically swap it in
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(temp_path, self._path(key))
+        except OSError as e:
+            print(f"Speech cache write failed: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        with self.lock:
+            self.disk_bytes -= self.disk.pop(key, 0)
+            self.disk[key] = len(audio)
+            self.disk_bytes += len(audio)
+            self._remember(key, audio)
+            evicted = self._evict()
+
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+
+    def _remember(self, key, audio):
+        self.memory[key] = audio
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_items:
+            self.memory.popitem(last=False)
+
+    def _evict(self):
+        evicted = []
+        while self.disk_bytes > self.max_disk_bytes and len(self.disk) > 1:
+            old_key, size = self.disk.popitem(last=False)
+            self.memory.pop(old_key, None)
+            self.disk_bytes -= size
+            self.evictions += 1
+            evicted.append(old_key)
+        return evicted
+
+    def stats(self):
+        with self.lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self.disk),
+                "disk_bytes": self.disk_bytes,
+            }
@@ -0,0 +1,162 @@
+import queue
+import re
+import threading
+import time
+
+
+class SentenceSplitter:
+    """Cuts streamed text into sentences as soon as each one is complete."""
+    SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+    def __init__(self, min_chars=12):
+        # very short sentences ("Sure.") are merged with the next one, one TTS request each is wasteful
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def feed(self, text):
+        """Adds streamed text and returns the sentences it completed."""
+        self.buffer += text
+        parts = self.SENTENCE_END.split(self.buffer)
+        self.buffer = parts.pop()
+
+        sentences = []
+        pending = ""
+        for part in parts:
+            pending = f"{pending} {part}" if pending else part
+            if len(pending) >= self.min_chars:
+                sentences.append(pending.strip())
+                pending = ""
+        if pending:
+            self.buffer = f"{pending} {self.buffer}"
+        return sentences
+
+    def flush(self):
+        """Returns whatever text is left once the stream has ended."""
+        rest = self.buffer.strip()
+        self.buffer = ""
+        return rest
+
+
+_DONE = object()
+
+
+class SpeechPipeline:
+    """
+    Sentence-Pipelined Text-to-Speech.
+    - The model stream is cut into sentences while it is still generating.
+    - Each sentence is sent to TTS as soon as it is complete, while the model keeps going.
+    - Audio is played strictly in order; the next sentence is synthesized while
+      the current one plays, so there are no gaps between sentences.
+    """
+    def __init__(self, tts_bridge, sink, max_buffered_chunks=64):
+        self.tts_bridge = tts_bridge
+        self.sink = sink
+        self.max_buffered_chunks = max_buffered_chunks
+        self.last_metrics = None
+
+    def speak_stream(self, text_chunks, cancel_event=None, speech_end_time=None, on_first_audio=None):
+        """
+        Speaks an iterable of text pieces. Returns (full_text, metrics).
+        speech_end_time (time.perf_counter) is when the user stopped talking; it turns
+        first audio into end-to-end perceived latency.
+        Metrics are in ms from the call unless noted.
+        """
+        start = time.perf_counter()
+        metrics = {
+            "first_text_ms": None,
+            "first_sentence_ms": None,
+            "ttfs_ms": None,
+            "perceived_ms": None,  # end of user speech -> first audio
+            "total_ms": None,
+            "sentences": 0,
+            "bytes": 0,
+            "cancelled": False,
+        }
+        sentences = queue.Queue()
+        audio = queue.Queue(maxsize=self.max_buffered_chunks)
+        reply = []
+
+        def cancelled():
+            return cancel_event is not None and cancel_event.is_set()
+
+        def elapsed_ms():
+            return 1000 * (time.perf_counter() - start)
+
+        def produce():
+            splitter = SentenceSplitter()
+            try:
+                for piece in text_chunks:
+                    if cancelled():
+                        break
+                    if not piece:
+                        continue
+                    if metrics["first_text_ms"] is None:
+                        metrics["first_text_ms"] = elapsed_ms()
+                    reply.append(piece)
+                    for sentence in splitter.feed(piece):
+                        if metrics["first_sentence_ms"] is None:
+                            metrics["first_sentence_ms"] = elapsed_ms()
+                        sentences.put(sentence)
+
+                rest = splitter.flush()
+                if rest and not cancelled():
+                    if metrics["first_sentence_ms"] is None:
+                        metrics["first_sentence_ms"] = elapsed_ms()
+                    sentences.put(rest)
+            except Exception as e:
+                print(f"Text Stream Error: {e}")
+            finally:
+                sentences.put(_DONE)
+
+        def synthesize():
+            try:
+                while True:
+                    sentence = sentences.get()
+                    if sentence is _DONE:
+                        break
+                    if cancelled():
+                        continue  # keep draining so the producer can finish
+                    metrics["sentences"] += 1
+                    for chunk in self.tts_bridge.stream_speech(sentence):
+                        if cancelled():
+                            break
+                        audio.put(chunk)
+            except Exception as e:
+                print(f"TTS Error: {e}")
+            finally:
+                audio.put(_DONE)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        synthesizer = threading.Thread(target=synthesize, daemon=True)
+        producer.start()
+        synthesizer.start()
+
+        self.sink.open()
+        try:
+            while True:
+                chunk = audio.get()
+                if chunk is _DONE:
+                    break
+                if cancelled():
+                    metrics["cancelled"] = True
+                    continue  # drain without playing
+
+                if metrics["ttfs_ms"] is None:
+                    metrics["ttfs_ms"] = elapsed_ms()
+                    if speech_end_time is not None:
+                        metrics["perceived_ms"] = 1000 * (time.perf_counter() - speech_end_time)
+                    if on_first_audio:
+                        on_first_audio()
+
+                self.sink.write(chunk)
+                metrics["bytes"] += len(chunk)
+        finally:
+            self.sink.close()
+
+        producer.join(timeout=1.0)
+        synthesizer.join(timeout=1.0)
+        # also when the cancel came between chunks and nothing was left to drop here
+        metrics["cancelled"] = metrics["cancelled"] or cancelled()
+        metrics["total_ms"] = elapsed_ms()
+        self.last_metrics = metrics
+        return "".join(reply), metrics
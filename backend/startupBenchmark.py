@@ -0,0 +1,45 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# startup marks in the order they happen (ms since main.py started)
+EVENTS = ["imports", "model_ready", "first_frame", "first_result", "first_cursor_move"]
+
+
+def run_once(source=None, timeout=60):
+    """One cold start of main.py in a fresh process; returns its startup marks (ms)."""
+    cmd = [sys.executable, "main.py", "--startup-benchmark"] + ([str(source)] if source is not None else [])
+    completed = subprocess.run(cmd, cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, timeout=timeout)
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError(f"main.py printed no startup marks (exit code {completed.returncode}):\n{completed.stderr[-2000:]}")
+
+
+def benchmark(source=None, runs=5, timeout=60):
+    """Median, min and max of every startup mark over several cold starts."""
+    samples = {}
+    for i in range(runs):
+        marks = run_once(source, timeout)
+        print(f"run {i + 1}/{runs}: " + ", ".join(f"{event} {ms:.0f} ms" for event, ms in marks.items()))
+        for event, ms in marks.items():
+            samples.setdefault(event, []).append(ms)
+
+    events = [e for e in EVENTS if e in samples] + [e for e in samples if e not in EVENTS]
+    return {e: {"median": statistics.median(samples[e]), "min": min(samples[e]), "max": max(samples[e]), "runs": len(samples[e])} for e in events}
+
+
+if __name__ == "__main__":
+    # python startupBenchmark.py [video with a hand in view] [runs]
+    # time-to-first-cursor-move needs a hand in front of the camera, so a recorded video gives repeatable numbers
+    source = sys.argv[1] if len(sys.argv) > 1 else None
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    report = benchmark(source, runs)
+
+    print(f"\n{'event':<20}{'median ms':>12}{'min ms':>10}{'max ms':>10}{'runs':>6}")
+    for event, s in report.items():
+        print(f"{event:<20}{s['median']:>12.0f}{s['min']:>10.0f}{s['max']:>10.0f}{s['runs']:>6}")
+    if "first_cursor_move" not in report:
+        print("\nNo cursor move: was there a hand (index finger up) in view?")
@@ -0,0 +1,7 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# the modules open their data files (gesture_rules.json, ...) relative to the backend folder
+os.chdir(BACKEND_DIR)
@@ -0,0 +1,11 @@
+import pytest
+
+from gestureClassifier import CustomGestures
+
+
+@pytest.mark.parametrize("samples", [0, -5])
+def test_enrollment_rejects_non_positive_sample_counts(tmp_path, samples):
+    gestures = CustomGestures(str(tmp_path / "custom.npz"), 640, 480)
+    with pytest.raises(ValueError):
+        gestures.start_recording("peace", samples)
+    assert not gestures.is_recording()
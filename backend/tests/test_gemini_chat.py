@@ -0,0 +1,15 @@
+from geminiChat import ConversationHistory
+
+
+def test_truncated_counts_only_what_the_last_request_left_out():
+    history = ConversationHistory(max_tokens=30)
+    for i in range(5):
+        history.add(f"question {i} " + "x" * 20, f"answer {i} " + "y" * 20)
+
+    contents = history.contents("next question")
+    kept = (len(contents) - 1) // 2
+    assert history.truncated == 5 - kept
+
+    # asking again drops the same exchanges; they are not counted twice
+    history.contents("next question")
+    assert history.truncated == 5 - kept
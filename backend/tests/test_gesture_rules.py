@@ -0,0 +1,99 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from gestureActions import GestureActions
+from gestureRules import RuleEngine
+from handFeatures import FINGER_PIPS, FINGER_TIPS, INDEX_TIP, THUMB_TIP, HandFeatures
+
+GOOD_RULES = {"rules": [{"name": "cursor", "when": {"fingers_up": {"max": 1}}, "action": "cursor", "status": "Cursor Mode"}]}
+
+MALFORMED = {
+    "not an object": [],
+    "rules missing": {"rule": []},
+    "rules not a list": {"rules": {"name": "cursor"}},
+    "rule not an object": {"rules": ["cursor"]},
+    "when not an object": {"rules": [{"name": "x", "when": ["fingers_up", 1]}]},
+    "unknown feature": {"rules": [{"name": "x", "when": {"finger_count": 1}}]},
+    "unknown action": {"rules": [{"name": "x", "action": "teleport"}]},
+    "range with other keys": {"rules": [{"name": "x", "when": {"fingers_up": {"above": 1}}}]},
+    "range bound not a number": {"rules": [{"name": "x", "when": {"fingers_up": {"max": "one"}}}]},
+    "unhashable choice": {"rules": [{"name": "x", "when": {"gesture": [{"name": "Open_Palm"}]}}]},
+    "hold not a number": {"rules": [{"name": "x", "hold": "long"}]},
+    "hands not a number": {"rules": [{"name": "x", "hands": "two"}]},
+    "args not an object": {"rules": [{"name": "x", "action": "hotkey", "args": ["ctrl", "up"]}]},
+    "unknown mode": {"rules": [{"name": "x", "mode": "DRAG"}]},
+}
+
+
+def write(path, config):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f)
+
+
+@pytest.mark.parametrize("config", MALFORMED.values(), ids=MALFORMED.keys())
+def test_malformed_rules_are_a_value_error(tmp_path, config):
+    path = tmp_path / "rules.json"
+    write(path, config)
+    with pytest.raises(ValueError):
+        RuleEngine(str(path), GestureActions(mouse=None))
+
+
+@pytest.mark.parametrize("config", MALFORMED.values(), ids=MALFORMED.keys())
+def test_broken_edit_keeps_the_previous_rules(tmp_path, config):
+    path = tmp_path / "rules.json"
+    write(path, GOOD_RULES)
+    engine = RuleEngine(str(path), GestureActions(mouse=None))
+    table = engine.table
+
+    write(path, config)
+    os.utime(path, (1, 1))
+    assert engine.maybe_reload(now=engine.last_check + 10) is False
+    assert engine.table is table
+    # the same broken file isn't re-read on every poll
+    assert engine.maybe_reload(now=engine.last_check + 10) is False
+
+
+class FakeMouse:
+    def __init__(self):
+        self.scroll_anchor = None
+        self.scrolls = []
+
+    def perform_scroll(self, y):
+        self.scrolls.append(y)
+
+    def move_cursor(self, x, y, timestamp):
+        pass
+
+
+def pinching_fist():
+    # fingertips below their middle joints (no finger up), thumb tip on the index tip
+    points = np.full((1, 21, 3), 0.5)
+    points[0, FINGER_PIPS, 1] = 0.4
+    points[0, FINGER_TIPS, 1] = 0.6
+    points[0, THUMB_TIP] = points[0, INDEX_TIP]
+    return HandFeatures(points, 640, 480)
+
+
+def test_hold_starts_over_when_the_hand_comes_back():
+    mouse = FakeMouse()
+    engine = RuleEngine("gesture_rules.json", GestureActions(mouse))
+    no_hands = HandFeatures([], 640, 480)
+    t = 0.0
+    for _ in range(3):
+        engine.evaluate(pinching_fist(), t, timestamp=t)
+        t += 1 / 30
+    for _ in range(30):
+        engine.evaluate(no_hands, t, timestamp=t)
+        t += 1 / 30
+
+    # back, still pinching: pinch_scroll's 0.4 s hold counts from now, not from the first pinch
+    status, _ = engine.evaluate(pinching_fist(), t, timestamp=t)
+    assert status == "Pinching..."
+    assert not mouse.scrolls
+
+    status, _ = engine.evaluate(pinching_fist(), t + 0.5, timestamp=t + 0.5)
+    assert status == "Click & Hold: Scrolling"
+    assert mouse.scrolls
@@ -0,0 +1,145 @@
+import types
+
+import numpy as np
+
+import main
+from engineResults import EngineResults
+from frameBroadcaster import FrameBroadcaster
+from gestureActions import GestureActions
+from gestureRules import RuleEngine
+from gestureTrace import hand_pose
+from handFeatures import HandFeatures
+from handState import HandPresence
+from inputDispatcher import FakeInputBackend, InputDispatcher
+from metrics import create_metrics
+from mouseControl import MouseController
+from session import Session
+from visionProcess import Category, RemoteResult
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+
+class FakeCamera:
+    """A camera at `fps` (or whatever set_max_fps asks for); a hand is in view while hand_visible."""
+    def __init__(self, clock, fps=30):
+        self.clock = clock
+        self.fps = fps
+        self.max_fps = None
+        self.hand_visible = False
+        self.frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    def interval(self):
+        return 1.0 / (self.max_fps or self.fps)
+
+    frame_period = interval
+
+    def read(self, timeout=0):
+        # the frame comes out 5 ms after it was captured
+        return True, self.frame, self.clock.now - 0.005
+
+    def set_max_fps(self, fps):
+        self.max_fps = fps
+
+
+class FakeEngine(EngineResults):
+    """Results arrive one frame late, like a recognizer that takes a frame interval to run."""
+    def __init__(self, camera):
+        self.camera = camera
+        self.pending = None
+        self.ready = None
+        self.features = None
+        self.stale_results = 0
+        self.metrics = create_metrics(enabled=False)
+
+    def process_rgb(self, timestamp_ms, rgb):
+        self.ready, self.pending = self.pending, (timestamp_ms, self.camera.hand_visible)
+
+    def take_result(self, now_ms, max_age_ms=None):
+        if self.ready is None:
+            return None, 0
+        (timestamp, hand), self.ready = self.ready, None
+        if self.is_stale(timestamp, now_ms, max_age_ms):
+            return None, 0
+        if hand:
+            return RemoteResult(hand_pose(0.5, 0.5)[None], [[Category("Pointing_Up", 0.9)]]), timestamp
+        return RemoteResult(np.empty((0, 21, 3)), []), timestamp
+
+
+def make_session(camera, idle_after_s):
+    dispatcher = InputDispatcher(FakeInputBackend())
+    mouse = MouseController(smooting_factor=2, margin=100, cam_w=640, cam_h=480, screen_w=1920, screen_h=1080,
+                            key_zoom_in=("command", "+"), key_zoom_out=("command", "-"), key_swipe_left=("ctrl", "left"),
+                            key_swipe_right=("ctrl", "right"), dispatcher=dispatcher)
+    rules = RuleEngine("./gesture_rules.json", GestureActions(mouse))
+    metrics = create_metrics(enabled=False)
+    presence = HandPresence(idle_after_s=idle_after_s, idle_fps=5)
+    return Session("test", camera, FakeEngine(camera), mouse, rules, FrameBroadcaster(metrics=metrics), metrics,
+                   HandFeatures([], 640, 480), presence=presence)
+
+
+def run(session, clock, seconds):
+    end = clock.now + seconds
+    while clock.now < end:
+        clock.now += session.grabber.interval()
+        main.process_frame(session)
+
+
+def cursor_moves(session):
+    session.mouse.input.stop()
+    return session.mouse.input.stats()["dispatched"]
+
+
+def test_idle_at_5_fps_resumes_when_a_hand_appears(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(main, "time", types.SimpleNamespace(time=clock.time, perf_counter=clock.perf_counter))
+    camera = FakeCamera(clock)
+    session = make_session(camera, idle_after_s=1.0)
+
+    run(session, clock, 2.0)
+    assert session.presence.idle
+    assert camera.max_fps == 5
+
+    # at 5 fps every result is ~205 ms old, past MAX_RESULT_AGE_MS, and must still wake the camera
+    camera.hand_visible = True
+    run(session, clock, 1.0)
+    assert not session.presence.idle
+    assert camera.max_fps is None
+    assert session.status_text == "Cursor Mode"
+    assert cursor_moves(session) > 0
+
+
+def test_low_fps_camera_still_drives_the_cursor(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(main, "time", types.SimpleNamespace(time=clock.time, perf_counter=clock.perf_counter))
+    camera = FakeCamera(clock, fps=5)
+    camera.hand_visible = True
+    session = make_session(camera, idle_after_s=None)
+
+    run(session, clock, 2.0)
+    assert cursor_moves(session) > 0
+    assert session.engine.stale_results == 0
+
+
+def test_capture_stalls_do_not_make_old_results_acceptable(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(main, "time", types.SimpleNamespace(time=clock.time, perf_counter=clock.perf_counter))
+    camera = FakeCamera(clock)
+    camera.hand_visible = True
+    session = make_session(camera, idle_after_s=None)
+    run(session, clock, 1.0)
+
+    # the camera hangs for a second at a time: each result that comes out is a second old
+    for _ in range(8):
+        clock.now += 1.0
+        main.process_frame(session)
+    assert session.engine.stale_results == 8
+
@@ -0,0 +1,74 @@
+import threading
+
+from inputDispatcher import FakeInputBackend, InputDispatcher
+
+
+class GatedBackend(FakeInputBackend):
+    """Holds the dispatcher thread in its first call until released, so later actions queue up."""
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def move_to(self, x, y):
+        if not self.started.is_set():
+            self.started.set()
+            self.release.wait(1.0)
+        super().move_to(x, y)
+
+
+def test_queued_moves_collapse_and_other_actions_keep_their_order():
+    backend = GatedBackend()
+    dispatcher = InputDispatcher(backend)
+    dispatcher.move_to(0, 0)
+    assert backend.started.wait(1.0)
+
+    # all of these queue up behind the first move
+    dispatcher.move_to(1, 1)
+    dispatcher.move_to(2, 2)
+    dispatcher.move_to(3, 3)
+    dispatcher.click()
+    dispatcher.move_to(4, 4)
+    dispatcher.move_to(5, 5)
+    dispatcher.scroll(-3)
+    dispatcher.hotkey("ctrl", "up")
+    dispatcher.click()
+    dispatcher.move_to(6, 6)
+
+    backend.release.set()
+    assert dispatcher.flush()
+    dispatcher.stop()
+
+    assert backend.events == [
+        ("move_to", 0, 0),
+        ("move_to", 3, 3),
+        ("click",),
+        ("move_to", 5, 5),
+        ("scroll", -3),
+        ("hotkey", "ctrl", "up"),
+        ("click",),
+        ("move_to", 6, 6),
+    ]
+    stats = dispatcher.stats()
+    assert stats["dispatched"] == 8
+    assert stats["coalesced"] == 3
+    assert stats["errors"] == 0
+    assert stats["queue_depth"] == 0
+    assert stats["actions"] == {"move_to": 7, "click": 2, "scroll": 1, "hotkey": 1}
+
+
+def test_a_failing_action_is_counted_and_the_rest_still_run():
+    class FlakyBackend(FakeInputBackend):
+        def hotkey(self, *keys):
+            raise RuntimeError("no such key")
+
+    backend = FlakyBackend()
+    dispatcher = InputDispatcher(backend)
+    dispatcher.hotkey("nope")
+    dispatcher.click()
+    assert dispatcher.flush()
+    dispatcher.stop()
+
+    assert backend.events == [("click",)]
+    assert dispatcher.stats()["errors"] == 1
+    assert dispatcher.stats()["dispatched"] == 2
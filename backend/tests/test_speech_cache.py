@@ -0,0 +1,28 @@
+from speechCache import SpeechCache
+
+
+def test_hot_key_survives_disk_eviction(tmp_path):
+    # room for 4 clips on disk, all of them in memory too
+    cache = SpeechCache(cache_dir=str(tmp_path), max_disk_bytes=4 * 100, max_memory_items=8)
+    cache.put("hot", b"h" * 100)
+    for i in range(10):
+        cache.put(f"cold{i}", b"c" * 100)
+        assert cache.get("hot") == b"h" * 100
+
+    assert cache.contains("hot")
+    assert (tmp_path / "hot.audio").exists()
+    assert cache.stats()["memory_hits"] == 10
+    assert cache.stats()["evictions"] == 7
+
+
+def test_hot_key_order_survives_a_restart(tmp_path):
+    cache = SpeechCache(cache_dir=str(tmp_path), max_disk_bytes=3 * 100)
+    cache.put("hot", b"h" * 100)
+    cache.put("a", b"a" * 100)
+    cache.put("b", b"b" * 100)
+    cache.get("hot")
+
+    restarted = SpeechCache(cache_dir=str(tmp_path), max_disk_bytes=3 * 100)
+    restarted.put("c", b"c" * 100)
+    assert restarted.contains("hot")
+    assert not restarted.contains("a")
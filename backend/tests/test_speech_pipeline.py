@@ -0,0 +1,81 @@
+import threading
+
+from audioSink import FakeAudioSink
+from elevenLabsBridge import ElevenLabsBridge, FakeElevenLabsClient, FakeTextToSpeech
+from geminiChat import FakeGeminiClient, GeminiChat
+from speechPipeline import SentenceSplitter, SpeechPipeline
+
+SENTENCES = ["This is a test answer.", "It has a few sentences!", "Does it stream well?", "Yes it does."]
+
+
+class TaggedTextToSpeech(FakeTextToSpeech):
+    """"Audio" is the sentence's own text, so the sink shows which sentence played when."""
+    def _audio(self, text):
+        return text.encode("utf-8")
+
+
+def make_bridge(**kwargs):
+    client = FakeElevenLabsClient()
+    client.text_to_speech = TaggedTextToSpeech(**kwargs)
+    return ElevenLabsBridge(client=client), client.text_to_speech
+
+
+def make_chat(**kwargs):
+    return GeminiChat("fake", client=FakeGeminiClient(reply=" ".join(SENTENCES), **kwargs))
+
+
+def test_sentences_split_on_partial_deltas():
+    splitter = SentenceSplitter()
+    assert splitter.feed("This is a te") == []
+    assert splitter.feed("st answer. It has a") == ["This is a test answer."]
+    # a sentence end only counts once the next one has started
+    assert splitter.feed(" few sentences!") == []
+    assert splitter.feed(" Does") == ["It has a few sentences!"]
+    assert splitter.flush() == "Does"
+    assert splitter.flush() == ""
+
+
+def test_short_sentences_are_merged():
+    splitter = SentenceSplitter(min_chars=12)
+    assert splitter.feed("Sure. Ok. ") == []
+    assert splitter.feed("That works fine. Next") == ["Sure. Ok. That works fine."]
+
+
+def test_pipeline_speaks_sentences_in_order():
+    # the model streams 16 characters at a time; synthesis is slower than generation
+    bridge, tts = make_bridge(first_byte_delay=0.02)
+    sink = FakeAudioSink()
+    reply, metrics = SpeechPipeline(bridge, sink).speak_stream(make_chat(chunk_delay=0.005).generate_stream("hi"))
+
+    assert reply == " ".join(SENTENCES)
+    assert tts.requests == SENTENCES
+    assert sink.audio() == "".join(SENTENCES).encode("utf-8")
+    assert metrics["sentences"] == len(SENTENCES)
+    assert metrics["first_sentence_ms"] <= metrics["ttfs_ms"] <= metrics["total_ms"]
+    assert metrics["cancelled"] is False
+
+
+class CancellingSink(FakeAudioSink):
+    """Cancels the reply as soon as the first audio is played."""
+    def __init__(self, cancel_event):
+        super().__init__()
+        self.cancel_event = cancel_event
+
+    def write(self, pcm_bytes):
+        super().write(pcm_bytes)
+        self.cancel_event.set()
+
+
+def test_cancel_drops_pending_sentences():
+    # the whole reply is split at once, so the later sentences are queued when the cancel comes
+    bridge, tts = make_bridge(first_byte_delay=0.05)
+    cancel = threading.Event()
+    sink = CancellingSink(cancel)
+    _, metrics = SpeechPipeline(bridge, sink).speak_stream(make_chat().generate_stream("hi"), cancel_event=cancel)
+
+    assert metrics["cancelled"] is True
+    assert sink.audio() == SENTENCES[0].encode("utf-8")
+    # at most the sentence already being synthesized was requested; the rest never reached TTS
+    assert len(tts.requests) <= 2
+    assert metrics["sentences"] <= 2
+    assert not sink.is_open
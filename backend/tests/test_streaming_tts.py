@@ -0,0 +1,74 @@
+import threading
+
+from audioSink import FakeAudioSink
+from elevenLabsBridge import STREAM_FORMAT, ElevenLabsBridge, FakeElevenLabsClient
+from speechCache import SpeechCache
+
+TEXT = "Hello there, this is a streamed reply."
+
+
+def expected_audio(client, text):
+    return client.text_to_speech._audio(text)
+
+
+def test_pcm_chunks_reach_the_sink_unchanged():
+    client = FakeElevenLabsClient(chunk_size=1000)
+    sink = FakeAudioSink()
+    metrics = ElevenLabsBridge(client=client).play_streaming(TEXT, sink)
+
+    audio = expected_audio(client, TEXT)
+    assert sink.audio() == audio
+    assert [len(chunk) for chunk in sink.chunks[:-1]] == [1000] * (len(sink.chunks) - 1)
+    assert metrics["bytes"] == len(audio)
+    assert metrics["cancelled"] is False
+    assert not sink.is_open
+
+
+def test_first_byte_and_first_sound_times():
+    client = FakeElevenLabsClient(first_byte_delay=0.05, chunk_delay=0.01)
+    metrics = ElevenLabsBridge(client=client).play_streaming(TEXT, FakeAudioSink())
+
+    # ~25 chunks 10 ms apart: the first one is played as soon as it arrives, not after the whole clip
+    assert metrics["ttfb_ms"] >= 50
+    assert metrics["ttfb_ms"] <= metrics["ttfs_ms"] < metrics["total_ms"] / 2
+
+
+class CancellingSink(FakeAudioSink):
+    """Sets the cancel event once it has been given `after` chunks."""
+    def __init__(self, cancel_event, after):
+        super().__init__()
+        self.cancel_event = cancel_event
+        self.after = after
+
+    def write(self, pcm_bytes):
+        super().write(pcm_bytes)
+        if len(self.chunks) == self.after:
+            self.cancel_event.set()
+
+
+def test_cancel_stops_mid_stream_and_nothing_is_cached(tmp_path):
+    client = FakeElevenLabsClient(chunk_size=1000)
+    cache = SpeechCache(cache_dir=str(tmp_path))
+    bridge = ElevenLabsBridge(client=client, cache=cache)
+    cancel = threading.Event()
+    sink = CancellingSink(cancel, after=2)
+
+    metrics = bridge.play_streaming(TEXT, sink, cancel_event=cancel)
+
+    assert metrics["cancelled"] is True
+    assert metrics["bytes"] == 2000
+    assert len(sink.chunks) == 2
+    assert not sink.is_open
+    # a cut-off clip must not be served as the whole line next time
+    assert not cache.contains(cache.make_key(TEXT, "ljX1ZrXuDIIRVcmiVSyR", {"format": STREAM_FORMAT}))
+
+
+def test_second_play_comes_from_the_cache(tmp_path):
+    client = FakeElevenLabsClient(chunk_size=1000)
+    bridge = ElevenLabsBridge(client=client, cache=SpeechCache(cache_dir=str(tmp_path)))
+    bridge.play_streaming(TEXT, FakeAudioSink())
+
+    sink = FakeAudioSink()
+    bridge.play_streaming(TEXT, sink)
+    assert client.text_to_speech.requests == [TEXT]
+    assert sink.audio() == expected_audio(client, TEXT)
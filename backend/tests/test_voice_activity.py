@@ -0,0 +1,36 @@
+import numpy as np
+
+from audioSource import PcmSource
+from voiceActivity import NOISE_CHANGE, VoiceActivityDetector, VoiceListener, synthetic_utterance
+
+
+def noise(seconds, level_db, sample_rate=16000, seed=1):
+    samples = np.random.default_rng(seed).standard_normal(int(sample_rate * seconds)) * (32768 * 10 ** (level_db / 20))
+    return samples.astype("<i2").tobytes()
+
+
+def test_lasting_noise_rise_is_relearned_not_speech():
+    # quiet room, then a fan 20 dB louder that never stops
+    pcm = noise(2.0, -50) + noise(20.0, -30, seed=2)
+    vad = VoiceActivityDetector(frame_ms=20)
+    events = []
+    speaking = []
+    for i in range(0, len(pcm), 640):
+        events.append(vad.process(pcm[i:i + 640]))
+        speaking.append(vad.speaking)
+
+    assert events.count(NOISE_CHANGE) == 1
+    assert vad.noise.level() > -35
+    # the last 5 s (well after the re-measure) are all background again
+    assert not any(speaking[-250:])
+
+
+def test_listen_after_noise_rise_returns_the_speech_not_the_noise():
+    speech, lead_s, speech_end_s = synthetic_utterance(lead_s=12.0, noise_db=-30.0, speech_db=-10.0, seed=3)
+    quiet_s = 2.0
+    listener = VoiceListener(PcmSource(noise(quiet_s, -50) + speech), background=False).start()
+
+    utterance = listener.listen(timeout=20.0, max_seconds=15.0)
+    assert utterance is not None
+    assert abs(utterance.speech_start_s - (quiet_s + lead_s)) < 0.3
+    assert utterance.speech_end_s <= quiet_s + speech_end_s + 0.3
@@ -1,15 +1,12 @@
-import math
 from enum import Enum
-import pyautogui
+from functools import lru_cache
 
 MODEL_PATH = './gesture_recognizer.task'
 
-# Camera & Screen
+# Camera & Screen (SCREEN_W / SCREEN_H are looked up on first use, see __getattr__ below)
 CAM_W, CAM_H = 640, 480
-SCREEN_W, SCREEN_H = pyautogui.size()
 
 # Performance Tuners
-pyautogui.PAUSE = 0           # Remove lag
 SMOOTHING_FACTOR = 2          # Lower = faster, Higher = smoother
 MARGIN = 100                  # Box margin for mouse movement
 SCROLL_SENSITIVITY = 15       # Pixels per scroll step
@@ -33,12 +30,30 @@ class GestureMode(Enum):
     CURSOR = 1  # 1 Finger
     SCROLL = 2  # 2 Fingers
     SWIPE = 3   # 3+ Fingers
+    ZOOM = 4    # 2 Hands pinching
+
+class VoiceState(Enum):
+    IDLE = 0
+    LISTENING = 1  # Microphone open
+    THINKING = 2   # Waiting on Gemini
+    SPEAKING = 3   # ElevenLabs + playback
+
+def __getattr__(name):
+    # importing pyautogui and asking the OS for the screen size is slow, so only do it when needed
+    if name in ("SCREEN_W", "SCREEN_H"):
+        screen_w, screen_h = Utils.screen_size()
+        return screen_w if name == "SCREEN_W" else screen_h
+    raise AttributeError(f"module 'utils' has no attribute '{name}'")
 
 class Utils:
     @staticmethod
-    def map_range(value, in_min, in_max, out_min, out_max):
-        return (value - in_min) * (out_max - out_min) / (in_max - in_min) + out_min
+    @lru_cache(maxsize=1)
+    def screen_size():
+        """(width, height) of the main screen, asked from the OS once."""
+        import pyautogui
+        width, height = pyautogui.size()
+        return width, height
 
     @staticmethod
-    def calc_distance(p1, p2):
-        return math.hypot(p1.x - p2.x, p1.y - p2.y)
\ No newline at end of file
+    def map_range(value, in_min, in_max, out_min, out_max):
+        return (value - in_min) * (out_max - out_min) / (in_max - in_min) + out_min
\ No newline at end of file
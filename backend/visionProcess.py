@@ -0,0 +1,417 @@
+import collections
+import multiprocessing
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from engineResults import EngineResults
+from handFeatures import HandFeatures
+from metrics import NullMetrics
+from overlay import draw_points
+
+# what the action logic reads from a recognizer result, rebuilt in this process
+Category = collections.namedtuple("Category", "category_name score")
+RemoteResult = collections.namedtuple("RemoteResult", "hand_landmarks gestures")
+
+
+class SharedFrameRing:
+    """
+    Shared-Memory Frame Ring.
+    - N BGR frame slots in one multiprocessing.shared_memory block, written by the
+      capture process and read (copied) by any number of processes.
+    - Every slot carries the sequence number of the frame in it; a reader checks it
+      before and after copying, so a slot overwritten mid-copy is never used.
+    - Only the writer touches slot data; the newest sequence number is published
+      separately (under the shared Condition) once the slot is complete.
+    """
+    def __init__(self, shape, slots=4, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        frame_bytes = int(np.prod(self.shape))
+        header_bytes = 8 * (2 * slots + 1)
+
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + slots * frame_bytes)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+
+        buf = self.shm.buf
+        self.seqs = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=0)
+        self.times = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=8 * slots)
+        self.latest = np.ndarray((1,), dtype=np.int64, buffer=buf, offset=16 * slots)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=buf, offset=header_bytes)
+        if self.owner:
+            self.seqs[:] = 0
+            self.latest[0] = 0
+
+    def spec(self):
+        """What a child process needs to attach: SharedFrameRing(*ring.spec())."""
+        return self.shape, self.slots, self.shm.name
+
+    def write(self, frame, capture_time):
+        """Copies a frame into the next slot and returns its sequence number (not yet published)."""
+        seq = int(self.latest[0]) + 1
+        slot = seq % self.slots
+        self.seqs[slot] = -1  # being written
+        self.frames[slot] = frame
+        self.times[slot] = capture_time
+        self.seqs[slot] = seq
+        return seq
+
+    def publish(self, seq):
+        self.latest[0] = seq
+
+    def latest_seq(self):
+        return int(self.latest[0])
+
+    def read(self, seq, out=None, code=None):
+        """
+        Returns (frame copy, capture_time) for a frame, or (None, 0) if its slot was reused.
+        The copy goes into out when given (no allocation), converted with code (cv2.COLOR_*) if set.
+        """
+        slot = seq % self.slots
+        if self.seqs[slot] != seq:
+            return None, 0
+        if code is not None:
+            frame = cv2.cvtColor(self.frames[slot], code, dst=out)
+        elif out is not None:
+            np.copyto(out, self.frames[slot])
+            frame = out
+        else:
+            frame = self.frames[slot].copy()
+        capture_time = float(self.times[slot])
+        if self.seqs[slot] != seq:
+            return None, 0
+        return frame, capture_time
+
+    def close(self):
+        # numpy views keep the buffer exported, drop them before closing
+        self.seqs = self.times = self.latest = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _capture_main(ring_spec, cond, stop_event, capture_done, captured, min_interval, camera_interval, source, cam_w, cam_h):
+    """Capture process: camera -> ring, as fast as the driver delivers frames (or one per min_interval s)."""
+    ring = SharedFrameRing(*ring_spec)
+    cap = cv2.VideoCapture(source)
+    is_file = isinstance(source, str)
+    cap.set(3, cam_w)
+    cap.set(4, cam_h)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    camera_interval.value = 1.0 / fps if fps and fps > 0 else 0.0
+
+    last_capture = 0.0
+    try:
+        while not stop_event.is_set() and cap.isOpened():
+            # as in FrameGrabber: frames skipped by a capped rate are grabbed but not decoded
+            if not cap.grab():
+                if is_file:
+                    break
+                time.sleep(0.005)
+                continue
+            capture_time = time.time()
+            if capture_time - last_capture < min_interval.value:
+                continue
+            success, frame = cap.retrieve()
+            if not success:
+                continue
+            last_capture = capture_time
+
+            # not every camera honours the requested size
+            if frame.shape != ring.shape:
+                frame = cv2.resize(frame, (ring.shape[1], ring.shape[0]))
+            seq = ring.write(frame, capture_time)
+            with cond:
+                ring.publish(seq)
+                captured.value += 1
+                cond.notify_all()
+    finally:
+        cap.release()
+        capture_done.set()
+        with cond:
+            cond.notify_all()
+        ring.close()
+
+
+def _pack_result(result, timestamp):
+    points = HandFeatures.to_array(result.hand_landmarks).astype(np.float32)
+    gestures = [[Category(g[0].category_name, g[0].score)] if g else [] for g in result.gestures]
+    return timestamp, points, gestures
+
+
+def _inference_main(ring_spec, cond, stop_event, capture_done, result_conn, skipped, model_path, roi_tracking):
+    """Inference process: newest frame in the ring -> MediaPipe -> (timestamp, landmarks, gestures) over a pipe."""
+    from gestureEngine import GestureEngine
+
+    ring = SharedFrameRing(*ring_spec)
+
+    def send_result(result, timestamp):
+        if not stop_event.is_set():
+            result_conn.send(_pack_result(result, timestamp))
+
+    engine = GestureEngine(model_path=model_path, roi_tracking=roi_tracking, on_result=send_result, mirror=True)
+    engine.warm_up(*ring.shape[1::-1])
+    # the slot is converted straight into this buffer: no copy, no flip (the landmarks are mirrored)
+    rgb_frame = np.empty(ring.shape, dtype=np.uint8)
+    last_seq = 0
+    try:
+        while not stop_event.is_set():
+            with cond:
+                cond.wait_for(lambda: ring.latest_seq() > last_seq or stop_event.is_set() or capture_done.is_set(), 0.5)
+                seq = ring.latest_seq()
+            if seq <= last_seq:
+                if capture_done.is_set():
+                    break
+                continue
+
+            # frames captured while the recognizer was busy are skipped, never queued
+            if last_seq:
+                skipped.value += seq - last_seq - 1
+            last_seq = seq
+
+            frame, capture_time = ring.read(seq, out=rgb_frame, code=cv2.COLOR_BGR2RGB)
+            if frame is None:
+                continue
+            engine.process_rgb(int(capture_time * 1000), frame)
+    finally:
+        engine.recognizer.close()
+        result_conn.close()
+        ring.close()
+
+
+class VisionProcesses(EngineResults):
+    """
+    Multi-Process Capture + Inference.
+    - Camera capture and MediaPipe run in two spawned worker processes, so the
+      action logic, drawing and Flask in this process never compete with them for the GIL.
+    - Frames travel through a SharedFrameRing (no pickling); results come back
+      over a one-way pipe as a small float32 landmark array plus the top gesture per hand.
+    - Stands in for both FrameGrabber (read) and GestureEngine (take_result, get_features).
+    """
+    def __init__(self, model_path, source=0, cam_w=640, cam_h=480, roi_tracking=False, slots=4, metrics=None):
+        self.model_path = model_path
+        self.source = source
+        self.cam_w, self.cam_h = cam_w, cam_h
+        self.roi_tracking = roi_tracking
+        self.slots = slots
+        self.metrics = metrics or NullMetrics()
+
+        # spawn: forking a process that already runs threads (Flask, input, MediaPipe) isn't safe
+        self.ctx = multiprocessing.get_context("spawn")
+        self.ring = None
+        self.processes = []
+        self.last_read_seq = 0
+        self.features = None
+        # read() copies into this one buffer: a frame is only used until the next read
+        self.frame_buffer = None
+
+        # stats
+        self.dropped = 0
+        self.results = 0
+        self.superseded = 0
+        self.stale_results = 0
+
+    def start(self):
+        ctx = self.ctx
+        self.ring = SharedFrameRing((self.cam_h, self.cam_w, 3), slots=self.slots)
+        self.cond = ctx.Condition()
+        self.stop_event = ctx.Event()
+        self.capture_done = ctx.Event()
+        self.captured_count = ctx.Value("q", 0, lock=False)
+        self.skipped_count = ctx.Value("q", 0, lock=False)
+        self.min_interval = ctx.Value("d", 0.0, lock=False)
+        self.camera_interval = ctx.Value("d", 0.0, lock=False)
+        self.result_conn, child_conn = ctx.Pipe(duplex=False)
+
+        spec = self.ring.spec()
+        self.processes = [
+            ctx.Process(target=_capture_main, name="jarvis-capture", daemon=True,
+                        args=(spec, self.cond, self.stop_event, self.capture_done, self.captured_count, self.min_interval, self.camera_interval, self.source, self.cam_w, self.cam_h)),
+            ctx.Process(target=_inference_main, name="jarvis-inference", daemon=True,
+                        args=(spec, self.cond, self.stop_event, self.capture_done, child_conn, self.skipped_count, self.model_path, self.roi_tracking)),
+        ]
+        for process in self.processes:
+            process.start()
+        # only the inference process writes to the pipe
+        child_conn.close()
+        return self
+
+    @property
+    def captured(self):
+        return self.captured_count.value if self.ring else 0
+
+    def read(self, timeout=1.0):
+        """Same contract as FrameGrabber.read: (success, frame, capture_time) for a frame newer than the last one, valid until the next read."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.ring.latest_seq() > self.last_read_seq or self.capture_done.is_set(), timeout)
+            seq = self.ring.latest_seq()
+        if seq <= self.last_read_seq:
+            return False, None, 0
+
+        if self.last_read_seq:
+            self.dropped += seq - self.last_read_seq - 1
+        self.last_read_seq = seq
+        if self.frame_buffer is None:
+            self.frame_buffer = np.empty(self.ring.shape, dtype=np.uint8)
+        frame, capture_time = self.ring.read(seq, out=self.frame_buffer)
+        if frame is None:
+            return False, None, 0
+        return True, frame, capture_time
+
+    def set_max_fps(self, fps):
+        """Same as FrameGrabber.set_max_fps; the capture process picks it up on its next frame."""
+        if self.ring is not None:
+            self.min_interval.value = 1.0 / fps if fps else 0.0
+
+    def frame_period(self):
+        """Same as FrameGrabber.frame_period."""
+        if self.ring is None:
+            return 0.0
+        return max(self.min_interval.value, self.camera_interval.value)
+
+    def has_frame(self):
+        return self.ring is not None and self.ring.latest_seq() > self.last_read_seq
+
+    def is_running(self):
+        return self.ring is not None and not self.stop_event.is_set() and not self.capture_done.is_set()
+
+    def take_result(self, now_ms, max_age_ms=None):
+        """Same contract as GestureEngine.take_result; only the newest result waiting in the pipe is used."""
+        message = None
+        try:
+            while self.result_conn.poll():
+                if message is not None:
+                    self.superseded += 1
+                message = self.result_conn.recv()
+                self.results += 1
+                self.metrics.record("inference_lag", time.time() * 1000 - message[0])
+                self.metrics.tick("results")
+        except (EOFError, OSError):
+            # inference process is gone
+            pass
+        if message is None:
+            return None, 0
+
+        timestamp, points, gestures = message
+        if self.is_stale(timestamp, now_ms, max_age_ms):
+            return None, 0
+        return RemoteResult(points, gestures), timestamp
+
+    def stats(self):
+        return {
+            "captured": self.captured,
+            "dropped": self.dropped,
+            "inference_skipped": self.skipped_count.value if self.ring else 0,
+            "results": self.results,
+            "superseded": self.superseded,
+            "stale_results": self.stale_results,
+            "alive": sum(p.is_alive() for p in self.processes),
+        }
+
+    def stop(self, timeout=2.0):
+        """Asks both workers to finish, waits for them, then frees the shared memory."""
+        if self.ring is None:
+            return
+        self.stop_event.set()
+        with self.cond:
+            self.cond.notify_all()
+
+        deadline = time.time() + timeout
+        for process in self.processes:
+            process.join(max(0.0, deadline - time.time()))
+            if process.is_alive():
+                print(f"{process.name} did not stop in time, terminating")
+                process.terminate()
+                process.join()
+
+        self.result_conn.close()
+        self.ring.close()
+        self.ring = None
+
+
+# --- Benchmark: threaded vs multi-process ---
+
+def _drain(stream, stop):
+    """Plays one MJPEG viewer, the way a Flask response thread would."""
+    for _ in stream:
+        if stop.is_set():
+            break
+
+
+def benchmark(mode, source, seconds=20.0, model_path="./gesture_recognizer.task", cam_w=640, cam_h=480, viewers=2):
+    """Runs the vision loop the way main.py does (with MJPEG viewers attached) and returns its metrics."""
+    from frameBroadcaster import FrameBroadcaster
+    from metrics import Metrics
+
+    metrics = Metrics()
+    broadcaster = FrameBroadcaster(metrics=metrics)
+    if mode == "process":
+        vision = VisionProcesses(model_path, source=source, cam_w=cam_w, cam_h=cam_h, metrics=metrics).start()
+        grabber = engine = vision
+    else:
+        from frameGrabber import FrameGrabber
+        from gestureEngine import GestureEngine
+        engine = GestureEngine(model_path=model_path, metrics=metrics)
+        grabber = FrameGrabber(source=source, cam_w=cam_w, cam_h=cam_h).start()
+
+    stop = threading.Event()
+    for _ in range(viewers):
+        threading.Thread(target=_drain, args=(broadcaster.stream(), stop), daemon=True).start()
+
+    started = time.perf_counter()
+    while grabber.is_running() and time.perf_counter() - started < seconds:
+        success, frame, capture_time = grabber.read()
+        if not success:
+            continue
+        metrics.tick("frames")
+        lap = time.perf_counter()
+        frame = cv2.flip(frame, 1)
+        if mode != "process":
+            engine.process_rgb(int(capture_time * 1000), cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        result, result_timestamp = engine.take_result(time.time() * 1000)
+        if result is not None:
+            metrics.record("result_age", time.time() * 1000 - result_timestamp)
+            hands = engine.get_features(result, cam_w, cam_h)
+            draw_points(frame, hands.scaled.reshape(-1, 2))
+        broadcaster.publish(frame)
+        metrics.lap("loop", lap)
+
+    elapsed = time.perf_counter() - started
+    stop.set()
+    broadcaster.stop()
+    grabber.stop()
+    if mode != "process":
+        engine.recognizer.close()
+
+    snap = metrics.snapshot()
+    return {
+        "fps": snap["counters"].get("frames", 0) / elapsed,
+        "results_per_s": snap["counters"].get("results", 0) / elapsed,
+        "encoded_per_s": broadcaster.encoded / elapsed,
+        "loop_p95_ms": snap["stages_ms"].get("loop", {}).get("p95", 0.0),
+        "result_age_p50_ms": snap["stages_ms"].get("result_age", {}).get("p50", 0.0),
+        "result_age_p95_ms": snap["stages_ms"].get("result_age", {}).get("p95", 0.0),
+    }
+
+
+if __name__ == "__main__":
+    # python visionProcess.py [video file or camera index] [seconds]
+    source = sys.argv[1] if len(sys.argv) > 1 else 0
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+
+    columns = ["fps", "results_per_s", "encoded_per_s", "loop_p95_ms", "result_age_p50_ms", "result_age_p95_ms"]
+    print(f"{'mode':<10}" + "".join(f"{c:>19}" for c in columns))
+    for mode in ("threaded", "process"):
+        row = benchmark(mode, source, seconds)
+        print(f"{mode:<10}" + "".join(f"{row[c]:>19.1f}" for c in columns))
@@ -0,0 +1,367 @@
+import collections
+import math
+import threading
+import time
+
+import numpy as np
+
+SPEECH_START = "start"
+SPEECH_END = "end"
+# "speech" that went on for too long was a new, louder background: the noise level was re-measured
+NOISE_CHANGE = "noise"
+
+# speech_end is a perf_counter value (for latency metrics), the *_s fields are positions in the audio stream
+Utterance = collections.namedtuple("Utterance", "pcm sample_rate speech_end speech_start_s speech_end_s endpoint_s")
+
+
+def frame_energy_db(frame):
+    """RMS level of a 16-bit PCM frame in dB below full scale."""
+    samples = np.frombuffer(frame, dtype="<i2").astype(np.float32)
+    rms = math.sqrt(float(np.dot(samples, samples)) / max(len(samples), 1))
+    return 20 * math.log10(max(rms, 1.0) / 32768)
+
+
+class AmbientNoiseModel:
+    """
+    Running estimate of the background level (dBFS), fed with every frame that isn't speech.
+    - Follows the noise down quickly and up slowly, so a cough or a door doesn't raise it much.
+    - Never goes below floor_db, so near-digital silence doesn't make every click look like speech.
+    - Not ready until it has heard warm_up_ms of audio; in background mode that happens once, at startup.
+    """
+    def __init__(self, frame_ms=20, rise_s=2.0, fall_s=0.3, floor_db=-60.0, warm_up_ms=200):
+        self.warm_up_frames = max(1, warm_up_ms // frame_ms)
+        self.rise = min(1.0, frame_ms / (1000 * rise_s))
+        self.fall = min(1.0, frame_ms / (1000 * fall_s))
+        self.floor_db = floor_db
+        self.level_db = None
+        self.frames = 0
+
+    def update(self, energy_db):
+        if self.level_db is None:
+            self.level_db = energy_db
+        else:
+            rate = self.fall if energy_db < self.level_db else self.rise
+            self.level_db += rate * (energy_db - self.level_db)
+        self.level_db = max(self.level_db, self.floor_db)
+        self.frames += 1
+
+    def rebase(self, level_db):
+        """Jumps to a re-measured level (the background changed for good, e.g. a fan was switched on)."""
+        self.level_db = max(level_db, self.floor_db)
+
+    def ready(self):
+        return self.frames >= self.warm_up_frames
+
+    def level(self):
+        return self.floor_db if self.level_db is None else self.level_db
+
+
+class VoiceActivityDetector:
+    """
+    Frame-Level Voice Activity Detection + Endpointing.
+    - A frame is speech when it is start_margin_db above the ambient noise; once the user
+      is talking it stays speech down to stop_margin_db (hysteresis keeps quiet word tails).
+    - Speech starts after min_speech_ms of speech frames (clicks are shorter) and ends
+      after end_silence_ms without any.
+    - Frames outside speech keep the noise model up to date. Speech that lasts past
+      max_speech_ms is taken to be a lasting rise in the background (a fan, traffic): the
+      noise level is re-measured from the quietest frames of that run and it stops being speech.
+    """
+    def __init__(self, noise=None, frame_ms=20, start_margin_db=10.0, stop_margin_db=6.0, min_speech_ms=60, end_silence_ms=400,
+                 max_speech_ms=10000, remeasure_percentile=10):
+        self.noise = noise or AmbientNoiseModel(frame_ms=frame_ms)
+        self.frame_ms = frame_ms
+        self.start_margin_db = start_margin_db
+        self.stop_margin_db = stop_margin_db
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.end_silence_frames = max(1, end_silence_ms // frame_ms)
+        self.max_speech_frames = max(1, max_speech_ms // frame_ms)
+        self.remeasure_percentile = remeasure_percentile
+        self.noise_changes = 0
+        self.reset()
+
+    def reset(self):
+        """Forgets the current utterance (the noise model is kept)."""
+        self.in_speech = False
+        # whether the last frame was speech
+        self.speaking = False
+        self.speech_run = 0
+        self.silence_run = 0
+        # energy of every frame since speech started, for re-measuring the noise
+        self.speech_energies = []
+
+    def process(self, frame):
+        """Classifies one frame; returns SPEECH_START, SPEECH_END, NOISE_CHANGE or None."""
+        energy = frame_energy_db(frame)
+        if not self.noise.ready():
+            # nothing to compare against yet: everything counts as background
+            self.noise.update(energy)
+            self.speaking = False
+            return None
+        margin = self.stop_margin_db if self.in_speech else self.start_margin_db
+        self.speaking = energy > self.noise.level() + margin
+
+        if not self.in_speech:
+            if self.speaking:
+                self.speech_run += 1
+                if self.speech_run >= self.min_speech_frames:
+                    self.in_speech = True
+                    self.silence_run = 0
+                    return SPEECH_START
+            else:
+                self.speech_run = 0
+                self.noise.update(energy)
+            return None
+
+        self.speech_energies.append(energy)
+        if len(self.speech_energies) >= self.max_speech_frames:
+            # nobody talks this long without a pause: the pauses are the new background level
+            self.noise.rebase(float(np.percentile(self.speech_energies, self.remeasure_percentile)))
+            self.noise_changes += 1
+            self.reset()
+            return NOISE_CHANGE
+
+        if self.speaking:
+            self.silence_run = 0
+            return None
+        self.silence_run += 1
+        if self.silence_run >= self.end_silence_frames:
+            self.reset()
+            return SPEECH_END
+        return None
+
+
+class VoiceListener:
+    """
+    Always-On Listening With Endpointing.
+    - In background mode a thread reads the audio source all the time, so the ambient
+      noise model is current when listen() is called: no calibration pause per session.
+    - listen() returns as soon as the detector hears end_silence_ms of silence, with
+      pre_roll_ms of audio from before the detected start so the first syllable isn't cut.
+    - Without background, listen() reads the source itself (offline WAV tests).
+    """
+    def __init__(self, source, vad=None, pre_roll_ms=300, background=True):
+        self.source = source
+        self.vad = vad or VoiceActivityDetector(frame_ms=source.frame_ms)
+        self.background = background
+        self.pre_roll = collections.deque(maxlen=max(1, pre_roll_ms // source.frame_ms))
+        self.position = 0  # samples read from the source so far
+
+        self.cond = threading.Condition()
+        self.listening = False
+        self.frames = None
+        self.waited = 0
+        self.timeout_frames = 0
+        self.max_frames = 0
+        self.speech_start_s = None
+        self.speech_end = None
+        self.speech_end_s = None
+        self.result = None
+
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.source.open()
+        if self.background:
+            self.running = True
+            self.thread = threading.Thread(target=self._read_loop, daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        self.source.close()
+
+    def _read_loop(self):
+        while self.running:
+            frame = self.source.read(timeout=0.1)
+            if frame is None:
+                if self.source.ended:
+                    break
+                continue
+            with self.cond:
+                self._feed(frame)
+        with self.cond:
+            self.running = False
+            self._finish(None)
+
+    def listen(self, timeout=8.0, max_seconds=15.0, cancel_event=None):
+        """
+        Waits up to timeout s (of audio) for speech and returns the Utterance once it ends,
+        or None if nobody spoke, the source ran out or cancel_event was set.
+        """
+        frame_s = self.source.frame_ms / 1000
+        with self.cond:
+            self.vad.reset()
+            self.listening = True
+            self.frames = None
+            self.waited = 0
+            self.timeout_frames = int(timeout / frame_s)
+            self.max_frames = int(max_seconds / frame_s)
+            self.result = None
+
+            if self.background:
+                # timeouts count audio, this only guards against a device that stopped delivering it
+                deadline = time.perf_counter() + timeout + max_seconds + 1.0
+                while self.listening and self.running:
+                    if (cancel_event is not None and cancel_event.is_set()) or time.perf_counter() > deadline:
+                        self._finish(None)
+                    else:
+                        self.cond.wait(0.1)
+                self.listening = False
+                return self.result
+
+            while self.listening:
+                if cancel_event is not None and cancel_event.is_set():
+                    self._finish(None)
+                    break
+                frame = self.source.read(timeout=0.1)
+                if frame is None:
+                    if self.source.ended:
+                        self._finish(None)
+                    continue
+                self._feed(frame)
+            return self.result
+
+    def _feed(self, frame):
+        self.position += len(frame) // 2
+        event = self.vad.process(frame)
+        if not self.listening:
+            self.pre_roll.append(frame)
+            return
+
+        if event == NOISE_CHANGE:
+            # what was being recorded was background noise: keep waiting for real speech
+            self.frames = None
+            self.pre_roll.clear()
+            return
+
+        if self.frames is None:
+            if event == SPEECH_START:
+                self.frames = list(self.pre_roll) + [frame]
+                self.pre_roll.clear()
+                self.speech_start_s = self._seconds(self.position - self.vad.min_speech_frames * len(frame) // 2)
+            else:
+                self.pre_roll.append(frame)
+                self.waited += 1
+                if self.waited >= self.timeout_frames:
+                    self._finish(None)
+                return
+        else:
+            self.frames.append(frame)
+
+        if self.vad.speaking:
+            self.speech_end = time.perf_counter()
+            self.speech_end_s = self._seconds(self.position)
+        if event == SPEECH_END or len(self.frames) >= self.max_frames:
+            self._finish(Utterance(b"".join(self.frames), self.source.sample_rate, self.speech_end,
+                                   self.speech_start_s, self.speech_end_s, self._seconds(self.position)))
+
+    def _seconds(self, samples):
+        return samples / self.source.sample_rate
+
+    def _finish(self, result):
+        if not self.listening:
+            return
+        # an utterance cut short by the end of the source still counts
+        if result is None and self.frames:
+            result = Utterance(b"".join(self.frames), self.source.sample_rate, self.speech_end,
+                               self.speech_start_s, self.speech_end_s, self._seconds(self.position))
+        self.result = result
+        self.listening = False
+        self.frames = None
+        self.cond.notify_all()
+
+
+def synthetic_utterance(sample_rate=16000, lead_s=1.0, speech_s=1.5, trail_s=2.0, noise_db=-50.0, speech_db=-20.0, seed=0):
+    """
+    Noise, then a voice-like signal (harmonics of a 140 Hz pitch in syllable-sized bursts), then noise.
+    Returns (pcm bytes, speech start s, speech end s) so endpointing can be scored.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(sample_rate * (lead_s + speech_s + trail_s))
+    noise = rng.standard_normal(total) * (32768 * 10 ** (noise_db / 20))
+
+    t = np.arange(int(sample_rate * speech_s)) / sample_rate
+    voice = sum(np.sin(2 * np.pi * 140 * k * t) / k for k in range(1, 6))
+    # ~4 syllables per second with short dips between them, like connected speech
+    envelope = 0.35 + 0.65 * np.abs(np.sin(np.pi * 4 * t))
+    voice *= envelope * (32768 * 10 ** (speech_db / 20)) / np.sqrt(np.mean(voice ** 2))
+
+    start = int(sample_rate * lead_s)
+    signal = noise
+    signal[start:start + len(voice)] += voice
+    pcm = np.clip(signal, -32768, 32767).astype("<i2").tobytes()
+    return pcm, lead_s, lead_s + speech_s
+
+
+def _energy_endpoint(path, calibration_s=0.5, timeout=8):
+    """Where SpeechRecognition's adjust_for_ambient_noise + energy-threshold listen() stops reading (s)."""
+    import speech_recognition as sr
+    recognizer = sr.Recognizer()
+    with sr.AudioFile(path) as source:
+        recognizer.adjust_for_ambient_noise(source, duration=calibration_s)
+        try:
+            recognizer.listen(source, timeout=timeout)
+        except sr.WaitTimeoutError:
+            return None
+        return source.audio_reader.tell() / source.SAMPLE_RATE
+
+
+def benchmark(fixtures, end_silence_ms=400):
+    """
+    Endpointing on WAV fixtures, old vs new. fixtures: [(path, speech end s or None)].
+    Returns rows of (name, speech end, energy listen() end, VAD end) in seconds of audio.
+    """
+    from audioSource import WavFileSource
+
+    rows = []
+    for path, speech_end_s in fixtures:
+        source = WavFileSource(path)
+        listener = VoiceListener(source, VoiceActivityDetector(frame_ms=source.frame_ms, end_silence_ms=end_silence_ms), background=False).start()
+        start = time.perf_counter()
+        utterance = listener.listen()
+        vad_ms = 1000 * (time.perf_counter() - start)
+        listener.stop()
+
+        vad_end = utterance.endpoint_s if utterance else None
+        rows.append((path, speech_end_s, _energy_endpoint(path), vad_end, vad_ms))
+    return rows
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import tempfile
+    import wave
+
+    # python voiceActivity.py [fixture.wav ...]: without arguments, synthetic fixtures at several noise levels
+    fixtures = [(path, None) for path in sys.argv[1:]]
+    temp_dir = None
+    if not fixtures:
+        temp_dir = tempfile.mkdtemp()
+        for i, noise_db in enumerate((-60, -50, -40)):
+            pcm, _, speech_end_s = synthetic_utterance(noise_db=noise_db, seed=i)
+            path = os.path.join(temp_dir, f"speech_noise{noise_db}dB.wav")
+            with wave.open(path, "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(16000)
+                wav.writeframes(pcm)
+            fixtures.append((path, speech_end_s))
+
+    print(f"{'fixture':<26}{'speech end':>11}{'energy end':>12}{'VAD end':>9}{'saved':>8}{'VAD cpu':>9}")
+    for path, speech_end_s, energy_end, vad_end, vad_ms in benchmark(fixtures):
+        fmt = lambda v: f"{v:.2f}s" if v is not None else "-"
+        saved = f"{energy_end - vad_end:.2f}s" if energy_end is not None and vad_end is not None else "-"
+        print(f"{os.path.basename(path):<26}{fmt(speech_end_s):>11}{fmt(energy_end):>12}{fmt(vad_end):>9}{saved:>8}{vad_ms:>7.1f}ms")
+    print("(energy end does not include the 0.5 s calibration pause the old listen() spent before recording)")
+
+    if temp_dir:
+        for path, _ in fixtures:
+            os.remove(path)
+        os.rmdir(temp_dir)
@@ -0,0 +1,97 @@
+import threading
+import time
+
+from utils import VoiceState
+
+
+class VoiceAssistantWorker:
+    """
+    Background Voice Sessions.
+    - Runs listen -> Gemini -> ElevenLabs -> playback on its own thread, so the
+      gesture loop keeps running at full frame rate while the assistant talks.
+    - One session at a time: triggering while a session is active is ignored, not queued.
+    - The gesture loop can query the current state and cancel the session.
+    - Pass a factory instead of an assistant to build it (imports, microphone, API
+      clients) only when it is first needed, on the session thread, or ahead of
+      time in the background with prewarm().
+    """
+    def __init__(self, assistant=None, factory=None):
+        if assistant is None and factory is None:
+            raise ValueError("VoiceAssistantWorker needs an assistant or a factory")
+        self.assistant = assistant
+        self.factory = factory
+        self.build_lock = threading.Lock()
+
+        self.lock = threading.Lock()
+        self.state = VoiceState.IDLE
+        self.cancel_event = threading.Event()
+        self.thread = None
+
+        # stats
+        self.sessions = 0
+        self.ignored = 0
+
+    def trigger(self):
+        """Starts a session if none is running. Returns False when the trigger was ignored."""
+        with self.lock:
+            if self.state != VoiceState.IDLE:
+                self.ignored += 1
+                return False
+
+            self.state = VoiceState.LISTENING
+            self.sessions += 1
+            self.cancel_event.clear()
+            self.thread = threading.Thread(target=self._run_session, daemon=True)
+            self.thread.start()
+        return True
+
+    def prewarm(self, delay=0.0):
+        """Builds the assistant on a background thread after delay seconds (e.g. once the camera is up)."""
+        if self.assistant is not None:
+            return
+        timer = threading.Timer(delay, self._prewarm)
+        timer.daemon = True
+        timer.start()
+
+    def _prewarm(self):
+        try:
+            self.get_assistant()
+        except Exception as e:
+            # not fatal: the first trigger tries again and reports the error
+            print(f"Voice Assistant prewarm failed: {e}")
+
+    def get_assistant(self):
+        """The assistant, built by the factory on first use. A failed build is retried next time."""
+        if self.assistant is None:
+            with self.build_lock:
+                if self.assistant is None:
+                    start = time.perf_counter()
+                    self.assistant = self.factory()
+                    print(f"Voice Assistant ready ({1000 * (time.perf_counter() - start):.0f} ms)")
+        return self.assistant
+
+    def is_ready(self):
+        return self.assistant is not None
+
+    def cancel(self):
+        """Asks the running session to stop after its current stage."""
+        if self.is_active():
+            self.cancel_event.set()
+
+    def get_state(self):
+        return self.state
+
+    def is_active(self):
+        return self.state != VoiceState.IDLE
+
+    def _set_state(self, state):
+        with self.lock:
+            self.state = state
+
+    def _run_session(self):
+        try:
+            self.get_assistant().run(on_state=self._set_state, cancel_event=self.cancel_event)
+        except Exception as e:
+            print(f"Voice Assistant Error: {e}")
+        finally:
+            self._set_state(VoiceState.IDLE)
@@ -21,6 +21,11 @@ document.addEventListener("DOMContentLoaded", () => {
   //   }
   // });
 
+  startLandmarkOverlay(
+    document.getElementById("overlayCanvas"),
+    document.getElementById("videoFeed")
+  );
+
   let currentSlide = 0;
 
   function showSlide(index) {
@@ -0,0 +1,155 @@
+// Draws the gesture overlay from the backend's landmark WebSocket (backend/landmarkStream.py)
+// instead of showing the server-annotated MJPEG feed.
+
+const LANDMARK_STREAM_URL = "ws://localhost:5175/?video=1";
+
+const MSG_LANDMARKS = 1;
+const MSG_VIDEO = 2;
+// <BIdBBBH: type, seq, capture time, hands, mode, voice state, status length
+const LANDMARK_HEADER_SIZE = 18;
+// <BId: type, seq, capture time
+const VIDEO_HEADER_SIZE = 13;
+const POINTS_PER_HAND = 21;
+
+// same order as GestureMode / VoiceState in backend/utils.py
+const MODES = ["None", "Cursor", "Scroll", "Swipe", "Zoom"];
+const VOICE_STATES = ["Idle", "Listening", "Thinking", "Speaking"];
+const INDEX_TIP = 8;
+
+function decodeLandmarks(buffer) {
+  const view = new DataView(buffer);
+  const hands = view.getUint8(13);
+  const statusLength = view.getUint16(16, true);
+  const pointsOffset = LANDMARK_HEADER_SIZE + statusLength;
+
+  return {
+    seq: view.getUint32(1, true),
+    captureTime: view.getFloat64(5, true),
+    hands,
+    mode: MODES[view.getUint8(14)] || "None",
+    voice: VOICE_STATES[view.getUint8(15)] || "Idle",
+    status: new TextDecoder().decode(
+      new Uint8Array(buffer, LANDMARK_HEADER_SIZE, statusLength)
+    ),
+    // slice: Float32Array needs a 4-byte aligned offset
+    points: new Float32Array(
+      buffer.slice(pointsOffset, pointsOffset + hands * POINTS_PER_HAND * 8)
+    ),
+  };
+}
+
+function startLandmarkOverlay(canvas, fallbackImg, url = LANDMARK_STREAM_URL) {
+  const ctx = canvas.getContext("2d");
+  let config = { cam_w: 640, cam_h: 480, margin: 100 };
+  let overlay = null;
+  let background = null;
+  let drawQueued = false;
+  let everConnected = false;
+
+  function draw() {
+    drawQueued = false;
+    const w = canvas.width;
+    const h = canvas.height;
+
+    if (background) {
+      ctx.drawImage(background, 0, 0, w, h);
+    } else {
+      ctx.fillStyle = "#000";
+      ctx.fillRect(0, 0, w, h);
+    }
+    if (!overlay) return;
+
+    // hands (one path for every landmark)
+    const points = overlay.points;
+    ctx.fillStyle = "rgb(0, 0, 255)";
+    ctx.beginPath();
+    for (let i = 0; i < points.length; i += 2) {
+      const x = points[i] * w;
+      const y = points[i + 1] * h;
+      ctx.moveTo(x + 5, y);
+      ctx.arc(x, y, 5, 0, 2 * Math.PI);
+    }
+    ctx.fill();
+
+    if (overlay.mode === "Scroll" && overlay.hands) {
+      ctx.strokeStyle = "rgb(0, 0, 255)";
+      ctx.lineWidth = 2;
+      ctx.beginPath();
+      ctx.arc(points[INDEX_TIP * 2] * w, points[INDEX_TIP * 2 + 1] * h, 20, 0, 2 * Math.PI);
+      ctx.stroke();
+    }
+
+    // status bar
+    ctx.fillStyle = "#000";
+    ctx.fillRect(0, 0, w, 40);
+    ctx.fillStyle = "#fff";
+    ctx.font = "bold 24px sans-serif";
+    ctx.fillText(overlay.status, 10, 30);
+
+    // active area for the cursor
+    const m = config.margin;
+    ctx.strokeStyle = "#fff";
+    ctx.lineWidth = 1;
+    ctx.strokeRect(m + 0.5, m + 0.5, w - 2 * m, h - 2 * m);
+  }
+
+  function queueDraw() {
+    // messages can arrive faster than the display refreshes; draw the newest once per frame
+    if (!drawQueued) {
+      drawQueued = true;
+      requestAnimationFrame(draw);
+    }
+  }
+
+  function showFallback() {
+    canvas.style.display = "none";
+    fallbackImg.src = fallbackImg.dataset.src;
+    fallbackImg.style.display = "";
+  }
+
+  function connect() {
+    const socket = new WebSocket(url);
+    socket.binaryType = "arraybuffer";
+
+    socket.onopen = () => {
+      everConnected = true;
+    };
+
+    socket.onmessage = (event) => {
+      if (typeof event.data === "string") {
+        config = JSON.parse(event.data);
+        canvas.width = config.cam_w;
+        canvas.height = config.cam_h;
+        return;
+      }
+
+      const type = new DataView(event.data).getUint8(0);
+      if (type === MSG_LANDMARKS) {
+        overlay = decodeLandmarks(event.data);
+        queueDraw();
+      } else if (type === MSG_VIDEO) {
+        const jpeg = new Blob([new Uint8Array(event.data, VIDEO_HEADER_SIZE)], {
+          type: "image/jpeg",
+        });
+        createImageBitmap(jpeg).then((bitmap) => {
+          if (background) background.close();
+          background = bitmap;
+          queueDraw();
+        });
+      }
+    };
+
+    socket.onclose = () => {
+      if (!everConnected && fallbackImg) {
+        // old backend without the landmark stream: use the MJPEG feed
+        showFallback();
+        return;
+      }
+      setTimeout(connect, 1000);
+    };
+  }
+
+  canvas.width = config.cam_w;
+  canvas.height = config.cam_h;
+  connect();
+}